@@ -0,0 +1,561 @@
+#!/usr/bin/env python3
+"""Benchmark the git helpers against synthetic repositories.
+
+    python benchmarks/bench.py --scales tiny,small --iterations 20
+    python benchmarks/bench.py --scales small --compare old.json
+
+Every case runs in a fresh Python process, so cold numbers are really
+cold and peak RSS belongs to that case alone. For each case we record
+latency percentiles, peak RSS of the helper and of its git children, and
+the number of subprocesses started per iteration. Results go to one JSON
+file per run; --compare prints the p50 change against an earlier one.
+
+Each run also times cold starts of the helper scripts against
+STARTUP_BUDGET_MS and records which imports dominate them.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Callable
+
+import synthetic_repo
+
+PYTHON_DIR = Path(__file__).resolve().parent.parent / 'electron' / 'python'
+
+# Case name -> what it measures
+CASES = {
+    'status_cold': 'get_status() on a fresh GitOperations',
+    'status_cached': 'get_status() with nothing changed',
+    'status_invalidated': 'get_status() after a watcher invalidate()',
+    'log_first_page': 'get_log(100) on a fresh GitOperations',
+    'log_next_page': 'get_log(100) continuing from a cursor',
+    'file_tree': 'get_file_tree() on a fresh GitOperations',
+    'file_tree_stream': 'get_file_tree() as NDJSON records into a null sink (first item and all)',
+    'list_dir': "list_dir('.') on a fresh GitOperations",
+    'diff_file': 'get_diff() of one modified file, uncached',
+    'diff_structured': 'get_structured_diff() first page of the worktree',
+    'diff_set': "get_diff_set('all') of the whole changeset",
+    'watcher_burst': 'file_watcher.py: write a burst of files, wait for every change to be reported',
+    'commit_context': 'build_commit_context() of the whole changeset in the default token budget',
+    'ai_commit_uncached': 'AICommitGenerator against a local stand-in API, response cache bypassed',
+    'ai_commit_cached': 'AICommitGenerator repeating a request the response cache holds',
+    'ai_commit_stream': 'AICommitGenerator streaming from the stand-in API (first text and full message)',
+}
+
+# Files written per watcher_burst iteration
+WATCHER_BURST = 500
+
+# Simulated model of the stand-in completions API: time to the first token,
+# then one token every STAND_IN_TOKEN_MS (ms)
+STAND_IN_FIRST_TOKEN_MS = 50
+STAND_IN_TOKENS = 20
+STAND_IN_TOKEN_MS = 10
+
+# Cold-start budget: wall time above a bare `python -c pass`, in ms. The
+# status and watcher cases include their git calls on the tiny repository.
+STARTUP_BUDGET_MS = {
+    'import_git_operations': 35,
+    'cli_status': 60,
+    'ai_commit_fallback': 20,
+    'watcher_first_output': 50,
+}
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(fraction * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def summarize(timings: List[float]) -> Dict[str, float]:
+    values = sorted(timings)
+    return {
+        'count': len(values),
+        'min': values[0] if values else 0.0,
+        'p50': percentile(values, 0.50),
+        'p90': percentile(values, 0.90),
+        'p99': percentile(values, 0.99),
+        'max': values[-1] if values else 0.0,
+        'mean': sum(values) / len(values) if values else 0.0
+    }
+
+# --- Case runner (child process) ---------------------------------------------
+
+def _count_subprocesses() -> List[int]:
+    """Count every process the helpers start (subprocess.run goes through Popen too)."""
+    counter = [0]
+    original = subprocess.Popen
+
+    class CountingPopen(original):
+        def __init__(self, *args, **kwargs):
+            counter[0] += 1
+            super().__init__(*args, **kwargs)
+
+    subprocess.Popen = CountingPopen
+    return counter
+
+def _timed(iterations: int, call: Callable[[], Any], setup: Callable[[], Any] = None) -> List[float]:
+    timings = []
+    for _ in range(iterations):
+        state = setup() if setup else None
+        started = time.perf_counter()
+        result = call(state) if setup else call()
+        timings.append((time.perf_counter() - started) * 1000)
+        if isinstance(result, dict) and result.get('success') is False:
+            raise RuntimeError(result.get('error'))
+    return timings
+
+def run_case(case: str, repo: str, scale: str, iterations: int) -> Dict[str, Any]:
+    sys.path.insert(0, str(PYTHON_DIR))
+    counter = _count_subprocesses()
+    from git_operations import GitOperations
+
+    spec = synthetic_repo.SCALES[scale]
+    fresh = lambda: GitOperations(repo)
+    first_item = []
+
+    if case == 'status_cold':
+        timings = _timed(iterations, lambda git_ops: git_ops.get_status(), fresh)
+    elif case == 'status_cached':
+        git_ops = fresh()
+        # Warm-up: fills the cache so every timed call is a hit
+        git_ops.get_status()
+        counter[0] = 0
+        timings = _timed(iterations, git_ops.get_status)
+    elif case == 'status_invalidated':
+        git_ops = fresh()
+        git_ops.get_status()
+        counter[0] = 0
+        timings = _timed(iterations, lambda: (git_ops.invalidate(), git_ops.get_status())[1])
+    elif case == 'log_first_page':
+        timings = _timed(iterations, lambda git_ops: git_ops.get_log(100), fresh)
+    elif case == 'log_next_page':
+        git_ops = fresh()
+        page = git_ops.get_log(100)
+        counter[0] = 0
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            page = git_ops.get_log(100, page['cursor']) if page.get('cursor') else git_ops.get_log(100)
+            timings.append((time.perf_counter() - started) * 1000)
+    elif case == 'file_tree':
+        timings = _timed(iterations, lambda git_ops: git_ops.get_file_tree(), fresh)
+    elif case == 'file_tree_stream':
+        from record_stream import RecordWriter
+
+        def stream_tree(git_ops):
+            started = time.perf_counter()
+            writer = RecordWriter(lambda data: None, 'file-tree', 'tree')
+
+            def on_item(node):
+                if not writer.count:
+                    first_item.append((time.perf_counter() - started) * 1000)
+                writer.item(node)
+
+            writer.header()
+            result = git_ops.get_file_tree(on_item=on_item)
+            writer.trailer(result)
+            return result
+        timings = _timed(iterations, stream_tree, fresh)
+    elif case == 'list_dir':
+        timings = _timed(iterations, lambda git_ops: git_ops.list_dir('.'), fresh)
+    elif case == 'diff_file':
+        path = synthetic_repo.dirty_files(spec)[-1]
+        timings = _timed(iterations, lambda git_ops: git_ops.get_diff(path), fresh)
+    elif case == 'diff_structured':
+        timings = _timed(iterations, lambda git_ops: git_ops.get_structured_diff(limit=20), fresh)
+    elif case == 'diff_set':
+        timings = _timed(iterations, lambda git_ops: git_ops.get_diff_set('all'), fresh)
+    elif case == 'commit_context':
+        from commit_context import build_commit_context
+        timings = _timed(iterations, lambda git_ops: build_commit_context(git_ops, mode='all'), fresh)
+    else:
+        raise ValueError(f'Unknown case: {case}')
+
+    result = {
+        'latency_ms': summarize(timings),
+        'subprocesses_per_iteration': counter[0] / max(1, iterations)
+    }
+    if first_item:
+        result['first_item_ms'] = summarize(first_item)
+    return result
+
+def run_watcher_case(repo: str, iterations: int) -> Dict[str, Any]:
+    """Write WATCHER_BURST files at once and time until the watcher has reported all of them."""
+    watcher = subprocess.Popen(
+        [sys.executable, str(PYTHON_DIR / 'file_watcher.py'), repo, '100'],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    try:
+        while True:
+            line = watcher.stdout.readline()
+            if not line:
+                raise RuntimeError(watcher.stderr.read().strip().splitlines()[-1])
+            message = json.loads(line)
+            if 'error' in message:
+                raise RuntimeError(message['error'])
+            if message.get('status') == 'watching':
+                break
+
+        timings, rates = [], []
+        burst_dir = Path(repo) / 'src' / 'mod00'
+        for iteration in range(iterations):
+            expected = {f'src/mod00/burst{iteration}_{number}.txt' for number in range(WATCHER_BURST)}
+            started = time.perf_counter()
+            for path in expected:
+                (Path(repo) / path).write_text('burst\n')
+            written = time.perf_counter()
+
+            while expected:
+                message = json.loads(watcher.stdout.readline())
+                for change in message.get('changes', []):
+                    expected.discard(change['path'])
+            finished = time.perf_counter()
+
+            timings.append((finished - written) * 1000)
+            rates.append(WATCHER_BURST / (finished - started))
+
+            for number in range(WATCHER_BURST):
+                (burst_dir / f'burst{iteration}_{number}.txt').unlink()
+
+        return {
+            'latency_ms': summarize(timings),
+            'events_per_second': summarize(rates)
+        }
+    finally:
+        watcher.stdin.close()
+        watcher.kill()
+        watcher.wait()
+
+def _stand_in_api():
+    """Local stand-in for the chat completions API, counting requests and connections.
+
+    Answers with STAND_IN_TOKENS tokens, as one JSON body or, for requests
+    with "stream": true, as server-sent events while they are "generated".
+    """
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    counts = {'requests': 0, 'connections': 0}
+    tokens = ['feat:'] + [f' word{number}' for number in range(1, STAND_IN_TOKENS)]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            counts['connections'] += 1
+            super().setup()
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)))
+            counts['requests'] += 1
+            time.sleep(STAND_IN_FIRST_TOKEN_MS / 1000)
+            if request.get('stream'):
+                self.stream()
+                return
+
+            time.sleep(STAND_IN_TOKEN_MS * (len(tokens) - 1) / 1000)
+            body = json.dumps({
+                'model': 'stand-in',
+                'choices': [{'message': {'content': ''.join(tokens)}}],
+                'usage': {}
+            }).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def stream(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+
+            def chunk(data: bytes):
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+                self.wfile.flush()
+
+            chunk(b': PROCESSING\n\n')
+            for index, token in enumerate(tokens):
+                if index:
+                    time.sleep(STAND_IN_TOKEN_MS / 1000)
+                event = {'model': 'stand-in', 'choices': [{'delta': {'content': token}}]}
+                chunk(b'data: ' + json.dumps(event).encode() + b'\n\n')
+            chunk(b'data: [DONE]\n\n')
+            chunk(b'')
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, counts
+
+def run_ai_commit_case(case: str, repo: str, scale: str, iterations: int) -> Dict[str, Any]:
+    """One long-lived generator against the stand-in API, with a fresh cache directory."""
+    sys.path.insert(0, str(PYTHON_DIR))
+    from ai_commit import AICommitGenerator, generate_with_fallback
+    from git_operations import GitOperations
+    from response_cache import ResponseCache
+
+    server, counts = _stand_in_api()
+    changes = [{'status': 'M', 'file': path} for path in synthetic_repo.dirty_files(synthetic_repo.SCALES[scale])]
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            generator = AICommitGenerator('bench-key', f'http://127.0.0.1:{server.server_port}',
+                                          ResponseCache(Path(cache_dir)))
+            refresh = case != 'ai_commit_cached'
+            # Warm-up: opens the pooled connection and fills the cache
+            if case == 'ai_commit_cached':
+                # Through the app's entry point, so the cost of keying the cache counts
+                git_ops = GitOperations(repo)
+                generate_with_fallback(generator, changes, git_ops)
+            else:
+                generator.generate_commit_message(changes, repo)
+            counts['requests'] = 0
+
+            first_text = []
+            if case == 'ai_commit_cached':
+                generate = lambda: generate_with_fallback(generator, changes, git_ops)
+            elif case == 'ai_commit_stream':
+                def generate():
+                    result = generator.generate_commit_message(changes, repo, refresh, on_delta=lambda text: None)
+                    first_text.append(result.get('first_text_ms', 0.0))
+                    return result
+            else:
+                generate = lambda: generator.generate_commit_message(changes, repo, refresh)
+            timings = _timed(iterations, generate)
+            generator.close()
+    finally:
+        server.shutdown()
+
+    result = {
+        'latency_ms': summarize(timings),
+        'api_requests_per_iteration': counts['requests'] / max(1, iterations),
+        'connections': counts['connections']
+    }
+    if first_text:
+        result['first_text_ms'] = summarize(first_text)
+    return result
+
+def child_main(case: str, repo: str, scale: str, iterations: int):
+    try:
+        if case == 'watcher_burst':
+            result = run_watcher_case(repo, iterations)
+        elif case.startswith('ai_commit'):
+            result = run_ai_commit_case(case, repo, scale, iterations)
+        else:
+            result = run_case(case, repo, scale, iterations)
+        result['peak_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        result['children_peak_rss_kb'] = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    except ImportError as e:
+        # Optional dependencies (watchdog, ...) missing: skip the case, not the run
+        result = {'skipped': str(e)}
+    print(json.dumps(result))
+
+# --- Cold start ---------------------------------------------------------------
+
+def _best_wall_ms(command: List[str], iterations: int, env: Dict[str, str] = None,
+                  first_line: bool = False) -> float:
+    """Fastest of `iterations` runs; with first_line, time until the first output line."""
+    best = float('inf')
+    for _ in range(iterations):
+        started = time.perf_counter()
+        process = subprocess.Popen(command, cwd=PYTHON_DIR, env=env, stdin=subprocess.PIPE,
+                                   stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        if first_line:
+            process.stdout.readline()
+            elapsed = time.perf_counter() - started
+            process.kill()
+            process.communicate()
+        else:
+            process.communicate()
+            elapsed = time.perf_counter() - started
+        best = min(best, elapsed * 1000)
+    return best
+
+def _import_profile(module: str, env: Dict[str, str], top: int = 10) -> List[Dict[str, Any]]:
+    """Slowest modules (cumulative us) pulled in by importing `module`, from -X importtime."""
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=PYTHON_DIR, env=env, capture_output=True, text=True).stderr
+    entries = []
+    for line in output.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            entries.append({'module': parts[2].strip(), 'cumulative_us': int(parts[1])})
+    return sorted(entries, key=lambda entry: -entry['cumulative_us'])[:top]
+
+def run_startup(repo: Path, iterations: int) -> Dict[str, Any]:
+    """Cold-start wall times of the helpers, relative to a bare interpreter."""
+    # Bytecode goes to a scratch cache rather than __pycache__ in the source tree
+    with tempfile.TemporaryDirectory(prefix='git-gui-bench-pycache-') as pycache:
+        return _run_startup(repo, iterations, pycache)
+
+def _run_startup(repo: Path, iterations: int, pycache: str) -> Dict[str, Any]:
+    python = sys.executable
+    # Helpers start through launch.py as the app starts them, with bytecode cached
+    env = {key: value for key, value in os.environ.items() if key != 'PYTHONDONTWRITEBYTECODE'}
+    env['PYTHONPYCACHEPREFIX'] = pycache
+    no_key = {key: value for key, value in env.items() if key != 'OPENROUTER_API_KEY'}
+    subprocess.run([python, '-m', 'compileall', '-q', '.'], cwd=PYTHON_DIR, env=env, check=True)
+
+    baseline = _best_wall_ms([python, '-c', 'pass'], iterations, env=env)
+    measured = {
+        'import_git_operations': _best_wall_ms([python, '-c', 'import git_operations'], iterations, env=env),
+        'cli_status': _best_wall_ms([python, 'launch.py', 'git_operations', 'status', str(repo)], iterations, env=env),
+        'ai_commit_fallback': _best_wall_ms([python, 'launch.py', 'ai_commit', str(repo), '[]'], iterations, env=no_key),
+        'watcher_first_output': _best_wall_ms([python, 'launch.py', 'file_watcher', str(repo)], iterations,
+                                              env=env, first_line=True),
+    }
+
+    cases = {}
+    for name, wall_ms in measured.items():
+        overhead = wall_ms - baseline
+        cases[name] = {
+            'wall_ms': wall_ms,
+            'over_baseline_ms': overhead,
+            'budget_ms': STARTUP_BUDGET_MS[name],
+            'within_budget': overhead <= STARTUP_BUDGET_MS[name]
+        }
+        print(f'  {name:22} {wall_ms:7.1f} ms  (+{overhead:5.1f} ms, budget +{STARTUP_BUDGET_MS[name]} ms)'
+              + ('' if cases[name]['within_budget'] else '  OVER BUDGET'), file=sys.stderr)
+
+    return {
+        'baseline_ms': baseline,
+        'cases': cases,
+        'imports': {module: _import_profile(module, env) for module in ('git_operations', 'ai_commit', 'file_watcher')}
+    }
+
+# --- Driver -------------------------------------------------------------------
+
+def machine_info() -> Dict[str, Any]:
+    git_version = subprocess.run(['git', '--version'], capture_output=True, text=True).stdout.strip()
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'git': git_version
+    }
+
+def run_scale(workdir: Path, scale: str, cases: List[str], iterations: int) -> Dict[str, Any]:
+    started = time.perf_counter()
+    repo = synthetic_repo.ensure(workdir, scale)
+    prepared = time.perf_counter() - started
+
+    results = {}
+    for case in cases:
+        if case == 'watcher_burst':
+            synthetic_repo.make_dirty(repo, synthetic_repo.SCALES[scale])
+
+        output = subprocess.run(
+            [sys.executable, __file__, '--case', case, '--repo', str(repo),
+             '--scale', scale, '--iterations', str(iterations)],
+            capture_output=True,
+            text=True
+        )
+        try:
+            results[case] = json.loads(output.stdout.strip().splitlines()[-1])
+        except (ValueError, IndexError):
+            results[case] = {'skipped': output.stderr.strip() or 'no output'}
+
+        latency = results[case].get('latency_ms')
+        print(f'  {case:20} ' + (
+            f'p50 {latency["p50"]:9.2f} ms  p90 {latency["p90"]:9.2f} ms' if latency
+            else f'skipped: {results[case]["skipped"][:60]}'
+        ) + (
+            f'  first text p50 {results[case]["first_text_ms"]["p50"]:.2f} ms' if 'first_text_ms' in results[case]
+            else f'  first item p50 {results[case]["first_item_ms"]["p50"]:.2f} ms' if 'first_item_ms' in results[case]
+            else ''
+        ), file=sys.stderr)
+
+    return {
+        'spec': synthetic_repo.SCALES[scale],
+        'prepare_seconds': prepared,
+        'cases': results
+    }
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]):
+    """Print p50 latency (and cold-start time) of `current` relative to `baseline`."""
+    old_startup = baseline.get('startup', {}).get('cases', {})
+    for name, result in current.get('startup', {}).get('cases', {}).items():
+        if name in old_startup:
+            print(f'startup {name:22} {old_startup[name]["wall_ms"]:7.1f} -> {result["wall_ms"]:7.1f} ms')
+
+    for scale, data in current['scales'].items():
+        old_scale = baseline.get('scales', {}).get(scale)
+        if not old_scale:
+            continue
+        print(f'{scale}:')
+        for case, result in data['cases'].items():
+            old = old_scale['cases'].get(case, {}).get('latency_ms')
+            new = result.get('latency_ms')
+            if not old or not new:
+                continue
+            ratio = new['p50'] / old['p50'] if old['p50'] else float('inf')
+            print(f'  {case:20} {old["p50"]:9.2f} -> {new["p50"]:9.2f} ms  ({ratio:.2f}x)')
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the git helpers on synthetic repositories.')
+    parser.add_argument('--scales', default='tiny,small', help=f'comma-separated, from {", ".join(synthetic_repo.SCALES)}')
+    parser.add_argument('--cases', default=','.join(CASES), help='comma-separated case names')
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--workdir', default=os.path.join(tempfile.gettempdir(), 'git-gui-bench'),
+                        help='where synthetic repositories are built and kept')
+    parser.add_argument('--output', help='results file (default: <workdir>/results-<time>.json)')
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    parser.add_argument('--no-startup', action='store_true', help='skip the cold-start measurements')
+    # Internal: run a single case in this process
+    parser.add_argument('--case', help=argparse.SUPPRESS)
+    parser.add_argument('--repo', help=argparse.SUPPRESS)
+    parser.add_argument('--scale', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        child_main(args.case, args.repo, args.scale, args.iterations)
+        return
+
+    cases = [case for case in args.cases.split(',') if case]
+    unknown = [case for case in cases if case not in CASES]
+    if unknown:
+        parser.error(f'unknown cases: {", ".join(unknown)}')
+
+    workdir = Path(args.workdir)
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    results = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'iterations': args.iterations,
+        'machine': machine_info(),
+        'scales': {}
+    }
+    for scale in args.scales.split(','):
+        if scale not in synthetic_repo.SCALES:
+            parser.error(f'unknown scale: {scale}')
+        print(f'{scale}:', file=sys.stderr)
+        results['scales'][scale] = run_scale(workdir, scale, cases, args.iterations)
+
+    if not args.no_startup:
+        print('startup:', file=sys.stderr)
+        results['startup'] = run_startup(synthetic_repo.ensure(workdir, 'tiny'), args.iterations)
+
+    output = Path(args.output or workdir / f'results-{time.strftime("%Y%m%d-%H%M%S")}.json')
+    output.write_text(json.dumps(results, indent=2))
+    print(f'Results written to {output}', file=sys.stderr)
+
+    if args.compare:
+        compare(json.loads(Path(args.compare).read_text()), results)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""Deterministic synthetic repositories for benchmarking.
+
+Repositories are written with one `git fast-import` stream, so even the
+500k-file / 100k-commit scale builds in minutes, and the same scale always
+produces the same commit ids. A built repository is reused as long as its
+recorded spec matches; its worktree is reset to the same dirty state every
+time it is handed out.
+"""
+import json
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Any
+
+# Bump when the generated content changes, so cached repositories are rebuilt
+GENERATOR_VERSION = 1
+
+SCALES: Dict[str, Dict[str, Any]] = {
+    # Quick smoke run
+    'tiny': {'files': 1_000, 'commits': 200, 'topics': 0, 'dirty': 20},
+    'small': {'files': 10_000, 'commits': 1_000, 'topics': 0, 'dirty': 100},
+    'medium': {'files': 100_000, 'commits': 10_000, 'topics': 0, 'dirty': 500},
+    'large': {'files': 500_000, 'commits': 100_000, 'topics': 0, 'dirty': 2_000},
+    # Deep merge history: many long-lived topic lines merged back over and over
+    'merges': {'files': 5_000, 'commits': 20_000, 'topics': 24, 'dirty': 50},
+}
+
+WORDS = ('alpha', 'beta', 'gamma', 'delta', 'status', 'index', 'commit', 'branch',
+         'merge', 'tree', 'blob', 'remote', 'fetch', 'layout', 'render', 'cache')
+
+# Every LARGE_FILE_EVERY-th file is long enough to exercise diff size caps
+LARGE_FILE_EVERY = 1_000
+LARGE_FILE_LINES = 3_000
+
+EPOCH = 1_600_000_000
+
+def file_path(index: int) -> str:
+    """Spread files over a three-level tree of modules and packages."""
+    return f'src/mod{index % 97:02d}/pkg{(index // 97) % 53:02d}/file{index}.txt'
+
+def file_content(rng: random.Random, index: int, revision: int = 0) -> bytes:
+    lines = LARGE_FILE_LINES if index % LARGE_FILE_EVERY == 0 else rng.randint(3, 12)
+    body = [f'# file {index} revision {revision}']
+    body += [' '.join(rng.choice(WORDS) for _ in range(8)) for _ in range(lines)]
+    return ('\n'.join(body) + '\n').encode()
+
+def _data(payload: bytes) -> bytes:
+    return b'data %d\n' % len(payload) + payload + b'\n'
+
+def _commit_header(ref: str, mark: int, when: int, message: str) -> bytes:
+    return (
+        f'commit {ref}\nmark :{mark}\n'
+        f'author Bench <bench@example.com> {when} +0000\n'
+        f'committer Bench <bench@example.com> {when} +0000\n'
+    ).encode() + _data(message.encode())
+
+def _fast_import_stream(spec: Dict[str, Any]):
+    """Yield the fast-import stream for a scale, chunk by chunk."""
+    rng = random.Random(f'git-modern-gui-{GENERATOR_VERSION}-{spec["files"]}-{spec["commits"]}')
+    files, commits, topics = spec['files'], spec['commits'], spec['topics']
+
+    # Root commit with every file
+    chunk = [_commit_header('refs/heads/main', 1, EPOCH, 'Initial import')]
+    for index in range(files):
+        chunk.append(f'M 100644 inline {file_path(index)}\n'.encode() + _data(file_content(rng, index)))
+        if len(chunk) >= 1_000:
+            yield b''.join(chunk)
+            chunk = []
+    chunk.append(b'\n')
+    yield b''.join(chunk)
+
+    tips = {'main': 1}
+    for topic in range(topics):
+        tips[f'topic{topic}'] = 1
+
+    mark = 1
+    chunk = []
+    for number in range(1, commits):
+        mark += 1
+        when = EPOCH + number * 60
+
+        # With topics, every fourth commit merges a topic into main
+        merge_from = None
+        if topics and number % 4 == 0:
+            lane = 'main'
+            merge_from = f'topic{rng.randrange(topics)}'
+        elif topics:
+            lane = f'topic{rng.randrange(topics)}'
+        else:
+            lane = 'main'
+
+        if merge_from:
+            message = f'Merge branch {merge_from}'
+        else:
+            message = f'Change {number} on {lane}\n\n' + ' '.join(rng.choice(WORDS) for _ in range(12))
+
+        parts = [_commit_header(f'refs/heads/{lane}', mark, when, message), f'from :{tips[lane]}\n'.encode()]
+        if merge_from:
+            parts.append(f'merge :{tips[merge_from]}\n'.encode())
+        for _ in range(rng.randint(1, 3)):
+            index = rng.randrange(files)
+            parts.append(f'M 100644 inline {file_path(index)}\n'.encode() + _data(file_content(rng, index, number)))
+        parts.append(b'\n')
+        chunk.append(b''.join(parts))
+        tips[lane] = mark
+
+        if len(chunk) >= 500:
+            yield b''.join(chunk)
+            chunk = []
+
+    yield b''.join(chunk)
+
+def _git(repo: Path, *args: str, **kwargs):
+    return subprocess.run(['git', '-C', str(repo)] + list(args), check=True, capture_output=True, **kwargs)
+
+def build(repo: Path, spec: Dict[str, Any]):
+    """Create the repository from scratch."""
+    if repo.exists():
+        subprocess.run(['rm', '-rf', str(repo)], check=True)
+    repo.mkdir(parents=True)
+    _git(repo, 'init', '-q', '-b', 'main')
+    _git(repo, 'config', 'user.name', 'Bench')
+    _git(repo, 'config', 'user.email', 'bench@example.com')
+
+    importer = subprocess.Popen(['git', '-C', str(repo), 'fast-import', '--quiet'], stdin=subprocess.PIPE)
+    try:
+        for chunk in _fast_import_stream(spec):
+            importer.stdin.write(chunk)
+        importer.stdin.close()
+    finally:
+        if importer.wait() != 0:
+            raise RuntimeError('git fast-import failed')
+
+    _git(repo, 'checkout', '-q', '-f', 'main')
+    (repo / '.git' / 'bench-spec.json').write_text(json.dumps(dict(spec, version=GENERATOR_VERSION)))
+
+def make_dirty(repo: Path, spec: Dict[str, Any]):
+    """Reset the worktree, then apply the same mix of staged, modified and untracked files."""
+    _git(repo, 'reset', '-q', '--hard', 'main')
+    _git(repo, 'clean', '-q', '-fd')
+
+    rng = random.Random(f'dirty-{spec["files"]}')
+    indexes = rng.sample(range(spec['files']), spec['dirty'])
+    for index in indexes:
+        path = repo / file_path(index)
+        with open(path, 'a') as handle:
+            handle.write('local edit\n')
+
+    staged = [file_path(index) for index in indexes[:len(indexes) // 2]]
+    _git(repo, 'add', '--pathspec-from-file=-', '--pathspec-file-nul', input='\0'.join(staged).encode())
+
+    untracked = repo / 'untracked'
+    untracked.mkdir(exist_ok=True)
+    for number in range(max(1, spec['dirty'] // 4)):
+        (untracked / f'new{number}.txt').write_text(f'untracked {number}\n')
+
+    # Entries written in the same second as the index are racily clean, and
+    # every `git status` rewrites the index until that second has passed.
+    # Refresh once the clock has moved on so the index is stable from here
+    time.sleep(1)
+    _git(repo, 'update-index', '-q', '--refresh')
+
+def dirty_files(spec: Dict[str, Any]):
+    """The tracked paths make_dirty() edits (first half staged)."""
+    rng = random.Random(f'dirty-{spec["files"]}')
+    return [file_path(index) for index in rng.sample(range(spec['files']), spec['dirty'])]
+
+def ensure(workdir: Path, scale: str) -> Path:
+    """Return the repository for `scale`, building it if missing or stale."""
+    spec = SCALES[scale]
+    repo = workdir / scale
+    marker = repo / '.git' / 'bench-spec.json'
+    try:
+        current = json.loads(marker.read_text()) == dict(spec, version=GENERATOR_VERSION)
+    except (OSError, ValueError):
+        current = False
+
+    if not current:
+        build(repo, spec)
+    make_dirty(repo, spec)
+    return repo
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3 or sys.argv[2] not in SCALES:
+        print(f'Usage: synthetic_repo.py <workdir> <{"|".join(SCALES)}>')
+        sys.exit(1)
+    print(ensure(Path(sys.argv[1]), sys.argv[2]))
@@ -129,51 +129,200 @@ function createMenu() {
   Menu.setApplicationMenu(menu)
 }
 
-async function runPythonScript(scriptName, args = [], cwd = null) {
-  return new Promise((resolve, reject) => {
-    const pythonPath = process.platform === 'win32' ? 'python' : 'python3'
-    const scriptPath = path.join(__dirname, 'python', scriptName)
+// Python helpers start through launch.py, which imports them from cached
+// bytecode instead of compiling the script on every cold start. Packaged
+// builds ship no __pycache__, so bytecode goes to a writable cache dir.
+function spawnPython(helper, args = [], options = {}) {
+  const pythonPath = process.platform === 'win32' ? 'python' : 'python3'
+  const launcherPath = path.join(__dirname, 'python', 'launch.py')
+  const env = { ...process.env, PYTHONUNBUFFERED: '1', GIT_GUI_PAYLOAD_DIR: getPayloadDir() }
+  if (app.isPackaged && !env.PYTHONPYCACHEPREFIX) {
+    env.PYTHONPYCACHEPREFIX = path.join(app.getPath('userData'), 'pycache')
+  }
 
-    const pythonProcess = spawn(pythonPath, [scriptPath, ...args], {
-      cwd: cwd || process.cwd(),
-      env: { ...process.env, PYTHONUNBUFFERED: '1' },
-      stdio: ['pipe', 'pipe', 'pipe']
-    })
+  return spawn(pythonPath, [launcherPath, helper, ...args], {
+    stdio: ['pipe', 'pipe', 'pipe'],
+    ...options,
+    env
+  })
+}
 
-    let stdout = ''
-    let stderr = ''
+// Large request bodies (AI change sets) go to the helpers as @<file> in a
+// private temp directory. Helpers only read @files from this directory,
+// so a renderer cannot point them at arbitrary paths.
+let payloadDir = null
+let payloadCounter = 0
 
-    pythonProcess.stdout.on('data', (data) => {
-      stdout += data.toString()
-    })
+function getPayloadDir() {
+  if (!payloadDir) {
+    payloadDir = fsSync.mkdtempSync(path.join(os.tmpdir(), 'git-gui-payload-'))
+  }
+  return payloadDir
+}
 
-    pythonProcess.stderr.on('data', (data) => {
-      stderr += data.toString()
-    })
+// Writes values as JSON lines, one at a time with backpressure, so a huge
+// change set is never one giant string. Resolves with the file's path.
+function writePayloadFile(name, values) {
+  const file = path.join(getPayloadDir(), `${name}-${++payloadCounter}.json`)
+  return new Promise((resolve, reject) => {
+    const out = fsSync.createWriteStream(file, { flags: 'wx', mode: 0o600 })
+    out.on('error', reject)
+    out.on('finish', () => resolve(file))
+
+    const iterator = values[Symbol.iterator]()
+    const writeMore = () => {
+      for (let next = iterator.next(); !next.done; next = iterator.next()) {
+        if (!out.write(JSON.stringify(next.value) + '\n')) {
+          out.once('drain', writeMore)
+          return
+        }
+      }
+      out.end()
+    }
+    writeMore()
+  })
+}
 
-    pythonProcess.on('close', (code) => {
-      if (code === 0) {
-        try {
-          const result = JSON.parse(stdout)
-          resolve(result)
-        } catch (e) {
-          resolve({ output: stdout, success: true })
+// Calls onLine with each complete line of a child's stdout. Only the new
+// chunk is scanned for newlines, so one huge line costs linear time.
+function readLines(stream, onLine) {
+  let partial = ''
+  stream.setEncoding('utf8')
+  stream.on('data', (chunk) => {
+    const lines = chunk.split('\n')
+    lines[0] = partial + lines[0]
+    partial = lines.pop()
+    lines.forEach(line => { if (line.trim()) onLine(line) })
+  })
+}
+
+// Rebuilds the list of a streamed command (see record_stream.py) from its
+// item records; finish() merges it into the trailer. File-tree items are
+// flat nodes, each folder before its contents, and are nested again here.
+function createItemCollector(itemsKey) {
+  const withItems = ({ type, ...trailer }, items) => ({ ...trailer, [itemsKey]: items })
+
+  if (itemsKey === 'tree') {
+    let root = null
+    const folders = new Map()
+    return {
+      add: (node) => {
+        if (!root) {
+          root = node
+          folders.set('', node)
+          return
         }
+        const slash = node.path.lastIndexOf('/')
+        folders.get(slash === -1 ? '' : node.path.slice(0, slash)).children.push(node)
+        if (node.type === 'folder') folders.set(node.path, node)
+      },
+      finish: (trailer) => withItems(trailer, root)
+    }
+  }
+
+  const items = []
+  return { add: (item) => items.push(item), finish: (trailer) => withItems(trailer, items) }
+}
+
+// Persistent git_operations.py worker (see GitWorker in git_operations.py)
+let gitWorker = null
+let gitRequestId = 0
+const gitPendingRequests = new Map()
+
+function getGitWorker() {
+  if (gitWorker) return gitWorker
+
+  const workerProcess = spawnPython('git_operations', ['serve'])
+
+  readLines(workerProcess.stdout, (line) => {
+    try {
+      const response = JSON.parse(line)
+      const pending = gitPendingRequests.get(response.id)
+      if (!pending) return
+
+      if (response.type === 'header') {
+        pending.collector = createItemCollector(response.items)
+      } else if (response.type === 'item') {
+        if (pending.collector) pending.collector.add(response.item)
+      } else if (response.event) {
+        if (pending.onEvent) pending.onEvent(response.event)
       } else {
-        reject({ error: stderr || `Process exited with code ${code}`, success: false })
+        gitPendingRequests.delete(response.id)
+        pending.resolve(pending.collector ? pending.collector.finish(response.result) : response.result)
       }
-    })
+    } catch (e) {
+      console.error('Invalid response from git worker:', line.slice(0, 200))
+    }
+  })
 
-    pythonProcess.on('error', (error) => {
+  workerProcess.stderr.on('data', (data) => {
+    console.error('Git worker error:', data.toString())
+  })
+
+  const handleExit = (message) => {
+    if (gitWorker === workerProcess) {
+      gitWorker = null
+    }
+    gitPendingRequests.forEach(pending => pending.reject({ error: message, success: false }))
+    gitPendingRequests.clear()
+  }
+
+  workerProcess.on('close', (code) => handleExit(`Git worker exited with code ${code}`))
+  workerProcess.on('error', (error) => handleExit(error.message))
+
+  gitWorker = workerProcess
+  return gitWorker
+}
+
+// onEvent receives intermediate events (e.g. push/pull progress); onStart
+// receives the request id, which cancelGitOperation() accepts. stream asks
+// list commands (log, diffs, file tree) to send their entries as records,
+// which are assembled here instead of arriving as one huge line.
+async function runGitOperation(command, repoPath, args = [], { onEvent, onStart, stream = false } = {}) {
+  return new Promise((resolve, reject) => {
+    const id = ++gitRequestId
+    gitPendingRequests.set(id, { resolve, reject, onEvent })
+    if (onStart) onStart(id)
+
+    try {
+      const request = { id, command, repo: repoPath, args: args.map(String) }
+      if (stream) request.stream = true
+      getGitWorker().stdin.write(JSON.stringify(request) + '\n')
+    } catch (error) {
+      gitPendingRequests.delete(id)
       reject({ error: error.message, success: false })
-    })
+    }
   })
 }
 
+function cancelGitOperation(id) {
+  if (gitWorker && gitPendingRequests.has(id)) {
+    gitWorker.stdin.write(JSON.stringify({ cancel: id }) + '\n')
+  }
+}
+
+// Running push/pull request ids by repository, for cancel-transfer
+const activeTransfers = new Map()
+
+async function runTransfer(event, command, repoPath, args) {
+  try {
+    return await runGitOperation(command, repoPath, args, {
+      onStart: (id) => activeTransfers.set(repoPath, id),
+      onEvent: (progress) => {
+        if (!event.sender.isDestroyed()) {
+          event.sender.send('git-progress', { repoPath, command, ...progress })
+        }
+      }
+    })
+  } finally {
+    activeTransfers.delete(repoPath)
+  }
+}
+
 // IPC Handlers
 ipcMain.handle('get-repo-status', async (event, repoPath) => {
   try {
-    const status = await runPythonScript('git_operations.py', ['status', repoPath])
+    const status = await runGitOperation('status', repoPath)
     return status
   } catch (error) {
     return { error: error.message, success: false }
@@ -182,7 +331,7 @@ ipcMain.handle('get-repo-status', async (event, repoPath) => {
 
 ipcMain.handle('init-repository', async (event, repoPath) => {
   try {
-    const result = await runPythonScript('git_operations.py', ['init', repoPath])
+    const result = await runGitOperation('init', repoPath)
     return result
   } catch (error) {
     return { error: error.message, success: false }
@@ -191,9 +340,7 @@ ipcMain.handle('init-repository', async (event, repoPath) => {
 
 ipcMain.handle('commit-changes', async (event, { repoPath, message, files = [] }) => {
   try {
-    const result = await runPythonScript('git_operations.py', [
-      'commit',
-      repoPath,
+    const result = await runGitOperation('commit', repoPath, [
       message,
       ...files
     ])
@@ -203,21 +350,47 @@ ipcMain.handle('commit-changes', async (event, { repoPath, message, files = [] }
   }
 })
 
-ipcMain.handle('generate-ai-commit', async (event, { repoPath, changes }) => {
+// Running ai-commit request ids by repository, for cancel-ai-commit
+const activeAICommits = new Map()
+
+// Runs in the git worker, which keeps its HTTP session (and connections) open;
+// refresh skips the response cache, e.g. for "Regenerate". With stream, text
+// is forwarded as 'ai-commit-delta' events while the model writes it.
+ipcMain.handle('generate-ai-commit', async (event, { repoPath, changes, refresh = false, stream = false }) => {
+  let changesFile = null
   try {
-    const result = await runPythonScript('ai_commit.py', [
-      repoPath,
-      JSON.stringify(changes)
-    ])
+    changesFile = await writePayloadFile('changes', changes)
+    const result = await runGitOperation('ai-commit', repoPath, [
+      `@${changesFile}`,
+      ...(refresh ? ['--refresh'] : []),
+      ...(stream ? ['--stream'] : [])
+    ], {
+      onStart: (id) => activeAICommits.set(repoPath, id),
+      onEvent: (delta) => {
+        if (!event.sender.isDestroyed()) {
+          event.sender.send('ai-commit-delta', { repoPath, ...delta })
+        }
+      }
+    })
     return result
   } catch (error) {
     return { error: error.message, success: false }
+  } finally {
+    activeAICommits.delete(repoPath)
+    if (changesFile) fs.rm(changesFile, { force: true }).catch(() => {})
   }
 })
 
-ipcMain.handle('get-commit-history', async (event, repoPath, limit = 50) => {
+ipcMain.handle('cancel-ai-commit', async (event, repoPath) => {
+  const id = activeAICommits.get(repoPath)
+  if (id === undefined) return { success: false, error: 'No commit message being generated' }
+  cancelGitOperation(id)
+  return { success: true }
+})
+
+ipcMain.handle('get-commit-history', async (event, repoPath, limit = 50, cursor = null) => {
   try {
-    const history = await runPythonScript('git_operations.py', ['log', repoPath, limit])
+    const history = await runGitOperation('log', repoPath, cursor ? [limit, cursor] : [limit], { stream: true })
     return history
   } catch (error) {
     return { error: error.message, success: false }
@@ -226,9 +399,7 @@ ipcMain.handle('get-commit-history', async (event, repoPath, limit = 50) => {
 
 ipcMain.handle('get-file-diff', async (event, { repoPath, filePath }) => {
   try {
-    const diff = await runPythonScript('git_operations.py', [
-      'diff',
-      repoPath,
+    const diff = await runGitOperation('diff', repoPath, [
       filePath
     ])
     return diff
@@ -237,11 +408,43 @@ ipcMain.handle('get-file-diff', async (event, { repoPath, filePath }) => {
   }
 })
 
+ipcMain.handle('get-structured-diff', async (event, { repoPath, filePath, staged = false, offset = 0, limit = 20, hunkOffset = 0 }) => {
+  try {
+    const args = [
+      ...(filePath ? [filePath] : []),
+      ...(staged ? ['--staged'] : []),
+      `--offset=${offset}`,
+      `--limit=${limit}`,
+      `--hunk-offset=${hunkOffset}`
+    ]
+    const diff = await runGitOperation('diff-structured', repoPath, args, { stream: true })
+    return diff
+  } catch (error) {
+    return { error: error.message, success: false }
+  }
+})
+
+ipcMain.handle('get-diff-set', async (event, { repoPath, mode = 'all' }) => {
+  try {
+    const result = await runGitOperation('diff-set', repoPath, [`--mode=${mode}`], { stream: true })
+    return result
+  } catch (error) {
+    return { error: error.message, success: false }
+  }
+})
+
+ipcMain.handle('get-diff-set-file', async (event, { repoPath, setId, index }) => {
+  try {
+    const result = await runGitOperation('diff-set-file', repoPath, [setId, index])
+    return result
+  } catch (error) {
+    return { error: error.message, success: false }
+  }
+})
+
 ipcMain.handle('push-changes', async (event, { repoPath, remote = 'origin', branch = 'main' }) => {
   try {
-    const result = await runPythonScript('git_operations.py', [
-      'push',
-      repoPath,
+    const result = await runTransfer(event, 'push', repoPath, [
       remote,
       branch
     ])
@@ -253,9 +456,7 @@ ipcMain.handle('push-changes', async (event, { repoPath, remote = 'origin', bran
 
 ipcMain.handle('pull-changes', async (event, { repoPath, remote = 'origin', branch = 'main' }) => {
   try {
-    const result = await runPythonScript('git_operations.py', [
-      'pull',
-      repoPath,
+    const result = await runTransfer(event, 'pull', repoPath, [
       remote,
       branch
     ])
@@ -265,6 +466,39 @@ ipcMain.handle('pull-changes', async (event, { repoPath, remote = 'origin', bran
   }
 })
 
+ipcMain.handle('get-workspace-status', async (event, { root, repos = [], maxAge }) => {
+  try {
+    const args = [...repos]
+    if (maxAge !== undefined) args.push(`--max-age=${maxAge}`)
+
+    return await runGitOperation('workspace-status', root, args, {
+      onEvent: (update) => {
+        if (!event.sender.isDestroyed()) {
+          event.sender.send('workspace-status-update', { root, ...update })
+        }
+      }
+    })
+  } catch (error) {
+    return { error: error.message, success: false }
+  }
+})
+
+// Histograms of every git call the worker has made (see tracing.py)
+ipcMain.handle('get-git-stats', async (event, { reset = false } = {}) => {
+  try {
+    return await runGitOperation('stats', process.cwd(), reset ? ['--reset'] : [])
+  } catch (error) {
+    return { error: error.message, success: false }
+  }
+})
+
+ipcMain.handle('cancel-transfer', async (event, repoPath) => {
+  const id = activeTransfers.get(repoPath)
+  if (id === undefined) return { success: false, error: 'No transfer in progress' }
+  cancelGitOperation(id)
+  return { success: true }
+})
+
 ipcMain.handle('start-file-watcher', async (event, repoPath) => {
   try {
     // Kill existing watcher for this repo if it exists
@@ -273,20 +507,21 @@ ipcMain.handle('start-file-watcher', async (event, repoPath) => {
       pythonProcesses.delete(repoPath)
     }
 
-    const pythonPath = process.platform === 'win32' ? 'python' : 'python3'
-    const scriptPath = path.join(__dirname, 'python', 'file_watcher.py')
-
-    const pythonProcess = spawn(pythonPath, [scriptPath, repoPath], {
-      env: { ...process.env, PYTHONUNBUFFERED: '1' },
-      stdio: ['pipe', 'pipe', 'pipe']
-    })
+    const pythonProcess = spawnPython('file_watcher', [repoPath])
 
     pythonProcesses.set(repoPath, pythonProcess)
 
+    // Batched change messages can span several stdout chunks
+    let watcherBuffer = ''
     pythonProcess.stdout.on('data', (data) => {
-      const changes = data.toString().trim().split('\n')
+      // Let the worker's status cache know the worktree moved on
+      runGitOperation('invalidate', repoPath).catch(() => {})
+
+      watcherBuffer += data.toString()
+      const changes = watcherBuffer.split('\n')
+      watcherBuffer = changes.pop()
       changes.forEach(change => {
-        if (change) {
+        if (change.trim()) {
           mainWindow.webContents.send('file-change-detected', change)
         }
       })
@@ -356,7 +591,16 @@ ipcMain.handle('select-directory', async () => {
 
 ipcMain.handle('get-file-tree', async (event, repoPath) => {
   try {
-    const result = await runPythonScript('git_operations.py', ['file-tree', repoPath])
+    const result = await runGitOperation('file-tree', repoPath, [], { stream: true })
+    return result
+  } catch (error) {
+    return { error: error.message, success: false }
+  }
+})
+
+ipcMain.handle('list-directory', async (event, { repoPath, dirPath = '.' }) => {
+  try {
+    const result = await runGitOperation('list-dir', repoPath, [dirPath])
     return result
   } catch (error) {
     return { error: error.message, success: false }
@@ -365,7 +609,7 @@ ipcMain.handle('get-file-tree', async (event, repoPath) => {
 
 ipcMain.handle('git-command', async (event, { repoPath, command, args = [] }) => {
   try {
-    const result = await runPythonScript('git_operations.py', [command, repoPath, ...args])
+    const result = await runGitOperation(command, repoPath, args)
     return result
   } catch (error) {
     return { error: error.message, success: false }
@@ -375,13 +619,10 @@ ipcMain.handle('git-command', async (event, { repoPath, command, args = [] }) =>
 // Add these with other IPC handlers in electron/main.js
 
 // Stage file
-ipcMain.handle('stage-file', async (event, { repoPath, filePath }) => {
+ipcMain.handle('stage-file', async (event, { repoPath, filePath, filePaths }) => {
   try {
-    const result = await runPythonScript('git_operations.py', [
-      'stage',
-      repoPath,
-      filePath
-    ])
+    // filePaths stages a whole batch in one git invocation
+    const result = await runGitOperation('stage', repoPath, filePaths || [filePath])
     return result
   } catch (error) {
     return { error: error.message, success: false }
@@ -391,10 +632,7 @@ ipcMain.handle('stage-file', async (event, { repoPath, filePath }) => {
 // Stage all files
 ipcMain.handle('stage-all', async (event, repoPath) => {
   try {
-    const result = await runPythonScript('git_operations.py', [
-      'stage-all',
-      repoPath
-    ])
+    const result = await runGitOperation('stage-all', repoPath)
     return result
   } catch (error) {
     return { error: error.message, success: false }
@@ -402,13 +640,10 @@ ipcMain.handle('stage-all', async (event, repoPath) => {
 })
 
 // Unstage file
-ipcMain.handle('unstage-file', async (event, { repoPath, filePath }) => {
+ipcMain.handle('unstage-file', async (event, { repoPath, filePath, filePaths }) => {
   try {
-    const result = await runPythonScript('git_operations.py', [
-      'unstage',
-      repoPath,
-      filePath
-    ])
+    // filePaths stages a whole batch in one git invocation
+    const result = await runGitOperation('unstage', repoPath, filePaths || [filePath])
     return result
   } catch (error) {
     return { error: error.message, success: false }
@@ -418,10 +653,7 @@ ipcMain.handle('unstage-file', async (event, { repoPath, filePath }) => {
 // Unstage all files
 ipcMain.handle('unstage-all', async (event, repoPath) => {
   try {
-    const result = await runPythonScript('git_operations.py', [
-      'unstage-all',
-      repoPath
-    ])
+    const result = await runGitOperation('unstage-all', repoPath)
     return result
   } catch (error) {
     return { error: error.message, success: false }
@@ -429,13 +661,10 @@ ipcMain.handle('unstage-all', async (event, repoPath) => {
 })
 
 // Add untracked file
-ipcMain.handle('add-untracked-file', async (event, { repoPath, filePath }) => {
+ipcMain.handle('add-untracked-file', async (event, { repoPath, filePath, filePaths }) => {
   try {
-    const result = await runPythonScript('git_operations.py', [
-      'add-untracked',
-      repoPath,
-      filePath
-    ])
+    // filePaths stages a whole batch in one git invocation
+    const result = await runGitOperation('add-untracked', repoPath, filePaths || [filePath])
     return result
   } catch (error) {
     return { error: error.message, success: false }
@@ -445,10 +674,7 @@ ipcMain.handle('add-untracked-file', async (event, { repoPath, filePath }) => {
 // Add all untracked files
 ipcMain.handle('add-all-untracked', async (event, repoPath) => {
   try {
-    const result = await runPythonScript('git_operations.py', [
-      'add-all-untracked',
-      repoPath
-    ])
+    const result = await runGitOperation('add-all-untracked', repoPath)
     return result
   } catch (error) {
     return { error: error.message, success: false }
@@ -465,6 +691,16 @@ app.on('before-quit', () => {
     }
   })
   pythonProcesses.clear()
+
+  if (gitWorker) {
+    gitWorker.stdin.end()
+    gitWorker = null
+  }
+
+  if (payloadDir) {
+    fsSync.rmSync(payloadDir, { recursive: true, force: true })
+    payloadDir = null
+  }
 })
 
 // App lifecycle
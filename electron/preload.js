@@ -7,14 +7,22 @@ contextBridge.exposeInMainWorld('electronAPI', {
   findGitRepo: (startPath) => ipcRenderer.invoke('find-git-repo', startPath),
   selectDirectory: () => ipcRenderer.invoke('select-directory'),
   getFileTree: (repoPath) => ipcRenderer.invoke('get-file-tree', repoPath),
+  listDirectory: (data) => ipcRenderer.invoke('list-directory', data),
 
   // Git operations
   commitChanges: (data) => ipcRenderer.invoke('commit-changes', data),
   generateAICommit: (data) => ipcRenderer.invoke('generate-ai-commit', data),
-  getCommitHistory: (repoPath, limit) => ipcRenderer.invoke('get-commit-history', repoPath, limit),
+  cancelAICommit: (repoPath) => ipcRenderer.invoke('cancel-ai-commit', repoPath),
+  getCommitHistory: (repoPath, limit, cursor) => ipcRenderer.invoke('get-commit-history', repoPath, limit, cursor),
   getFileDiff: (data) => ipcRenderer.invoke('get-file-diff', data),
+  getStructuredDiff: (data) => ipcRenderer.invoke('get-structured-diff', data),
+  getDiffSet: (data) => ipcRenderer.invoke('get-diff-set', data),
+  getDiffSetFile: (data) => ipcRenderer.invoke('get-diff-set-file', data),
   pushChanges: (data) => ipcRenderer.invoke('push-changes', data),
   pullChanges: (data) => ipcRenderer.invoke('pull-changes', data),
+  cancelTransfer: (repoPath) => ipcRenderer.invoke('cancel-transfer', repoPath),
+  getWorkspaceStatus: (data) => ipcRenderer.invoke('get-workspace-status', data),
+  getGitStats: (options) => ipcRenderer.invoke('get-git-stats', options),
   gitCommand: (data) => ipcRenderer.invoke('git-command', data),
 
   // File watching
@@ -25,6 +33,18 @@ contextBridge.exposeInMainWorld('electronAPI', {
     ipcRenderer.on('file-change-detected', callback)
     return () => ipcRenderer.removeListener('file-change-detected', callback)
   },
+  onWorkspaceStatus: (callback) => {
+    ipcRenderer.on('workspace-status-update', callback)
+    return () => ipcRenderer.removeListener('workspace-status-update', callback)
+  },
+  onGitProgress: (callback) => {
+    ipcRenderer.on('git-progress', callback)
+    return () => ipcRenderer.removeListener('git-progress', callback)
+  },
+  onAICommitDelta: (callback) => {
+    ipcRenderer.on('ai-commit-delta', callback)
+    return () => ipcRenderer.removeListener('ai-commit-delta', callback)
+  },
   onOpenRepository: (callback) => ipcRenderer.on('open-repository', callback),
   onInitRepository: (callback) => ipcRenderer.on('init-repository', callback),
   onCommitChanges: (callback) => ipcRenderer.on('commit-changes', callback),
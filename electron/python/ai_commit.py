@@ -1,18 +1,155 @@
 #!/usr/bin/env python3
+from __future__ import annotations
+
 import json
 import sys
 import os
-import requests
-from typing import Dict, List, Any, Optional
-from pathlib import Path
+import threading
+import time
+
+from payload import is_payload_ref, iter_json_values, open_payload
+from response_cache import ResponseCache, cache_key, default_cache_dir
+
+# Annotations are never evaluated, so typing is only imported for type
+# checkers; `requests` (with urllib3 and ssl) is imported only once a
+# request is actually about to be sent
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Dict, List, Any, Optional, Callable, Iterable, Iterator
+    from git_operations import GitOperations
+
+def normalize_changes(changes: Iterable[Any]) -> List[Dict[str, str]]:
+    """Changes as {'status', 'file'} dicts; bare paths count as modified.
+
+    Other fields are dropped, so normalizing entries as they stream in
+    keeps only what the prompt and cache key need.
+    """
+    return [{'status': change.get('status', 'M'), 'file': change.get('file', '')} if isinstance(change, dict)
+            else {'status': 'M', 'file': str(change)}
+            for change in changes]
+
+def read_changes(source: str) -> List[Dict[str, str]]:
+    """Changes from JSON text, or from `-`/`@<path>` normalized entry by entry as they are read."""
+    if is_payload_ref(source):
+        with open_payload(source) as stream:
+            return normalize_changes(iter_json_values(stream))
+    return normalize_changes(json.loads(source))
+
+def iter_sse_data(chunks: Iterable[bytes]) -> Iterator[str]:
+    """The `data:` payloads of a server-sent event stream as they arrive; comments and other fields are skipped."""
+    pending = b''
+    for chunk in chunks:
+        lines = (pending + chunk).split(b'\n')
+        pending = lines.pop()
+        for line in lines:
+            if line.startswith(b'data:'):
+                yield line[5:].strip().decode('utf-8')
 
 class AICommitGenerator:
-    def __init__(self, openrouter_api_key: Optional[str] = None):
+    """Commit messages from an OpenAI-compatible chat completions API.
+
+    Meant to be long-lived (the git worker keeps one): every request goes
+    through one pooled HTTP session, so only the first pays for the TCP and
+    TLS handshakes. Successful responses are cached on disk, keyed by the
+    change set and the model parameters.
+    """
+
+    MODEL = 'openai/gpt-3.5-turbo'
+    TEMPERATURE = 0.7
+    MAX_TOKENS = 150
+    TIMEOUT = 30
+    # Seconds without new text before a streamed completion counts as stalled
+    STALL_TIMEOUT = 10
+    POOL_SIZE = 4
+    # Prompt budget for the diff context (see commit_context.py)
+    CONTEXT_TOKENS = 3000
+    # Bump when the prompt changes, so messages cached for the old one are not reused
+    PROMPT_VERSION = 2
+
+    def __init__(self, openrouter_api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 cache: Optional[ResponseCache] = None):
         self.api_key = openrouter_api_key or os.getenv('OPENROUTER_API_KEY')
-        self.base_url = "https://openrouter.ai/api/v1"
+        self.base_url = (base_url or os.getenv('OPENROUTER_BASE_URL') or "https://openrouter.ai/api/v1").rstrip('/')
+        self.cache = cache if cache is not None else ResponseCache(default_cache_dir() / 'ai-commit')
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """The pooled requests.Session, created on first use."""
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.POOL_SIZE)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.headers.update({
+                    'Authorization': f'Bearer {self.api_key}',
+                    'HTTP-Referer': 'http://localhost:3000',
+                    'X-Title': 'Modern Git GUI'
+                })
+                self._session = session
+            return self._session
+
+    def close(self):
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def request_parameters(self) -> Dict[str, Any]:
+        return {'model': self.MODEL, 'temperature': self.TEMPERATURE, 'max_tokens': self.MAX_TOKENS}
+
+    def change_set_key(self, changes: List[Dict[str, str]], repo_path: Optional[str] = None,
+                       context: Any = None) -> str:
+        """Cache key of a change set and the diff context sent with it.
 
-    def generate_commit_message(self, changes: List[Dict[str, str]]) -> Dict[str, Any]:
-        """Generate AI commit message using OpenRouter API."""
+        Each change counts with its status, path and (given the repository)
+        the file's size and mtime. `context` is the context text, or any
+        JSON-serializable stand-in that determines it.
+        """
+        normalized = set()
+        for change in changes:
+            file_path = change.get('file', '')
+            signature = None
+            if repo_path:
+                try:
+                    stat = os.stat(os.path.join(repo_path, file_path))
+                    signature = (stat.st_size, stat.st_mtime_ns)
+                except OSError:
+                    pass
+            normalized.add((change.get('status', 'M'), file_path, signature))
+
+        return cache_key(self.PROMPT_VERSION, self.base_url, self.request_parameters(),
+                         sorted(normalized, key=repr), context)
+
+    def cached_message(self, key: str, on_delta: Optional[Callable[[str], None]] = None) -> Optional[Dict[str, Any]]:
+        """The cached answer for `key` (passed to `on_delta` whole), or None."""
+        cached = self.cache.get(key)
+        if cached is None:
+            return None
+        if on_delta is not None:
+            on_delta(cached['message'])
+        return dict(cached, cached=True)
+
+    def generate_commit_message(self, changes: List[Dict[str, str]], repo_path: Optional[str] = None,
+                                refresh: bool = False, context: Optional[str] = None,
+                                on_delta: Optional[Callable[[str], None]] = None,
+                                cancel: Optional[threading.Event] = None,
+                                key: Optional[str] = None) -> Dict[str, Any]:
+        """Generate AI commit message using OpenRouter API.
+
+        `context` (from commit_context.build_commit_context) replaces the
+        plain file list in the prompt. An unchanged change set is answered
+        from the cache unless `refresh` is set; a refreshed answer replaces
+        the cached one. `key` overrides the cache key, which by default
+        covers the change set and `context`. With `on_delta`, the
+        completion is streamed and each piece of text is passed on as it
+        arrives (see _stream()).
+        """
 
         if not self.api_key:
             return {
@@ -21,6 +158,14 @@ class AICommitGenerator:
                 'message': None
             }
 
+        changes = normalize_changes(changes)
+        if key is None:
+            key = self.change_set_key(changes, repo_path, context)
+        if not refresh:
+            cached = self.cached_message(key, on_delta)
+            if cached is not None:
+                return cached
+
         # Format changes for the prompt
         change_summary = []
         for change in changes:
@@ -35,10 +180,11 @@ class AICommitGenerator:
 
             change_summary.append(f"- {status_text}: {file_path}")
 
-        changes_text = '\n'.join(change_summary)
+        changes_text = context or '\n'.join(change_summary)
+        described = 'these changed files and selected diff hunks' if context else 'these changes'
 
         # Create the prompt
-        prompt = f"""Generate a concise, professional Git commit message based on these changes:
+        prompt = f"""Generate a concise, professional Git commit message based on {described}:
 
 {changes_text}
 
@@ -52,51 +198,38 @@ The commit message should:
 Provide only the commit message, no explanations."""
 
         try:
-            headers = {
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json',
-                'HTTP-Referer': 'http://localhost:3000',
-                'X-Title': 'Modern Git GUI'
-            }
+            data = dict(self.request_parameters(), messages=[
+                {
+                    'role': 'system',
+                    'content': 'You are a helpful assistant that generates professional Git commit messages.'
+                },
+                {
+                    'role': 'user',
+                    'content': prompt
+                }
+            ])
 
-            data = {
-                'model': 'openai/gpt-3.5-turbo',
-                'messages': [
-                    {
-                        'role': 'system',
-                        'content': 'You are a helpful assistant that generates professional Git commit messages.'
-                    },
-                    {
-                        'role': 'user',
-                        'content': prompt
-                    }
-                ],
-                'temperature': 0.7,
-                'max_tokens': 150
-            }
+            if on_delta is not None:
+                return self._stream(key, data, on_delta, cancel)
 
-            response = requests.post(
+            response = self.session.post(
                 f'{self.base_url}/chat/completions',
-                headers=headers,
                 json=data,
-                timeout=30
+                timeout=self.TIMEOUT
             )
 
             if response.status_code == 200:
                 result = response.json()
-                message = result['choices'][0]['message']['content'].strip()
+                message = self.clean_message(result['choices'][0]['message']['content'])
 
-                # Clean up the message
-                message = message.replace('```', '').strip()
-                if message.startswith('"') and message.endswith('"'):
-                    message = message[1:-1]
-
-                return {
+                generated = {
                     'success': True,
                     'message': message,
                     'model': result.get('model', 'unknown'),
                     'usage': result.get('usage', {})
                 }
+                self.cache.put(key, generated)
+                return dict(generated, cached=False)
             else:
                 return {
                     'success': False,
@@ -111,8 +244,123 @@ Provide only the commit message, no explanations."""
                 'message': None
             }
 
+    def _stream(self, key: str, data: Dict[str, Any], on_delta: Callable[[str], None],
+                cancel: Optional[threading.Event]) -> Dict[str, Any]:
+        """Request a streamed completion and relay its text to `on_delta`.
+
+        A watcher thread stops the stream once `cancel` is set or no text has
+        arrived for STALL_TIMEOUT seconds; keep-alive comments do not count,
+        so a server that holds the connection open without producing text is
+        still caught. Stopped streams are reported with `cancelled` or
+        `stalled` set and are not cached.
+        """
+        if cancel is not None and cancel.is_set():
+            return {'success': False, 'error': 'Cancelled', 'cancelled': True, 'message': None}
+
+        started = time.monotonic()
+        response = self.session.post(
+            f'{self.base_url}/chat/completions',
+            json=dict(data, stream=True),
+            stream=True,
+            timeout=(self.TIMEOUT, self.STALL_TIMEOUT)
+        )
+        if response.status_code != 200:
+            return {
+                'success': False,
+                'error': f'API error: {response.status_code} - {response.text}',
+                'message': None
+            }
+
+        progress = {'last_text': time.monotonic(), 'stopped': None}
+        finished = threading.Event()
+
+        def watch():
+            while not finished.wait(0.1):
+                if cancel is not None and cancel.is_set():
+                    progress['stopped'] = 'cancelled'
+                elif time.monotonic() - progress['last_text'] > self.STALL_TIMEOUT:
+                    progress['stopped'] = 'stalled'
+                else:
+                    continue
+                self._abort(response)
+                return
+
+        threading.Thread(target=watch, daemon=True).start()
+        parts: List[str] = []
+        model, usage, first_text_ms = None, {}, None
+        completed = False
+        try:
+            for payload in iter_sse_data(response.iter_content(chunk_size=None)):
+                if payload == '[DONE]':
+                    break
+                event = json.loads(payload)
+                if event.get('error'):
+                    error = event['error']
+                    raise RuntimeError(error.get('message', str(error)) if isinstance(error, dict) else str(error))
+
+                model = event.get('model') or model
+                usage = event.get('usage') or usage
+                for choice in event.get('choices') or []:
+                    text = (choice.get('delta') or {}).get('content')
+                    if text:
+                        if first_text_ms is None:
+                            first_text_ms = (time.monotonic() - started) * 1000
+                        progress['last_text'] = time.monotonic()
+                        parts.append(text)
+                        on_delta(text)
+            completed = True
+        except Exception:
+            if not progress['stopped']:
+                raise
+        finally:
+            finished.set()
+            response.close()
+
+        if not completed and progress['stopped'] == 'cancelled':
+            return {'success': False, 'error': 'Cancelled', 'cancelled': True, 'message': None}
+        if not completed:
+            return {
+                'success': False,
+                'error': f'Generation stalled: no text for {self.STALL_TIMEOUT} seconds',
+                'stalled': True,
+                'message': None
+            }
+
+        message = self.clean_message(''.join(parts))
+        if not message:
+            return {'success': False, 'error': 'The model returned an empty message', 'message': None}
+
+        generated = {
+            'success': True,
+            'message': message,
+            'model': model or 'unknown',
+            'usage': usage
+        }
+        self.cache.put(key, generated)
+        return dict(generated, cached=False, first_text_ms=round(first_text_ms or 0.0, 1))
+
+    @staticmethod
+    def _abort(response):
+        """Close a streaming response from another thread; shutting the socket down wakes the blocked read."""
+        import socket
+
+        try:
+            response.raw.connection.sock.shutdown(socket.SHUT_RDWR)
+        except (AttributeError, OSError):
+            pass
+        response.close()
+
+    @staticmethod
+    def clean_message(message: str) -> str:
+        """Strip code fences and surrounding quotes the model may add."""
+        message = message.strip().replace('```', '').strip()
+        if message.startswith('"') and message.endswith('"'):
+            message = message[1:-1]
+        return message
+
     def generate_fallback_message(self, changes: List[Dict[str, str]]) -> str:
         """Generate a simple commit message without AI."""
+        changes = normalize_changes(changes)
         added = sum(1 for c in changes if c.get('status') == 'A')
         modified = sum(1 for c in changes if c.get('status') == 'M')
         deleted = sum(1 for c in changes if c.get('status') == 'D')
@@ -130,37 +378,83 @@ Provide only the commit message, no explanations."""
         else:
             return "chore: Update files"
 
+def generate_with_fallback(generator: AICommitGenerator, changes: List[Any], git_ops: Optional[GitOperations] = None,
+                           refresh: bool = False, context_tokens: Optional[int] = None,
+                           on_delta: Optional[Callable[[str], None]] = None,
+                           cancel: Optional[threading.Event] = None) -> Dict[str, Any]:
+    """AI commit message for the changes, or the simple fallback message if that fails.
+
+    With `git_ops`, the prompt carries the repository's diff context in at
+    most `context_tokens` (default CONTEXT_TOKENS) tokens. With `on_delta`
+    the message is streamed; a stalled stream falls back too, a cancelled
+    one is reported as such.
+
+    The diff context is only built on a cache miss: the cache key covers
+    the change set, HEAD and the index checksum, which determine it.
+    """
+    context = None
+    key = None
+    repo_path = str(git_ops.repo_path) if git_ops is not None else None
+    if generator.api_key and git_ops is not None:
+        from commit_context import build_commit_context
+
+        context_tokens = context_tokens or generator.CONTEXT_TOKENS
+        key = generator.change_set_key(normalize_changes(changes), repo_path,
+                                       [git_ops.tree_state_key(), context_tokens])
+        if not refresh:
+            cached = generator.cached_message(key, on_delta)
+            if cached is not None:
+                return cached
+
+        context = build_commit_context(git_ops, context_tokens)
+        if not context['success'] or not context['files']:
+            context = None
+
+    result = generator.generate_commit_message(changes, repo_path, refresh, context and context['text'],
+                                               on_delta, cancel, key)
+    if result.get('cancelled'):
+        return result
+    if result['success']:
+        if context:
+            result['context'] = {key: value for key, value in context.items() if key not in ('success', 'text')}
+        return result
+
+    return {
+        'success': True,
+        'message': generator.generate_fallback_message(changes),
+        'model': 'fallback',
+        'usage': {},
+        'warning': 'Using fallback message: ' + result.get('error', '')
+    }
+
 def main():
     if len(sys.argv) < 3:
         print(json.dumps({
             'success': False,
-            'error': 'Missing arguments: repo_path changes_json',
+            'error': 'Missing arguments: repo_path changes_json|-|@file',
             'message': None
         }))
         sys.exit(1)
 
     repo_path = sys.argv[1]
-    changes_json = sys.argv[2]
 
     try:
-        changes = json.loads(changes_json)
+        # Large change sets come from stdin (-) or a file (@path), parsed as they are read
+        changes = read_changes(sys.argv[2])
 
-        # Initialize generator
         generator = AICommitGenerator()
+        git_ops = None
+        if generator.api_key:
+            from git_operations import GitOperations
+            git_ops = GitOperations(repo_path)
 
-        # Try to generate AI commit
-        result = generator.generate_commit_message(changes)
-
-        # Fallback to simple message if AI fails
-        if not result['success']:
-            fallback_message = generator.generate_fallback_message(changes)
-            result = {
-                'success': True,
-                'message': fallback_message,
-                'model': 'fallback',
-                'usage': {},
-                'warning': 'Using fallback message: ' + result.get('error', '')
-            }
+        # --stream prints each piece of text as an {"event": ...} line before the result
+        on_delta = None
+        if '--stream' in sys.argv[3:]:
+            on_delta = lambda text: print(json.dumps({'event': {'type': 'delta', 'text': text}}), flush=True)
+
+        result = generate_with_fallback(generator, changes, git_ops, refresh='--refresh' in sys.argv[3:],
+                                        on_delta=on_delta)
 
         print(json.dumps(result))
 
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""Diff context for AI commit prompts, fitted into a token budget.
+
+One `git diff --raw --numstat` pass lists every file with its status and
+line counts. Lockfiles, generated files, binaries, deletions and pure
+renames are reduced to that one line; for the rest a second `git diff`
+is parsed into hunks, which are ranked by how much they say about the
+change per token and added best-first until the budget is spent.
+"""
+from __future__ import annotations
+
+import math
+import re
+
+from git_operations import EMPTY_TREE
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Dict, List, Optional
+    from git_operations import GitOperations
+
+# Rough size of a token in characters; good enough for budgeting English and code
+CHARS_PER_TOKEN = 4
+
+DEFAULT_BUDGET_TOKENS = 3000
+
+# At most this share of the budget goes to the per-file list
+FILE_LIST_SHARE = 0.4
+
+# Hunks are cut to this many lines in the prompt
+MAX_HUNK_LINES = 40
+
+# Per-file parse caps; the prompt never needs more than this
+MAX_FILE_BYTES = 64 * 1024
+MAX_FILE_LINES = 2000
+
+# Above this many files, the second diff is not narrowed by pathspecs
+MAX_PATHSPECS = 200
+
+LOCKFILES = {
+    'package-lock.json', 'npm-shrinkwrap.json', 'yarn.lock', 'pnpm-lock.yaml', 'bun.lockb',
+    'Cargo.lock', 'Gemfile.lock', 'composer.lock', 'poetry.lock', 'Pipfile.lock', 'uv.lock',
+    'go.sum', 'flake.lock', 'mix.lock', 'pubspec.lock', 'Podfile.lock', 'packages.lock.json'
+}
+GENERATED_SUFFIXES = (
+    '.min.js', '.min.css', '.map', '.snap', '.pb.go', '_pb2.py', '_pb2.pyi', '.g.dart',
+    '.designer.cs', '.generated.ts', '.generated.js'
+)
+GENERATED_DIRS = {'dist', 'build', 'out', 'vendor', 'node_modules', 'generated', '__generated__', '.next'}
+
+# Changed lines that (re)define or import something say the most about a change
+DEFINITION = re.compile(
+    r'^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?(?:pub(?:\([^)]*\))?\s+)?'
+    r'(?:def|class|function|func|fn|interface|struct|enum|trait|impl|type|module|import|from|package|'
+    r'public|private|protected|static|const|let|var)\b'
+)
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def summary_reason(entry: Dict[str, Any]) -> Optional[str]:
+    """Why a file gets one line instead of hunks, or None if its hunks are worth showing."""
+    path = entry['file']
+    name = path.rsplit('/', 1)[-1]
+    if name in LOCKFILES:
+        return 'lockfile'
+    if path.endswith(GENERATED_SUFFIXES) or GENERATED_DIRS.intersection(path.split('/')[:-1]):
+        return 'generated'
+    if entry['binary']:
+        return 'binary'
+    if entry['status'] == 'D':
+        return 'deleted'
+    if entry['status'] in ('R', 'C') and not entry['additions'] and not entry['deletions']:
+        return 'renamed' if entry['status'] == 'R' else 'copied'
+    return None
+
+def read_numstat(git_ops: GitOperations, diff_args: List[str]) -> List[Dict[str, Any]]:
+    """Status, paths and line counts of every changed file, from one `git diff`."""
+    records = git_ops.iter_git_records(
+        ['-c', 'core.quotePath=false', 'diff'] + diff_args + ['-M', '--raw', '--numstat', '-z']
+    )
+    files: List[Dict[str, Any]] = []
+    counted = 0
+    for record in records:
+        if record.startswith(':'):
+            # ":<old mode> <new mode> <old oid> <new oid> <status>", then one or two paths
+            status = record.rsplit(' ', 1)[-1][:1]
+            old_file = next(records)
+            new_file = next(records) if status in ('R', 'C') else old_file
+            files.append({
+                'status': status, 'file': new_file, 'old_file': old_file,
+                'additions': 0, 'deletions': 0, 'binary': False
+            })
+        elif record:
+            added, deleted, path = record.split('\t', 2)
+            if not path:
+                # Renames and copies: both paths follow as records of their own
+                next(records)
+                next(records)
+            if counted < len(files):
+                entry = files[counted]
+                if added == '-':
+                    entry['binary'] = True
+                else:
+                    entry['additions'], entry['deletions'] = int(added), int(deleted)
+            counted += 1
+    return files
+
+def score_hunk(hunk: Dict[str, Any]) -> float:
+    """Information value of a hunk: changed lines (with diminishing returns) and definitions."""
+    changed = [line for line in hunk['lines'] if line['type'] in ('added', 'removed') and line['content'].strip()]
+    if not changed:
+        return 0.0
+
+    added = sorted(line['content'].strip() for line in changed if line['type'] == 'added')
+    removed = sorted(line['content'].strip() for line in changed if line['type'] == 'removed')
+    if added == removed:
+        # Whitespace or indentation only
+        return 0.1
+
+    score = math.sqrt(len(changed))
+    score += 2 * sum(1 for line in changed if DEFINITION.match(line['content']))
+    # git names the enclosing function after the second @@
+    if hunk['header'].rsplit('@@', 1)[-1].strip():
+        score += 1
+    return score
+
+def render_hunk(hunk: Dict[str, Any]) -> str:
+    prefixes = {'added': '+', 'removed': '-', 'context': ' ', 'info': '\\'}
+    lines = [hunk['header']]
+    lines += [prefixes.get(line['type'], ' ') + line['content'] for line in hunk['lines'][:MAX_HUNK_LINES]]
+    if len(hunk['lines']) > MAX_HUNK_LINES:
+        lines.append(f'[{len(hunk["lines"]) - MAX_HUNK_LINES} more lines]')
+    return '\n'.join(lines)
+
+def file_line(entry: Dict[str, Any], reason: Optional[str]) -> str:
+    if entry['status'] in ('R', 'C'):
+        line = f'{entry["status"]} {entry["old_file"]} -> {entry["file"]}'
+    else:
+        line = f'{entry["status"]} {entry["file"]}'
+
+    if entry['binary']:
+        counts = 'binary'
+    else:
+        counts = f'+{entry["additions"]} -{entry["deletions"]}'
+    if reason in ('lockfile', 'generated'):
+        return f'{line} ({counts}, {reason}; diff omitted)'
+    if reason in ('renamed', 'copied'):
+        return f'{line} ({reason}, content unchanged)'
+    return f'{line} ({counts})'
+
+def _file_list(files: List[Dict[str, Any]], reasons: List[Optional[str]], budget: int) -> str:
+    """One line per file, cut off with a totals line once `budget` tokens are used."""
+    lines = [f'Files changed ({len(files)}, +{sum(entry["additions"] for entry in files)} '
+             f'-{sum(entry["deletions"] for entry in files)}):']
+    used = estimate_tokens(lines[0])
+    for index, (entry, reason) in enumerate(zip(files, reasons)):
+        line = file_line(entry, reason)
+        if used + estimate_tokens(line) > budget:
+            rest = files[index:]
+            lines.append(f'... and {len(rest)} more files (+{sum(entry["additions"] for entry in rest)} '
+                         f'-{sum(entry["deletions"] for entry in rest)})')
+            break
+        lines.append(line)
+        used += estimate_tokens(line) + 1
+    return '\n'.join(lines)
+
+def _parse_hunks(git_ops: GitOperations, diff_args: List[str], detailed: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Parsed diff files for the entries in `detailed`, in git's order."""
+    from diff_parser import iter_diff_files
+
+    args = ['-c', 'core.quotePath=false', 'diff'] + diff_args + ['--no-color', '--no-ext-diff', '-M', '-U2']
+    if len(detailed) <= MAX_PATHSPECS:
+        pathspecs = set()
+        for entry in detailed:
+            # Both sides of a rename, so it is still detected as one
+            pathspecs.update((entry['old_file'], entry['file']))
+        args += ['--'] + [f':(literal){path}' for path in sorted(pathspecs)]
+
+    wanted = {entry['file'] for entry in detailed}
+    records = git_ops.iter_git_records(args, separator=b'\n')
+    try:
+        return [diff_file for diff_file, _ in iter_diff_files(records, MAX_FILE_BYTES, MAX_FILE_LINES)
+                if diff_file['file'] in wanted]
+    finally:
+        records.close()
+
+def build_commit_context(git_ops: GitOperations, budget_tokens: int = DEFAULT_BUDGET_TOKENS,
+                         mode: str = 'auto') -> Dict[str, Any]:
+    """Prompt text describing a change set in at most about `budget_tokens` tokens.
+
+    `mode` is 'staged' (index vs HEAD), 'all' (worktree vs HEAD) or 'auto',
+    which is 'staged' unless nothing is staged.
+    """
+    try:
+        if mode not in ('auto', 'staged', 'all'):
+            return {'success': False, 'error': f'Unknown context mode: {mode}'}
+
+        files = read_numstat(git_ops, ['--cached']) if mode != 'all' else []
+        if mode == 'auto':
+            mode = 'staged' if files else 'all'
+        if mode == 'staged':
+            diff_args = ['--cached']
+        else:
+            diff_args = [git_ops._get_head_hash() or EMPTY_TREE]
+            files = read_numstat(git_ops, diff_args)
+
+        reasons = [summary_reason(entry) for entry in files]
+        file_list = _file_list(files, reasons, int(budget_tokens * FILE_LIST_SHARE))
+        remaining = budget_tokens - estimate_tokens(file_list) - estimate_tokens('\nSelected hunks:')
+
+        detailed = [entry for entry, reason in zip(files, reasons) if reason is None]
+        candidates = []
+        if detailed and remaining > 0:
+            for file_index, diff_file in enumerate(_parse_hunks(git_ops, diff_args, detailed)):
+                for hunk_index, hunk in enumerate(diff_file['hunks']):
+                    text = render_hunk(hunk)
+                    cost = estimate_tokens(text) + 1
+                    # The first hunk of each file counts extra, so the budget covers more files
+                    score = score_hunk(hunk) * (1.5 if hunk_index == 0 else 1.0)
+                    candidates.append({
+                        'file': diff_file['file'],
+                        'order': (file_index, hunk_index),
+                        'text': text,
+                        'cost': cost,
+                        'value': score / cost
+                    })
+
+        # Best value per token first; whatever does not fit is skipped for smaller ones
+        chosen = []
+        shown_files = set()
+        for candidate in sorted(candidates, key=lambda candidate: -candidate['value']):
+            if candidate['value'] <= 0:
+                break
+            cost = candidate['cost']
+            if candidate['file'] not in shown_files:
+                cost += estimate_tokens(f'--- {candidate["file"]}') + 1
+            if cost > remaining:
+                continue
+            remaining -= cost
+            chosen.append(candidate)
+            shown_files.add(candidate['file'])
+
+        sections = [file_list]
+        if chosen:
+            sections.append('\nSelected hunks:')
+        current_file = None
+        for candidate in sorted(chosen, key=lambda candidate: candidate['order']):
+            if candidate['file'] != current_file:
+                current_file = candidate['file']
+                sections.append(f'--- {current_file}')
+            sections.append(candidate['text'])
+        text = '\n'.join(sections)
+
+        return {
+            'success': True,
+            'mode': mode,
+            'text': text,
+            'tokens': estimate_tokens(text),
+            'budget': budget_tokens,
+            'files': len(files),
+            'summarized': sum(1 for reason in reasons if reason is not None),
+            'hunks': len(chosen),
+            'hunks_total': len(candidates)
+        }
+
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import re
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Dict, List, Any, Optional, Iterable, Iterator, Tuple
+
+HUNK_HEADER = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@(.*)')
+LFS_POINTER = 'version https://git-lfs.github.com/spec/'
+OCTAL_ESCAPE = re.compile(r'[0-7]{3}')
+
+LINE_TYPES = {'+': 'added', '-': 'removed', ' ': 'context', '\\': 'info'}
+
+def unquote_path(path: str) -> str:
+    """Undo git's C-style quoting of unusual file names ("a\\tb" -> a<TAB>b)."""
+    if not (len(path) >= 2 and path[0] == '"' and path[-1] == '"'):
+        return path
+
+    escapes = {'a': 7, 'b': 8, 't': 9, 'n': 10, 'v': 11, 'f': 12, 'r': 13, '"': 34, '\\': 92}
+    data = bytearray()
+    body = path[1:-1]
+    i = 0
+    while i < len(body):
+        c = body[i]
+        if c == '\\' and i + 1 < len(body):
+            nxt = body[i + 1]
+            if OCTAL_ESCAPE.match(body, i + 1):
+                data.append(int(body[i + 1:i + 4], 8))
+                i += 4
+                continue
+            data.append(escapes.get(nxt, ord(nxt)))
+            i += 2
+        else:
+            data.extend(c.encode('utf-8', errors='surrogateescape'))
+            i += 1
+    return data.decode('utf-8', errors='surrogateescape')
+
+def _header_path(value: str) -> Optional[str]:
+    """Path from a '--- a/x' / '+++ b/x' line, or None for /dev/null."""
+    if value.startswith('"'):
+        value = unquote_path(value)
+    else:
+        # git appends a TAB after names containing spaces
+        value = value[:-1] if value.endswith('\t') else value
+    if value == '/dev/null':
+        return None
+    return value[2:] if value[:2] in ('a/', 'b/') else value
+
+def _git_header_paths(header: str) -> Tuple[Optional[str], Optional[str]]:
+    """Best-effort paths from 'diff --git a/x b/x' (used when no ---/+++ follow)."""
+    rest = header[len('diff --git '):]
+    if rest.startswith('"'):
+        end = rest.index('"', 1)
+        while rest[end - 1] == '\\':
+            end = rest.index('"', end + 1)
+        return _header_path(rest[:end + 1]), _header_path(rest[end + 2:])
+
+    # Unquoted and unrenamed: "a/P b/P", so P is half of what is left
+    if rest.startswith('a/') and len(rest) % 2 == 1:
+        half = (len(rest) - 5) // 2
+        path = rest[2:2 + half]
+        if rest[2 + half:] == f' b/{path}':
+            return path, path
+    return None, None
+
+class _DiffFile:
+    """Accumulates one file of a streamed diff under size caps."""
+
+    def __init__(self, header: str, max_bytes: int, max_lines: int, store: bool, hunk_offset: int):
+        self.old_file, self.new_file = _git_header_paths(header)
+        self.status = 'M'
+        self.binary = False
+        self.lfs = False
+        self.hunks: List[Dict[str, Any]] = []
+        self.additions = 0
+        self.deletions = 0
+        self.hunk_count = 0
+        self.bytes = 0
+        self.lines = 0
+        self.truncated = False
+        self.more_hunks = 0
+        self.more_lines = 0
+        self.max_bytes = max_bytes
+        self.max_lines = max_lines
+        self.store = store
+        self.hunk_offset = hunk_offset
+        self.hunk: Optional[Dict[str, Any]] = None
+        self.in_header = True
+        self.old_line = 0
+        self.new_line = 0
+
+    def feed(self, line: str):
+        if line.startswith('@@'):
+            self._start_hunk(line)
+        elif self.in_header:
+            self._header_line(line)
+        else:
+            self._hunk_line(line)
+
+    def _header_line(self, line: str):
+        if line.startswith('new file mode'):
+            self.status = 'A'
+        elif line.startswith('deleted file mode'):
+            self.status = 'D'
+        elif line.startswith('rename from '):
+            self.status = 'R'
+            self.old_file = unquote_path(line[len('rename from '):])
+        elif line.startswith('rename to '):
+            self.new_file = unquote_path(line[len('rename to '):])
+        elif line.startswith('copy from '):
+            self.status = 'C'
+            self.old_file = unquote_path(line[len('copy from '):])
+        elif line.startswith('copy to '):
+            self.new_file = unquote_path(line[len('copy to '):])
+        elif line.startswith('Binary files ') or line == 'GIT binary patch':
+            self.binary = True
+        elif line.startswith('--- '):
+            self.old_file = _header_path(line[4:])
+        elif line.startswith('+++ '):
+            self.new_file = _header_path(line[4:])
+
+    def _start_hunk(self, line: str):
+        self.in_header = False
+        self.hunk_count += 1
+        self.hunk = None
+
+        if not self.store or self.hunk_count <= self.hunk_offset:
+            return
+        if self.truncated:
+            self.more_hunks += 1
+            return
+
+        match = HUNK_HEADER.match(line)
+        if match:
+            old_start, old_count, new_start, new_count, _ = match.groups()
+            self.old_line, self.new_line = int(old_start), int(new_start)
+            self.hunk = {
+                'header': line,
+                'old_start': int(old_start),
+                'old_count': int(old_count) if old_count is not None else 1,
+                'new_start': int(new_start),
+                'new_count': int(new_count) if new_count is not None else 1,
+                'lines': []
+            }
+        else:
+            # Combined (merge conflict) diffs use @@@ headers; keep them verbatim
+            self.hunk = {'header': line, 'lines': []}
+        self.hunks.append(self.hunk)
+        self._account(line)
+
+    def _hunk_line(self, line: str):
+        prefix = line[:1]
+        if prefix == '+':
+            self.additions += 1
+        elif prefix == '-':
+            self.deletions += 1
+        if not self.lfs and line.startswith(LFS_POINTER, 1):
+            self.lfs = True
+
+        if self.hunk is None:
+            return
+        if self.truncated:
+            self.more_lines += 1
+            return
+        if not self._account(line):
+            self.more_lines += 1
+            return
+
+        entry = {'type': LINE_TYPES.get(prefix, 'info'), 'content': line[1:]}
+        if prefix in ('-', ' '):
+            entry['old_line'] = self.old_line
+            self.old_line += 1
+        if prefix in ('+', ' '):
+            entry['new_line'] = self.new_line
+            self.new_line += 1
+        self.hunk['lines'].append(entry)
+
+    def _account(self, line: str) -> bool:
+        """Charge a line against the caps; False once they are exceeded."""
+        self.bytes += len(line) + 1
+        self.lines += 1
+        if self.bytes > self.max_bytes or self.lines > self.max_lines:
+            self.truncated = True
+            return False
+        return True
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            'file': self.new_file if self.new_file is not None else self.old_file,
+            'old_file': self.old_file,
+            'new_file': self.new_file,
+            'status': self.status,
+            'binary': self.binary,
+            'lfs': self.lfs,
+            'additions': self.additions,
+            'deletions': self.deletions,
+            'hunk_count': self.hunk_count,
+            'hunks': self.hunks,
+            'truncated': self.truncated,
+            'more_hunks': self.more_hunks,
+            'more_lines': self.more_lines
+        }
+
+def iter_diff_files(lines: Iterable[str], max_bytes: int = 256 * 1024, max_lines: int = 5000,
+                    skip: int = 0, hunk_offset: int = 0) -> Iterator[Tuple[Dict[str, Any], bool]]:
+    """Parse `git diff` output line by line, yielding (file, more_follows) per file.
+
+    Each file is yielded as soon as the next one starts, so callers can stop
+    reading (and stop git) once they have a page. Lines beyond `max_bytes`
+    (counted in decoded characters) or `max_lines` per file are dropped and
+    counted in `more_lines`/`more_hunks`. The first `skip` files are parsed
+    without keeping their lines.
+    """
+    current: Optional[_DiffFile] = None
+    index = 0
+
+    for line in lines:
+        if line.startswith('diff --git ') or line.startswith('diff --cc '):
+            if current is not None:
+                yield current.result(), True
+                index += 1
+            current = _DiffFile(line, max_bytes, max_lines, index >= skip, hunk_offset)
+        elif current is not None:
+            current.feed(line)
+
+    if current is not None:
+        yield current.result(), False
@@ -3,83 +3,396 @@ import os
 import sys
 import time
 import json
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
 import subprocess
 
-class GitFileChangeHandler(FileSystemEventHandler):
-    def __init__(self, repo_path):
+from ignore_rules import IgnoreMatcher
+from tracing import tracer
+
+# Above this many paths a single full `git status` is cheaper than a pathspec list
+MAX_PATHSPECS = 200
+
+# Each top-level directory gets its own recursive watch; past this many,
+# fall back to one recursive watch on the root
+MAX_TOP_LEVEL_WATCHES = 32
+
+# Event types and status codes are stored as small integers in EventStateCache
+EVENT_TYPES = ('created', 'modified', 'deleted', 'moved', 'closed', 'opened', 'closed_no_write')
+
+class EventStateCache:
+    """Bounded record of the last reported (event type, git status) per path.
+
+    Entries are evicted least-recently-used once `max_entries` is reached.
+    Each entry is a single int packing an event type id and an interned
+    status code id, so a long-running watcher's state stays flat.
+    """
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # rel_path -> event_id << 8 | status_id
+        self.status_codes = []        # status_id -> code
+        self.status_ids = {}          # code -> status_id
+        self.key_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def update(self, rel_path, event_type, git_status):
+        """Record the latest state; return False if it is unchanged (a hit)."""
+        record = self._event_id(event_type) << 8 | self._status_id(git_status)
+
+        previous = self.entries.get(rel_path)
+        if previous is not None:
+            self.entries.move_to_end(rel_path)
+            if previous == record:
+                self.hits += 1
+                return False
+        else:
+            self.key_bytes += sys.getsizeof(rel_path)
+
+        self.misses += 1
+        self.entries[rel_path] = record
+
+        while len(self.entries) > self.max_entries:
+            evicted, _ = self.entries.popitem(last=False)
+            self.key_bytes -= sys.getsizeof(evicted)
+            self.evictions += 1
+
+        return True
+
+    def stats(self):
+        return {
+            'entries': len(self.entries),
+            'max_entries': self.max_entries,
+            'status_codes': len(self.status_codes),
+            'approx_bytes': sys.getsizeof(self.entries) + self.key_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+    @staticmethod
+    def _event_id(event_type):
+        try:
+            return EVENT_TYPES.index(event_type)
+        except ValueError:
+            return len(EVENT_TYPES)
+
+    def _status_id(self, git_status):
+        status_id = self.status_ids.get(git_status)
+        if status_id is None:
+            # Porcelain codes are a small closed set; cap just in case
+            if len(self.status_codes) >= 255:
+                return 255
+            status_id = len(self.status_codes)
+            self.status_codes.append(git_status)
+            self.status_ids[git_status] = status_id
+        return status_id
+
+def emit(message):
+    """Write one JSON message line to stdout."""
+    sys.stdout.write(json.dumps(message) + '\n')
+    sys.stdout.flush()
+
+class GitFileChangeHandler:
+    """Collect filesystem events and report them as batched deltas.
+
+    Paths are coalesced until no new event has arrived for `quiet_window`
+    seconds (or `max_delay` seconds after the first one, so a never-ending
+    burst still reports). Each batch costs one `git status` call and one
+    output message, however many events it contains.
+
+    watchdog only ever calls dispatch(), so this does not subclass its
+    FileSystemEventHandler and watchdog is imported only once the initial
+    scan has been reported.
+    """
+
+    def __init__(self, repo_path, quiet_window=0.3, max_delay=2.0, max_batch=1000, max_tracked=10000):
         self.repo_path = Path(repo_path)
-        self.last_events = {}
+        self.quiet_window = quiet_window
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self.last_events = EventStateCache(max_tracked)
+        self.ignore = IgnoreMatcher(repo_path)
+
+        # Set by watch_repository() when watches are scheduled per directory
+        self.observer = None
+        self.watched = {}  # top-level dir -> ObservedWatch
+
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.pending = {}  # rel_path -> last event type
+        self.first_event_at = None
+        self.last_event_at = None
+
+        self.flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self.flusher.start()
+
+    def dispatch(self, event):
+        self.on_any_event(event)
 
     def on_any_event(self, event):
         try:
-            # Skip .git directory
-            if '.git' in str(event.src_path):
-                return
-
-            # Skip if this is a directory event
+            # Directory events only maintain the per-directory watches
             if event.is_directory:
+                if event.event_type == 'created':
+                    self._watch_new_directory(event.src_path)
+                elif event.event_type == 'deleted':
+                    self._unwatch_directory(event.src_path)
+                elif event.event_type == 'moved':
+                    self._unwatch_directory(event.src_path)
+                    self._watch_new_directory(event.dest_path, moved_from=event.src_path)
                 return
 
-            # Get relative path from repo
-            try:
-                rel_path = str(Path(event.src_path).relative_to(self.repo_path)) # type: ignore
-            except ValueError:
-                return  # File not in repository
+            paths = [event.src_path]
+            if getattr(event, 'dest_path', None):
+                paths.append(event.dest_path)
 
-            # Check git status
-            git_status = self.get_git_status(rel_path)
+            for path in paths:
+                rel_path = self._relative_path(path)
+                if rel_path is None:
+                    continue
 
-            # Only report if status changed
-            current_status = f"{event.event_type}:{git_status}"
-            last_status = self.last_events.get(rel_path)
-
-            if current_status != last_status:
-                self.last_events[rel_path] = current_status
-
-                # Output change as JSON
-                change_info = {
-                    'path': rel_path,
-                    'event': event.event_type,
-                    'git_status': git_status,
-                    'timestamp': time.time(),
-                    'is_directory': False
-                }
+                if rel_path == '.gitignore' or rel_path.endswith('/.gitignore'):
+                    self.ignore.reload()
+                    self.sync_watches()
+                elif self.ignore.is_ignored(rel_path):
+                    continue
 
-                print(json.dumps(change_info))
-                sys.stdout.flush()
+                self._queue(rel_path, event.event_type)
 
         except Exception as e:
             # Don't crash on errors, just log
-            error_info = {
+            emit({
                 'error': str(e),
                 'path': event.src_path if hasattr(event, 'src_path') else 'unknown'
-            }
-            print(json.dumps(error_info))
-            sys.stdout.flush()
+            })
 
-    def get_git_status(self, file_path):
-        """Check git status of a file."""
+    def _relative_path(self, path):
+        """Repository-relative path, or None for paths outside it or inside .git."""
         try:
-            result = subprocess.run(
-                ['git', '-C', str(self.repo_path), 'status', '--porcelain', file_path],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            rel_path = Path(path).relative_to(self.repo_path)  # type: ignore
+        except ValueError:
+            return None  # File not in repository
+
+        if '.git' in rel_path.parts:
+            return None
+
+        return rel_path.as_posix()
+
+    def top_level_dirs(self):
+        """Top-level directories that git does not ignore."""
+        return [
+            entry.name for entry in os.scandir(self.repo_path)
+            if entry.is_dir(follow_symlinks=False) and entry.name != '.git'
+            and not self.ignore.is_ignored(entry.name, is_dir=True)
+        ]
+
+    def watch_directory(self, rel_dir):
+        """Add a recursive watch for a top-level directory."""
+        if self.observer is None or rel_dir in self.watched:
+            return
+        self.watched[rel_dir] = self.observer.schedule(self, str(self.repo_path / rel_dir), recursive=True)
+
+    def sync_watches(self):
+        """Watch exactly the top-level directories the current ignore rules allow.
+
+        Directories that stop being ignored are scanned, since their files
+        show up in git without any filesystem event.
+        """
+        if self.observer is None:
+            return
+        wanted = set(self.top_level_dirs())
+        for rel_dir in [rel_dir for rel_dir in self.watched if rel_dir not in wanted]:
+            self._unschedule(rel_dir)
+        for rel_dir in sorted(wanted.difference(self.watched)):
+            self.watch_directory(rel_dir)
+            self._scan_directory(rel_dir, 'created')
+
+    def _watch_new_directory(self, path, moved_from=None):
+        """Pick up top-level directories created or moved in after startup.
+
+        Files can land in the directory before its watch exists (a checkout,
+        an `mv` into the repository), so its contents are queued too.
+        """
+        rel_dir = self._relative_path(path)
+        if (self.observer is None or not rel_dir or '/' in rel_dir
+                or self.ignore.is_ignored(rel_dir, is_dir=True)):
+            return
+        self.watch_directory(rel_dir)
+        old_dir = self._relative_path(moved_from) if moved_from else None
+        self._scan_directory(rel_dir, 'moved' if moved_from else 'created', old_dir)
 
-            if result.returncode == 0 and result.stdout.strip():
-                status = result.stdout.strip()[0:2]
-                return status.strip()
+    def _scan_directory(self, rel_dir, event_type, moved_from=None):
+        """Queue every non-ignored file below a directory.
 
+        For a directory moved from `moved_from`, each file's old path is
+        queued as well, so the old location is reported as gone.
+        """
+        for root, dirs, files in os.walk(self.repo_path / rel_dir):
+            rel_root = Path(root).relative_to(self.repo_path).as_posix()
+            dirs[:] = [name for name in dirs if name != '.git'
+                       and not self.ignore.is_ignored(f'{rel_root}/{name}', is_dir=True)]
+            for name in files:
+                rel_path = f'{rel_root}/{name}'
+                if self.ignore.is_ignored(rel_path):
+                    continue
+                self._queue(rel_path, event_type)
+                if moved_from:
+                    self._queue(moved_from + rel_path[len(rel_dir):], event_type)
+
+    def _unwatch_directory(self, path):
+        rel_dir = self._relative_path(path)
+        if rel_dir:
+            self._unschedule(rel_dir)
+
+    def _unschedule(self, rel_dir):
+        watch = self.watched.pop(rel_dir, None)
+        if watch is not None:
+            try:
+                self.observer.unschedule(watch)
+            except Exception:
+                pass
+
+    def _queue(self, rel_path, event_type):
+        now = time.monotonic()
+        with self.lock:
+            self.pending[rel_path] = event_type
+            if self.first_event_at is None:
+                self.first_event_at = now
+            self.last_event_at = now
+        self.wakeup.set()
+
+    def _requeue(self, deferred):
+        """Queue paths again unless a newer event for them is already pending."""
+        now = time.monotonic()
+        with self.lock:
+            for rel_path, event_type in deferred.items():
+                self.pending.setdefault(rel_path, event_type)
+            if self.first_event_at is None:
+                self.first_event_at = now
+            self.last_event_at = now
+        self.wakeup.set()
+
+    def _flush_loop(self):
+        """Wait for a quiet window, then report everything collected so far."""
+        while True:
+            self.wakeup.wait()
+
+            with self.lock:
+                if not self.pending:
+                    self.wakeup.clear()
+                    continue
+
+                now = time.monotonic()
+                due = min(self.last_event_at + self.quiet_window,
+                          self.first_event_at + self.max_delay)
+                if now < due:
+                    batch = None
+                else:
+                    batch = self.pending
+                    self.pending = {}
+                    self.first_event_at = self.last_event_at = None
+
+            if batch is None:
+                time.sleep(due - now)
+                continue
+
+            try:
+                with tracer.operation('watcher-flush'):
+                    self.flush(batch)
+            except Exception as e:
+                emit({'error': f'Failed to report changes: {str(e)}'})
+
+    def flush(self, batch):
+        """Report one coalesced batch of {rel_path: event_type}.
+
+        At most `max_batch` changes go into one message; the paths after
+        that are queued again and reported in the next batch.
+        """
+        statuses = self.get_git_statuses(list(batch))
+
+        changes = []
+        deferred = {}
+        for rel_path, event_type in batch.items():
+            # Not yet recorded in last_events, so they are still reported later
+            if len(changes) >= self.max_batch:
+                deferred[rel_path] = event_type
+                continue
+
+            git_status = statuses.get(rel_path, '')
+
+            # Only report if status changed
+            if not self.last_events.update(rel_path, event_type, git_status):
+                continue
+
+            changes.append({
+                'path': rel_path,
+                'event': event_type,
+                'git_status': git_status,
+                'is_directory': False
+            })
+
+        if changes:
+            emit({
+                'event': 'batch',
+                'changes': changes,
+                'count': len(changes),
+                # Paths carried over to the next batch
+                'truncated': len(deferred),
+                'timestamp': time.time()
+            })
+
+        if deferred:
+            self._requeue(deferred)
+
+    def get_git_statuses(self, file_paths):
+        """Check git status of many files with a single `git status` call.
+
+        Returns {path: status}; clean files are absent.
+        """
+        args = ['--literal-pathspecs', '-C', str(self.repo_path),
+                'status', '--porcelain', '-z', '--untracked-files=all']
+        if len(file_paths) <= MAX_PATHSPECS:
+            args += ['--'] + file_paths
+
+        started = time.perf_counter()
+        try:
+            result = subprocess.run(['git'] + args, capture_output=True, timeout=10)
         except Exception:
-            pass
+            tracer.record(args, started, None)
+            return {}
+        tracer.record(args, started, result.returncode, len(result.stdout))
+
+        if result.returncode != 0:
+            return {}
+
+        return parse_porcelain_z(result.stdout)
+
+    def get_git_status(self, file_path):
+        """Check git status of a file."""
+        return self.get_git_statuses([file_path]).get(file_path, '')
 
-        return '??'  # Untracked by default
+def parse_porcelain_z(output):
+    """Parse `git status --porcelain -z` output into {path: status}."""
+    statuses = {}
+    records = iter(output.decode('utf-8', errors='surrogateescape').split('\0'))
+    for record in records:
+        if len(record) < 4:
+            continue
 
-def watch_repository(repo_path):
+        status = record[0:2]
+        statuses[record[3:]] = status.strip()
+
+        # Renames and copies are followed by their original path
+        if 'R' in status or 'C' in status:
+            next(records, None)
+
+    return statuses
+
+def watch_repository(repo_path, quiet_window=0.3):
     """Watch a repository for file changes."""
     if not os.path.exists(repo_path):
         print(json.dumps({'error': f'Repository not found: {repo_path}'}))
@@ -92,46 +405,63 @@ def watch_repository(repo_path):
     # Initial scan of modified files
     try:
         result = subprocess.run(
-            ['git', '-C', repo_path, 'status', '--porcelain'],
+            ['git', '-C', repo_path, 'status', '--porcelain', '-z'],
             capture_output=True,
-            text=True,
             timeout=10
         )
 
         if result.returncode == 0:
-            for line in result.stdout.strip().split('\n'):
-                if line.strip():
-                    status = line[0:2].strip()
-                    file_path = line[3:].strip()
-
-                    initial_info = {
-                        'path': file_path,
-                        'event': 'initial',
-                        'git_status': status,
-                        'timestamp': time.time(),
-                        'is_directory': False
-                    }
-
-                    print(json.dumps(initial_info))
-                    sys.stdout.flush()
+            changes = [
+                {
+                    'path': file_path,
+                    'event': 'initial',
+                    'git_status': status,
+                    'is_directory': False
+                }
+                for file_path, status in parse_porcelain_z(result.stdout).items()
+            ]
+
+            if changes:
+                emit({
+                    'event': 'batch',
+                    'changes': changes,
+                    'count': len(changes),
+                    'truncated': 0,
+                    'timestamp': time.time()
+                })
 
     except Exception as e:
         print(json.dumps({'error': f'Initial scan failed: {str(e)}'}))
         sys.stdout.flush()
 
     # Set up file watcher
-    event_handler = GitFileChangeHandler(repo_path)
+    from watchdog.observers import Observer
+
+    event_handler = GitFileChangeHandler(repo_path, quiet_window=quiet_window)
     observer = Observer()
 
-    # Watch all subdirectories
-    observer.schedule(event_handler, repo_path, recursive=True)
+    # Watch the root itself, then each top-level directory that git does not
+    # ignore, so trees like node_modules/ or build/ never get inotify watches
+    top_level = event_handler.top_level_dirs()
+
+    if len(top_level) > MAX_TOP_LEVEL_WATCHES:
+        observer.schedule(event_handler, repo_path, recursive=True)
+    else:
+        observer.schedule(event_handler, repo_path, recursive=False)
+        event_handler.observer = observer
+        for name in top_level:
+            event_handler.watch_directory(name)
 
     try:
         observer.start()
         print(json.dumps({'status': 'watching', 'path': repo_path}))
         sys.stdout.flush()
 
-        # Keep running
+        # Serve commands from stdin until it closes, then keep running
+        for line in iter(sys.stdin.readline, ''):
+            if line.strip() == 'stats':
+                emit({'event': 'stats', 'state': event_handler.last_events.stats(), 'git': tracer.stats()})
+
         while True:
             time.sleep(1)
 
@@ -151,7 +481,8 @@ def main():
         sys.exit(1)
 
     repo_path = sys.argv[1]
-    watch_repository(repo_path)
+    quiet_ms = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    watch_repository(repo_path, quiet_window=quiet_ms / 1000)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -1,59 +1,151 @@
 #!/usr/bin/env python3
+from __future__ import annotations
+
 import subprocess
 import json
 import sys
 import os
-import shutil
+import re
+import threading
+import time
 from pathlib import Path
-from typing import Dict, List, Any, Optional
-import datetime
+from collections import OrderedDict
+
+from repo_limiter import RepoLimiter, run_parallel
+from tracing import TRACE_DIR_ENV, tracer
+
+# Cold starts matter for the one-shot CLI: annotations are never evaluated,
+# so typing is only imported for type checkers, and the diff parser, graph
+# layout, workspace scanner and thread pools are imported where used
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Dict, List, Any, Optional, Iterable, Iterator, Callable
+    from workspace import Workspace
+    from ai_commit import AICommitGenerator
+
+# `git log` fields, separated by ASCII unit separators; commits are NUL-terminated (-z)
+LOG_FIELDS = ['hash', 'short_hash', 'author', 'email', 'date', 'parents', 'subject', 'body']
+LOG_FORMAT = '%x1f'.join(['%H', '%h', '%an', '%ae', '%ad', '%P', '%s', '%b'])
+
+# Per-file caps for structured diffs; larger files are truncated
+DIFF_MAX_BYTES = 256 * 1024
+DIFF_MAX_LINES = 5000
+
+# Object id of the empty tree, for diffing before the first commit
+EMPTY_TREE = '4b825dc642cb6eb9a060e54bf8d69288fbee4904'
+
+# Transfer progress as printed by git --progress (optionally relayed as "remote: ...")
+PROGRESS_LINE = re.compile(
+    r'^(?:remote:\s*)?([A-Za-z ]+):\s+(\d+)% \((\d+)/(\d+)\)'
+    r'(?:, ([\d.]+ (?:bytes|[KMGT]iB))(?: \| ([\d.]+ (?:bytes|[KMGT]iB)/s))?)?'
+)
+SIZE_UNITS = {'bytes': 1, 'KiB': 1024, 'MiB': 1024 ** 2, 'GiB': 1024 ** 3, 'TiB': 1024 ** 4}
+
+# Minimum seconds between progress events for the same phase
+PROGRESS_INTERVAL = 0.1
+
+# How git reports a path from --pathspec-from-file that matched nothing
+PATHSPEC_ERROR = re.compile(r"pathspec '(.*)' did not match any file")
+
+# Beyond this many paths, list the whole index rather than pass them all as argv
+MAX_PATHSPECS = 200
+
+# Commands that can stream their list result item by item (see record_stream),
+# and the result key the items belong under
+STREAMED_COMMANDS = {'log': 'commits', 'diff-structured': 'files', 'diff-set': 'files', 'file-tree': 'tree'}
 
 class GitOperations:
+    # Worktree edits are only visible to the status cache through watcher
+    # events; entries older than this are recomputed even if nothing was reported.
+    STATUS_CACHE_MAX_AGE = 5.0
+
+    # Paused `git log` processes kept around for cursor pagination
+    MAX_LOG_SESSIONS = 4
+
+    # Memory budget for cached per-file diffs
+    DIFF_CACHE_BYTES = 32 * 1024 * 1024
+
+    # Parsed changesets whose file bodies can still be fetched
+    MAX_DIFF_SETS = 4
+
+    # Read-only git processes allowed to run at once per repository
+    MAX_PARALLEL_READS = 4
+
     def __init__(self, repo_path: str):
         self.repo_path = Path(repo_path).resolve()
 
-    def run_git_command(self, args: List[str], capture_output: bool = True) -> Dict[str, Any]:
-        """Run a git command and return the result."""
+        # Bumped by file watcher events (see invalidate())
+        self.generation = 0
+
+        self._git_dirs = None
+        self._status_lock = threading.Lock()
+        self._status_cache = None  # (fingerprint, computed_at, status, {path: (head oid, index oid)})
+        self._remote_cache = None  # (config stat, remote output)
+
+        # Open `git log` streams keyed by cursor session, most recent last
+        self._log_lock = threading.Lock()
+        self._log_sessions: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+
+        # Rendered diffs keyed by the blob ids / worktree stat they came from
+        self._diff_lock = threading.Lock()
+        self._diff_cache: 'OrderedDict[tuple, tuple]' = OrderedDict()  # key -> (size, result)
+        self._diff_cache_bytes = 0
+        self._diff_sets: 'OrderedDict[str, List[Dict[str, Any]]]' = OrderedDict()
+
+        # Directory listing index, rebuilt whenever the cached status is
+        self._tree_lock = threading.Lock()
+        self._tree_index = None  # (status it was built from, index)
+        self._tree_paths = None  # (index stat and untracked files it was built from, children)
+
+        # Serializes our index writers and bounds concurrent readers
+        self.limiter = RepoLimiter(self.MAX_PARALLEL_READS)
+
+    def run_git_command(self, args: List[str], capture_output: bool = True,
+                        input_data: Optional[str] = None, timeout: Optional[float] = 30,
+                        cancel: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """Run a git command and return the result.
+
+        `input_data` is written to git's stdin (e.g. for --pathspec-from-file=-).
+        The command waits for its turn on the repository's limiter (index
+        writers run alone, reads run side by side). `timeout` of None means
+        no limit; setting `cancel` stops git early.
+        """
         try:
             full_args = ['git', '-C', str(self.repo_path)] + args
+            pipe = subprocess.PIPE if capture_output else None
 
-            if capture_output:
-                result = subprocess.run(
+            queued = time.perf_counter()
+            with self.limiter.gate(args):
+                started = time.perf_counter()
+                process = subprocess.Popen(
                     full_args,
-                    capture_output=True,
+                    stdin=subprocess.PIPE if input_data is not None else None,
+                    stdout=pipe,
+                    stderr=pipe,
                     text=True,
                     encoding='utf-8',
-                    timeout=30
+                    errors='surrogateescape'
                 )
+                stdout, stderr, stopped = self._communicate(process, input_data, timeout, cancel)
+                tracer.record(args, started, process.returncode,
+                              len(stdout or '') + len(stderr or ''), (started - queued) * 1000)
 
-                output = {
-                    'success': result.returncode == 0,
-                    'output': result.stdout.strip(),
-                    'error': result.stderr.strip(),
-                    'returncode': result.returncode
-                }
-            else:
-                # For commands that need real-time output
-                result = subprocess.run(
-                    full_args,
-                    timeout=30
-                )
-                output = {
-                    'success': result.returncode == 0,
+            if stopped:
+                return {
+                    'success': False,
                     'output': '',
-                    'error': '',
-                    'returncode': result.returncode
+                    'error': stopped,
+                    'returncode': 1,
+                    'cancelled': stopped == 'Cancelled'
                 }
 
-            return output
-
-        except subprocess.TimeoutExpired:
             return {
-                'success': False,
-                'output': '',
-                'error': 'Command timed out after 30 seconds',
-                'returncode': 1
+                'success': process.returncode == 0,
+                'output': (stdout or '').strip(),
+                'error': (stderr or '').strip(),
+                'returncode': process.returncode
             }
+
         except Exception as e:
             return {
                 'success': False,
@@ -62,45 +154,140 @@ class GitOperations:
                 'returncode': 1
             }
 
-    def get_status(self) -> Dict[str, Any]:
-        """Get detailed repository status."""
+    @staticmethod
+    def _communicate(process: subprocess.Popen, input_data: Optional[str],
+                     timeout: Optional[float], cancel: Optional[threading.Event]):
+        """Wait for a process, killing it on timeout or cancellation.
+
+        Returns (stdout, stderr, reason it was stopped or None).
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            wait = 0.1 if cancel is not None else None
+            if deadline is not None:
+                remaining = max(0.0, deadline - time.monotonic())
+                wait = remaining if wait is None else min(wait, remaining)
+
+            try:
+                stdout, stderr = process.communicate(input_data, timeout=wait)
+                return stdout, stderr, None
+            except subprocess.TimeoutExpired:
+                # Input has been handed over; later calls must not resend it
+                input_data = None
+
+            if cancel is not None and cancel.is_set():
+                reason = 'Cancelled'
+            elif deadline is not None and time.monotonic() >= deadline:
+                reason = f'Command timed out after {timeout} seconds'
+            else:
+                continue
+
+            process.kill()
+            process.communicate()
+            return None, None, reason
+
+    def iter_git_records(self, args: List[str], separator: bytes = b'\0',
+                         timeout: Optional[float] = 30, gated: bool = True) -> Iterator[str]:
+        """Run a git command and yield its output split on `separator` as it streams in.
+
+        Raises RuntimeError if git exits with a non-zero status or times out.
+        A timeout of None lets the command run (and sit paused) indefinitely.
+        The command holds a limiter slot until the generator finishes or is
+        closed; streams that may sit paused (log sessions) pass gated=False.
+        """
+        if not gated:
+            yield from self._iter_records(args, separator, timeout, 0.0)
+            return
+
+        queued = time.perf_counter()
+        with self.limiter.gate(args):
+            yield from self._iter_records(args, separator, timeout, (time.perf_counter() - queued) * 1000)
+
+    def _iter_records(self, args: List[str], separator: bytes, timeout: Optional[float],
+                      wait_ms: float) -> Iterator[str]:
+        full_args = ['git', '-C', str(self.repo_path)] + args
+        started = time.perf_counter()
+        process = subprocess.Popen(full_args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        received = 0
+        timed_out = threading.Event()
+
+        def kill():
+            timed_out.set()
+            process.kill()
+
+        timer = threading.Timer(timeout, kill) if timeout is not None else None
+        if timer:
+            timer.start()
+
         try:
-            # Get staged changes (--cached)
-            staged_result = self.run_git_command(['diff', '--name-status', '--cached'])
-            staged = self._parse_diff_status(staged_result['output']) if staged_result['success'] else []
-
-            # Get unstaged changes
-            unstaged_result = self.run_git_command(['diff', '--name-status'])
-            unstaged = self._parse_diff_status(unstaged_result['output']) if unstaged_result['success'] else []
-
-            # Get untracked files
-            untracked_result = self.run_git_command(['ls-files', '--others', '--exclude-standard'])
-            untracked = []
-            if untracked_result['success']:
-                untracked = [
-                    {'status': '??', 'file': file.strip()}
-                    for file in untracked_result['output'].split('\n')
-                    if file.strip()
-                ]
-
-            # Get current branch
-            branch_result = self.run_git_command(['branch', '--show-current'])
-            branch = branch_result['output'].strip() if branch_result['success'] else None
-
-            # Get remote info
-            remote_result = self.run_git_command(['remote', '-v'])
-            remote = remote_result['output'].strip() if remote_result['success'] else None
+            pending = b''
+            for chunk in iter(lambda: process.stdout.read1(65536), b''):
+                received += len(chunk)
+                records = (pending + chunk).split(separator)
+                pending = records.pop()
+                for record in records:
+                    yield record.decode('utf-8', errors='surrogateescape')
+
+            if pending:
+                yield pending.decode('utf-8', errors='surrogateescape')
+
+            stderr = process.stderr.read().decode('utf-8', errors='replace').strip()
+            returncode = process.wait()
+        finally:
+            if timer:
+                timer.cancel()
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+            process.stderr.close()
+            tracer.record(args, started, process.returncode, received, wait_ms)
+
+        if timed_out.is_set():
+            raise RuntimeError(f'Command timed out after {timeout} seconds')
+        if returncode != 0:
+            raise RuntimeError(stderr or f'git exited with code {returncode}')
+
+    def get_status(self, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """Get detailed repository status, served from cache when nothing changed.
+
+        `max_age` overrides STATUS_CACHE_MAX_AGE, the longest a cached status
+        is trusted while worktree edits may have gone unreported.
+        """
+        if max_age is None:
+            max_age = self.STATUS_CACHE_MAX_AGE
+
+        try:
+            with self._status_lock:
+                git_dir, common_dir = self._get_git_dirs()
+                fingerprint = self._status_fingerprint(git_dir, common_dir)
+
+                cached = self._status_cache
+                if (cached and cached[0] == fingerprint
+                        and time.monotonic() - cached[1] < max_age):
+                    status = dict(cached[2])
+                    # Remote info only goes stale when the config changes
+                    status['remote'] = self._get_remote(common_dir)
+                else:
+                    objects = {}
+                    status, remote = run_parallel(
+                        lambda: self._parse_status_v2(self.iter_git_records(
+                            ['status', '--porcelain=v2', '-z', '--branch', '--untracked-files=all']
+                        ), objects),
+                        lambda: self._get_remote(common_dir)
+                    )
+                    status['has_changes'] = bool(status['staged'] or status['unstaged'] or status['untracked'])
+                    # Keep the fingerprint taken before git ran, so an invalidate()
+                    # or index write that landed meanwhile still misses the cache;
+                    # only the upstream ref we just learned about is added
+                    fingerprint = fingerprint[:-1] + (self._upstream_ref(status, git_dir, common_dir),)
+                    self._status_cache = (fingerprint, time.monotonic(), status, objects)
+                    status = dict(status)
+                    status['remote'] = remote
 
             return {
                 'success': True,
-                'status': {
-                    'staged': staged,
-                    'unstaged': unstaged,
-                    'untracked': untracked,
-                    'branch': branch,
-                    'remote': remote,
-                    'has_changes': bool(staged or unstaged or untracked)
-                }
+                'status': status
             }
 
         except Exception as e:
@@ -110,30 +297,287 @@ class GitOperations:
                 'status': None
             }
 
-    def _parse_diff_status(self, output: str) -> List[Dict[str, str]]:
-        """Parse git diff --name-status output."""
-        files = []
-        for line in output.strip().split('\n'):
-            if line.strip():
-                parts = line.split('\t')
-                if len(parts) >= 2:
-                    files.append({
-                        'status': parts[0].strip(),
-                        'file': parts[1].strip()
-                    })
-        return files
+    def invalidate(self) -> Dict[str, Any]:
+        """Mark cached worktree state as stale (called on file watcher events)."""
+        self.generation += 1
+        return {'success': True, 'generation': self.generation}
 
-    def stage_file(self, file_path: str) -> Dict[str, Any]:
-        """Stage a specific file."""
+    def _get_git_dirs(self):
+        """Resolve and remember the repository's git dir and common dir."""
+        if self._git_dirs is None:
+            self._git_dirs = self._read_git_dirs()
+        if self._git_dirs is None:
+            result = self.run_git_command(['rev-parse', '--absolute-git-dir', '--git-common-dir'])
+            if not result['success']:
+                raise RuntimeError(result['error'] or 'Not a git repository')
+
+            git_dir, common_dir = result['output'].split('\n')
+            self._git_dirs = (Path(git_dir), (self.repo_path / common_dir).resolve())
+
+        return self._git_dirs
+
+    def _read_git_dirs(self):
+        """Read the git dirs of a worktree root from `.git` itself, saving a git process.
+
+        Returns None for anything but a plain `.git` directory or `gitdir:`
+        file (subdirectories, GIT_DIR overrides), which rev-parse handles.
+        """
+        if 'GIT_DIR' in os.environ or 'GIT_COMMON_DIR' in os.environ:
+            return None
+
+        dot_git = self.repo_path / '.git'
         try:
-            result = self.run_git_command(['add', file_path])
-            return result
+            if dot_git.is_dir():
+                git_dir = dot_git.resolve()
+            else:
+                content = dot_git.read_text().strip()
+                if not content.startswith('gitdir:'):
+                    return None
+                git_dir = (self.repo_path / content[len('gitdir:'):].strip()).resolve()
+
+            if not (git_dir / 'HEAD').exists():
+                return None
+            commondir = git_dir / 'commondir'
+            common_dir = (git_dir / commondir.read_text().strip()).resolve() if commondir.exists() else git_dir
+        except OSError:
+            return None
+        return git_dir, common_dir
+
+    def _status_fingerprint(self, git_dir: Path, common_dir: Path, status: Optional[Dict[str, Any]] = None) -> tuple:
+        """Cheap key covering everything `git status` output depends on.
+
+        Made of the index stat, HEAD and the ref it points to, packed-refs,
+        the watcher generation and, last, the upstream ref of `status` (the
+        cached status by default). Costs a few stat/read calls, no git process.
+        """
+        if status is None and self._status_cache:
+            status = self._status_cache[2]
+
+        head = self._read_git_file(git_dir / 'HEAD')
+        head_ref = self._read_ref(head[5:], git_dir, common_dir) if head and head.startswith('ref: ') else None
+
+        return (
+            self.generation,
+            self._stat_key(git_dir / 'index'),
+            head,
+            head_ref,
+            self._stat_key(common_dir / 'packed-refs'),
+            self._upstream_ref(status, git_dir, common_dir)
+        )
+
+    def tree_state_key(self) -> tuple:
+        """Cheap key of what is committed and staged: HEAD, its commit and the index checksum.
+
+        Reads a few files, no git process. Worktree edits are not covered.
+        """
+        git_dir, common_dir = self._get_git_dirs()
+        head = self._read_git_file(git_dir / 'HEAD')
+        head_ref = self._read_ref(head[5:], git_dir, common_dir) if head and head.startswith('ref: ') else None
+        return (head, head_ref, self._stat_key(common_dir / 'packed-refs'), self._index_checksum(git_dir / 'index'))
+
+    def _index_checksum(self, index_path: Path) -> Optional[str]:
+        """The hash git appends to the index file, or its stat when there is none (index.skipHash)."""
+        try:
+            with open(index_path, 'rb') as index_file:
+                index_file.seek(-32, os.SEEK_END)
+                trailer = index_file.read()
+        except OSError:
+            return None
+        if trailer[-20:].strip(b'\0'):
+            return trailer.hex()
+        return repr(self._stat_key(index_path))
+
+    def _upstream_ref(self, status: Optional[Dict[str, Any]], git_dir: Path, common_dir: Path) -> Optional[str]:
+        if status and status.get('upstream'):
+            return self._read_ref(f"refs/remotes/{status['upstream']}", git_dir, common_dir)
+        return None
+
+    def _get_remote(self, common_dir: Path) -> Optional[str]:
+        """Return `git remote -v` output, re-run only when the config changes."""
+        config_key = self._stat_key(common_dir / 'config')
+        if self._remote_cache and self._remote_cache[0] == config_key:
+            return self._remote_cache[1]
+
+        remote_result = self.run_git_command(['remote', '-v'])
+        remote = remote_result['output'].strip() if remote_result['success'] else None
+        self._remote_cache = (config_key, remote)
+        return remote
+
+    def _read_ref(self, ref: str, git_dir: Path, common_dir: Path) -> Optional[str]:
+        """Read a loose ref; packed refs are covered by the packed-refs stat."""
+        return self._read_git_file(git_dir / ref) or self._read_git_file(common_dir / ref)
+
+    @staticmethod
+    def _read_git_file(path: Path) -> Optional[str]:
+        try:
+            return path.read_text(encoding='utf-8', errors='replace').strip()
+        except OSError:
+            return None
+
+    @staticmethod
+    def _stat_key(path: Path) -> Optional[tuple]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _parse_status_v2(self, records: Iterable[str], objects: Optional[Dict[str, tuple]] = None) -> Dict[str, Any]:
+        """Parse NUL-separated `git status --porcelain=v2 --branch` records.
+
+        If `objects` is given it is filled with {path: (HEAD oid, index oid)}
+        for every changed tracked path.
+        """
+        if objects is None:
+            objects = {}
+
+        status = {
+            'staged': [],
+            'unstaged': [],
+            'untracked': [],
+            'conflicted': [],
+            'branch': None,
+            'head': None,
+            'upstream': None,
+            'ahead': 0,
+            'behind': 0
+        }
+
+        records = iter(records)
+        for record in records:
+            if not record:
+                continue
+
+            kind = record[0]
+            if kind == '#':
+                key, _, value = record[2:].partition(' ')
+                if key == 'branch.oid':
+                    status['head'] = None if value == '(initial)' else value
+                elif key == 'branch.head':
+                    status['branch'] = None if value == '(detached)' else value
+                elif key == 'branch.upstream':
+                    status['upstream'] = value
+                elif key == 'branch.ab':
+                    ahead, behind = value.split(' ')
+                    status['ahead'] = int(ahead)
+                    status['behind'] = -int(behind)
+            elif kind == '1':
+                fields = record.split(' ', 8)
+                self._add_status_entry(status, fields[1], fields[8])
+                objects[fields[8]] = (fields[6], fields[7])
+            elif kind == '2':
+                # Renames/copies carry the original path as the next record
+                fields = record.split(' ', 9)
+                orig_path = next(records, '')
+                self._add_status_entry(status, fields[1], fields[9], orig_path)
+                objects[fields[9]] = (fields[6], fields[7])
+            elif kind == 'u':
+                fields = record.split(' ', 10)
+                entry = {'status': 'U', 'file': fields[10], 'conflict': fields[1]}
+                status['conflicted'].append(entry)
+                status['unstaged'].append(entry)
+            elif kind == '?':
+                status['untracked'].append({'status': '??', 'file': record[2:]})
+
+        return status
+
+    def _add_status_entry(self, status: Dict[str, Any], xy: str, path: str, orig_path: Optional[str] = None):
+        """Record the index (X) and worktree (Y) halves of a porcelain v2 entry."""
+        index_status, worktree_status = xy[0], xy[1]
+
+        if index_status != '.':
+            entry = {'status': index_status, 'file': path}
+            if orig_path is not None:
+                entry['orig_file'] = orig_path
+            status['staged'].append(entry)
+
+        if worktree_status != '.':
+            status['unstaged'].append({'status': worktree_status, 'file': path})
+
+    def stage_files(self, file_paths: List[str]) -> Dict[str, Any]:
+        """Stage many paths with a single `git add`, reporting per-path failures."""
+        return self._run_pathspec_batch(['add', '-A'], file_paths, 'staged', self._unmatched_for_add)
+
+    def unstage_files(self, file_paths: List[str]) -> Dict[str, Any]:
+        """Unstage many paths with a single `git reset`; clean paths are a no-op."""
+        return self._run_pathspec_batch(['reset', '-q', 'HEAD'], file_paths, 'unstaged')
+
+    def _unmatched_for_add(self, paths: List[str]) -> Dict[str, str]:
+        """Paths `git add` would reject: neither on disk nor in the index."""
+        missing = [path for path in paths if not os.path.lexists(self.repo_path / path)]
+        if not missing:
+            return {}
+        pathspecs = ['--'] + missing if len(missing) <= MAX_PATHSPECS else []
+        result = self.run_git_command(['--literal-pathspecs', 'ls-files', '-z', '--cached'] + pathspecs)
+        if not result['success']:
+            return {}
+        tracked = self._listed_paths(result['output'])
+        return {path: 'Path did not match any files' for path in missing if path.rstrip('/') not in tracked}
+
+    @staticmethod
+    def _listed_paths(output: str) -> set:
+        """NUL-separated paths plus every directory above them, so directory pathspecs match."""
+        listed = set()
+        for path in output.split('\0'):
+            while path and path not in listed:
+                listed.add(path)
+                path = path.rpartition('/')[0]
+        return listed
+
+    def _run_pathspec_batch(self, args: List[str], file_paths: List[str], done_key: str,
+                            find_unmatched: Optional[Callable[[List[str]], Dict[str, str]]] = None) -> Dict[str, Any]:
+        """Run a pathspec-taking command once for a whole list of paths.
+
+        Paths go to git over stdin (NUL-separated, taken literally), so the
+        batch is not limited by argv size and the index lock is taken once.
+        `find_unmatched`, if given, weeds out paths the command would
+        reject before it runs; they are reported in `failed`.
+        Should git still reject a path, it is dropped and only the
+        remaining paths are retried.
+        """
+        try:
+            remaining = [path for path in file_paths if path]
+            unmatched = find_unmatched(remaining) if find_unmatched and remaining else {}
+            failed = [{'file': path, 'error': unmatched[path]} for path in remaining if path in unmatched]
+            remaining = [path for path in remaining if path not in unmatched]
+
+            while remaining:
+                result = self.run_git_command(
+                    ['--literal-pathspecs'] + args + ['--pathspec-from-file=-', '--pathspec-file-nul'],
+                    input_data='\0'.join(remaining)
+                )
+                if result['success']:
+                    break
+
+                match = PATHSPEC_ERROR.search(result['error'])
+                if not match or match.group(1) not in remaining:
+                    failed.extend({'file': path, 'error': result['error']} for path in remaining)
+                    remaining = []
+                    break
+
+                remaining.remove(match.group(1))
+                failed.append({'file': match.group(1), 'error': 'Path did not match any files'})
+
+            response = {
+                'success': not failed,
+                'output': f'{len(remaining)} of {len(file_paths)} files {done_key}',
+                done_key: remaining,
+                'failed': failed
+            }
+            if failed:
+                response['error'] = f'{len(failed)} files could not be {done_key}'
+            return response
+
         except Exception as e:
             return {
                 'success': False,
                 'error': str(e)
             }
 
+    def stage_file(self, file_path: str) -> Dict[str, Any]:
+        """Stage a specific file."""
+        return self.stage_files([file_path])
+
     def stage_all(self) -> Dict[str, Any]:
         """Stage all changes."""
         try:
@@ -147,14 +591,7 @@ class GitOperations:
 
     def unstage_file(self, file_path: str) -> Dict[str, Any]:
         """Unstage a specific file."""
-        try:
-            result = self.run_git_command(['reset', 'HEAD', '--', file_path])
-            return result
-        except Exception as e:
-            return {
-                'success': False,
-                'error': str(e)
-            }
+        return self.unstage_files([file_path])
 
     def unstage_all(self) -> Dict[str, Any]:
         """Unstage all files."""
@@ -169,29 +606,19 @@ class GitOperations:
 
     def add_untracked_file(self, file_path: str) -> Dict[str, Any]:
         """Add an untracked file."""
-        try:
-            result = self.run_git_command(['add', file_path])
-            return result
-        except Exception as e:
-            return {
-                'success': False,
-                'error': str(e)
-            }
+        return self.stage_files([file_path])
 
     def add_all_untracked(self) -> Dict[str, Any]:
         """Add all untracked files."""
         try:
             # Get all untracked files
-            result = self.run_git_command(['ls-files', '--others', '--exclude-standard'])
-            if not result['success'] or not result['output']:
+            untracked_files = list(self.iter_git_records(['ls-files', '-z', '--others', '--exclude-standard']))
+            if not untracked_files:
                 return {'success': True, 'output': 'No untracked files to add'}
 
-            untracked_files = result['output'].strip().split('\n')
-            for file in untracked_files:
-                if file.strip():
-                    self.run_git_command(['add', file.strip()])
-
-            return {'success': True, 'output': f'Added {len(untracked_files)} untracked files'}
+            result = self.stage_files(untracked_files)
+            result['output'] = f"Added {len(result.get('staged', []))} untracked files"
+            return result
         except Exception as e:
             return {
                 'success': False,
@@ -279,13 +706,14 @@ out/
         try:
             # Stage files
             if files:
-                for file in files:
-                    self.run_git_command(['add', file])
+                stage_result = self.stage_files(files)
+                if not stage_result['success']:
+                    return stage_result
             else:
                 self.run_git_command(['add', '.'])
 
-            # Commit with message
-            commit_result = self.run_git_command(['commit', '-m', message])
+            # Commit with message (from stdin, so its length is not limited by the command line)
+            commit_result = self.run_git_command(['commit', '-F', '-'], input_data=message)
 
             if commit_result['success']:
                 return {
@@ -302,42 +730,61 @@ out/
                 'error': str(e)
             }
 
-    def get_log(self, limit: int = 50) -> Dict[str, Any]:
-        """Get commit history with graph."""
-        try:
-            # Get log with custom format
-            format_str = '--pretty=format:{"hash":"%H","short_hash":"%h","author":"%an","email":"%ae","date":"%ad","subject":"%s","body":"%b"}'
+    def get_log(self, limit: int = 50, cursor: Optional[str] = None,
+                on_item: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Get one page of commit history.
 
-            result = self.run_git_command(['log', '--graph', format_str, f'--max-count={limit}'])
+        Pass the returned `cursor` back to fetch the page after it. Cursors are
+        opaque; while the worker keeps the underlying `git log` open, resuming
+        only reads the next page instead of walking the history again. Each
+        commit carries its graph row (see GraphLayout). With `on_item`, commits
+        are handed over as they are parsed instead of collected in `commits`.
+        """
+        try:
+            with self._log_lock:
+                if cursor:
+                    tip, offset, session_id = self._parse_log_cursor(cursor)
+                else:
+                    tip = self._get_head_hash()
+                    if not tip:
+                        return {'success': True, 'commits': [], 'total': 0, 'cursor': None, 'has_more': False}
+                    offset, session_id = 0, None
+
+                session = self._log_sessions.pop(session_id, None) if session_id else None
+                if session is None or session['offset'] != offset:
+                    if session:
+                        session['records'].close()
+                    session = self._open_log_session(tip, offset)
 
-            if result['success']:
-                # Parse the output
                 commits = []
-                graph_lines = []
-
-                lines = result['output'].split('\n')
-                graph_line = ''
-
-                for line in lines:
-                    if line.strip():
-                        if line.startswith('*') or line.startswith('|') or line.startswith('/') or line.startswith('\\'):
-                            graph_line = line
-                        else:
-                            try:
-                                commit_data = json.loads(line)
-                                commit_data['graph'] = graph_line
-                                commits.append(commit_data)
-                                graph_line = ''
-                            except json.JSONDecodeError:
-                                continue
+                emit = on_item or commits.append
+                count = 0
+                while count < limit:
+                    record = session['peeked'] or next(session['records'], None)
+                    session['peeked'] = None
+                    if record is None:
+                        break
+                    commit = self._parse_log_record(record)
+                    commit['graph'] = session['layout'].add(commit['hash'], commit['parents'])
+                    emit(commit)
+                    count += 1
+                session['offset'] += count
+
+                # Peek one record ahead so the caller knows whether to ask again
+                session['peeked'] = next(session['records'], None)
+                has_more = session['peeked'] is not None
+                next_cursor = None
+                if has_more:
+                    self._store_log_session(session)
+                    next_cursor = f"{session['tip']}:{session['offset']}:{session['id']}"
 
-                return {
-                    'success': True,
-                    'commits': commits,
-                    'total': len(commits)
-                }
-            else:
-                return result
+            return {
+                'success': True,
+                'commits': commits,
+                'total': count,
+                'cursor': next_cursor,
+                'has_more': has_more
+            }
 
         except Exception as e:
             return {
@@ -345,9 +792,68 @@ out/
                 'error': str(e)
             }
 
+    def _open_log_session(self, tip: str, offset: int) -> Dict[str, Any]:
+        """Start a streaming `git log` from `tip`, skipping commits already shown.
+
+        Both walks use --date-order: the default order may print a parent
+        before a child that has the same (or a skewed) timestamp, which
+        leaves a graph lane open forever and lets pages differ from a
+        one-shot load.
+        """
+        args = ['log', '-z', '--date-order', f'--pretty=format:{LOG_FORMAT}', tip]
+        from graph_layout import GraphLayout
+
+        layout = GraphLayout()
+        if offset:
+            args.append(f'--skip={offset}')
+            # Replay the topology of the skipped rows so lanes line up
+            for record in self.iter_git_records(['log', '-z', '--date-order', '--pretty=format:%H %P',
+                                                 f'--max-count={offset}', tip]):
+                commit_hash, _, parents = record.partition(' ')
+                layout.add(commit_hash, parents.split())
+
+        return {
+            'id': os.urandom(6).hex(),
+            'tip': tip,
+            'offset': offset,
+            'records': self.iter_git_records(args, timeout=None, gated=False),
+            'layout': layout,
+            'peeked': None
+        }
+
+    def _store_log_session(self, session: Dict[str, Any]):
+        """Keep a paused log stream for the next page, closing the oldest ones."""
+        self._log_sessions[session['id']] = session
+        while len(self._log_sessions) > self.MAX_LOG_SESSIONS:
+            _, oldest = self._log_sessions.popitem(last=False)
+            oldest['records'].close()
+
+    @staticmethod
+    def _parse_log_cursor(cursor: str):
+        try:
+            tip, offset, session_id = cursor.split(':')
+            int(tip, 16)
+            return tip, int(offset), session_id
+        except ValueError:
+            raise ValueError(f'Invalid log cursor: {cursor}')
+
+    @staticmethod
+    def _parse_log_record(record: str) -> Dict[str, Any]:
+        """Split one unit-separator framed log record into a commit dict."""
+        fields = record.split('\x1f', len(LOG_FIELDS) - 1)
+        commit = dict(zip(LOG_FIELDS, fields))
+        commit['parents'] = commit.get('parents', '').split()
+        commit['body'] = commit.get('body', '').strip()
+        return commit
+
     def get_diff(self, file_path: str = None, staged: bool = False) -> Dict[str, Any]:
         """Get diff for a file or all changes."""
         try:
+            cache_key = self._diff_cache_key(file_path, staged, ('text',)) if file_path else None
+            cached = self._diff_cache_get(cache_key)
+            if cached is not None:
+                return cached
+
             args = ['diff']
             if staged:
                 args.append('--cached')
@@ -358,12 +864,14 @@ out/
             result = self.run_git_command(args)
 
             if result['success']:
-                return {
+                response = {
                     'success': True,
                     'diff': result['output'],
                     'file': file_path,
                     'staged': staged
                 }
+                self._diff_cache_put(cache_key, response, len(result['output']))
+                return response
             else:
                 return result
 
@@ -373,8 +881,208 @@ out/
                 'error': str(e)
             }
 
-    def push(self, remote: str = 'origin', branch: str = 'main') -> Dict[str, Any]:
-        """Push changes to remote repository."""
+    def get_structured_diff(self, file_path: Optional[str] = None, staged: bool = False,
+                            offset: int = 0, limit: int = 20, hunk_offset: int = 0,
+                            max_bytes: int = DIFF_MAX_BYTES, max_lines: int = DIFF_MAX_LINES,
+                            on_item: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Get a page of parsed diff files (hunks and lines) with per-file size caps.
+
+        `git diff` output is parsed as it streams in and git is stopped once
+        `limit` files past `offset` have been read. Files over the caps come
+        back with `truncated` set and counts of what was left out; pass
+        `hunk_offset` to page through the remaining hunks of a file. With
+        `on_item`, each file is handed over as soon as it is parsed.
+        """
+        try:
+            cache_key = None
+            if file_path:
+                options = ('structured', offset, limit, hunk_offset, max_bytes, max_lines)
+                cache_key = self._diff_cache_key(file_path, staged, options)
+                cached = self._diff_cache_get(cache_key)
+                if cached is not None:
+                    if on_item:
+                        for diff_file in cached['files']:
+                            on_item(diff_file)
+                    return cached
+
+            args = ['-c', 'core.quotePath=false', 'diff', '--no-color', '--no-ext-diff']
+            if staged:
+                args.append('--cached')
+            if file_path:
+                args += ['--', file_path]
+
+            from diff_parser import iter_diff_files
+
+            records = self.iter_git_records(args, separator=b'\n')
+            files = []
+            count = 0
+            has_more = False
+            try:
+                parsed = iter_diff_files(records, max_bytes, max_lines, skip=offset, hunk_offset=hunk_offset)
+                for index, (diff_file, more_follows) in enumerate(parsed):
+                    if index < offset:
+                        continue
+                    # Single-file pages are still collected for the cache when streamed
+                    if on_item:
+                        on_item(diff_file)
+                    if not on_item or cache_key:
+                        files.append(diff_file)
+                    count += 1
+                    if count == limit:
+                        has_more = more_follows
+                        break
+            finally:
+                records.close()
+
+            response = {
+                'success': True,
+                'files': files,
+                'file': file_path,
+                'staged': staged,
+                'offset': offset,
+                'next_offset': offset + count if has_more else None
+            }
+            if cache_key:
+                self._diff_cache_put(cache_key, response, len(json.dumps(response)))
+            return response
+
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+    def get_diff_set(self, mode: str = 'all', include_bodies: bool = False,
+                     max_bytes: int = DIFF_MAX_BYTES, max_lines: int = DIFF_MAX_LINES,
+                     on_item: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Diff a whole changeset with one `git diff` and index it per file.
+
+        `mode` is 'staged' (index vs HEAD), 'unstaged' (worktree vs index) or
+        'all' (worktree vs HEAD). The response lists every file with its
+        status and added/deleted line counts; hunks are kept in the worker
+        and fetched per file with get_diff_set_file(), unless
+        `include_bodies` asks for them inline. With `on_item`, file entries
+        are handed over as git's output is parsed instead of listed in `files`.
+        """
+        try:
+            args = ['-c', 'core.quotePath=false', 'diff', '--no-color', '--no-ext-diff']
+            if mode == 'staged':
+                args.append('--cached')
+            elif mode == 'all':
+                args.append(self._get_head_hash() or EMPTY_TREE)
+            elif mode != 'unstaged':
+                return {'success': False, 'error': f'Unknown diff mode: {mode}'}
+
+            from diff_parser import iter_diff_files
+
+            bodies = []
+            files = []
+            emit = on_item or files.append
+            additions = deletions = 0
+            for index, (body, _) in enumerate(iter_diff_files(
+                self.iter_git_records(args, separator=b'\n'), max_bytes, max_lines
+            )):
+                bodies.append(body)
+                entry = {key: value for key, value in body.items() if key != 'hunks'}
+                entry['index'] = index
+                # Binary files have no line counts, matching `git diff --numstat`
+                if body['binary']:
+                    entry['additions'] = entry['deletions'] = None
+                else:
+                    additions += entry['additions']
+                    deletions += entry['deletions']
+                if include_bodies:
+                    entry['hunks'] = body['hunks']
+                emit(entry)
+
+            set_id = os.urandom(6).hex()
+            with self._diff_lock:
+                self._diff_sets[set_id] = bodies
+                while len(self._diff_sets) > self.MAX_DIFF_SETS:
+                    self._diff_sets.popitem(last=False)
+
+            return {
+                'success': True,
+                'set_id': set_id,
+                'mode': mode,
+                'files': files,
+                'total': len(bodies),
+                'additions': additions,
+                'deletions': deletions
+            }
+
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+    def get_diff_set_file(self, set_id: str, index: int) -> Dict[str, Any]:
+        """Fetch the hunks of one file from a changeset returned by get_diff_set()."""
+        with self._diff_lock:
+            bodies = self._diff_sets.get(set_id)
+            if bodies is not None:
+                self._diff_sets.move_to_end(set_id)
+
+        if bodies is None:
+            return {'success': False, 'error': f'Diff set expired or unknown: {set_id}'}
+        if not 0 <= index < len(bodies):
+            return {'success': False, 'error': f'No file {index} in diff set {set_id}'}
+
+        return {
+            'success': True,
+            'set_id': set_id,
+            'index': index,
+            'file': bodies[index]
+        }
+
+    def _diff_cache_key(self, file_path: str, staged: bool, options: tuple) -> Optional[tuple]:
+        """Content address of a single-file diff.
+
+        Staged diffs are keyed by the HEAD and index blob ids; worktree diffs
+        by the index blob id plus the file's stat, so editing one file only
+        misses for that file. Ids come from the (cached) porcelain v2 status.
+        """
+        if not self.get_status()['success'] or not self._status_cache:
+            return None
+
+        head_oid, index_oid = self._status_cache[3].get(file_path, (None, None))
+        if staged:
+            return (file_path, head_oid, index_oid, True, options)
+
+        worktree = self._stat_key(self.repo_path / file_path)
+        return (file_path, index_oid, worktree, False, options)
+
+    def _diff_cache_get(self, key: Optional[tuple]) -> Optional[Dict[str, Any]]:
+        if key is None:
+            return None
+        with self._diff_lock:
+            entry = self._diff_cache.get(key)
+            if entry is None:
+                return None
+            self._diff_cache.move_to_end(key)
+            return entry[1]
+
+    def _diff_cache_put(self, key: Optional[tuple], result: Dict[str, Any], size: int):
+        """Remember a diff, evicting least recently used ones past the budget."""
+        if key is None or size > self.DIFF_CACHE_BYTES:
+            return
+        with self._diff_lock:
+            previous = self._diff_cache.pop(key, None)
+            if previous:
+                self._diff_cache_bytes -= previous[0]
+            self._diff_cache[key] = (size, result)
+            self._diff_cache_bytes += size
+
+            while self._diff_cache_bytes > self.DIFF_CACHE_BYTES:
+                _, (evicted_size, _) = self._diff_cache.popitem(last=False)
+                self._diff_cache_bytes -= evicted_size
+
+    def push(self, remote: str = 'origin', branch: str = 'main',
+             on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+             cancel: Optional[threading.Event] = None,
+             timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Push changes to remote repository, reporting transfer progress."""
         try:
             # First, get current branch if not specified
             if branch == 'main':
@@ -382,17 +1090,19 @@ out/
                 if branch_result['success'] and branch_result['output'].strip():
                     branch = branch_result['output'].strip()
 
-            result = self.run_git_command(['push', remote, branch], capture_output=False)
+            result = self.run_transfer(['push', '--progress', remote, branch], on_progress, cancel, timeout)
 
             if result['success']:
                 return {
                     'success': True,
-                    'output': f'Pushed to {remote}/{branch}'
+                    'output': f'Pushed to {remote}/{branch}',
+                    'details': result['output']
                 }
             else:
                 return {
                     'success': False,
-                    'error': f'Push failed: {result.get("error", "Unknown error")}'
+                    'cancelled': result.get('cancelled', False),
+                    'error': f'Push failed: {result.get("error") or "Unknown error"}'
                 }
 
         except Exception as e:
@@ -401,8 +1111,11 @@ out/
                 'error': str(e)
             }
 
-    def pull(self, remote: str = 'origin', branch: str = 'main') -> Dict[str, Any]:
-        """Pull changes from remote repository."""
+    def pull(self, remote: str = 'origin', branch: str = 'main',
+             on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+             cancel: Optional[threading.Event] = None,
+             timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Pull changes from remote repository, reporting transfer progress."""
         try:
             # First, get current branch if not specified
             if branch == 'main':
@@ -410,17 +1123,19 @@ out/
                 if branch_result['success'] and branch_result['output'].strip():
                     branch = branch_result['output'].strip()
 
-            result = self.run_git_command(['pull', remote, branch], capture_output=False)
+            result = self.run_transfer(['pull', '--progress', remote, branch], on_progress, cancel, timeout)
 
             if result['success']:
                 return {
                     'success': True,
-                    'output': f'Pulled from {remote}/{branch}'
+                    'output': f'Pulled from {remote}/{branch}',
+                    'details': result['output']
                 }
             else:
                 return {
                     'success': False,
-                    'error': f'Pull failed: {result.get("error", "Unknown error")}'
+                    'cancelled': result.get('cancelled', False),
+                    'error': f'Pull failed: {result.get("error") or "Unknown error"}'
                 }
 
         except Exception as e:
@@ -429,30 +1144,162 @@ out/
                 'error': str(e)
             }
 
-    def get_file_tree(self) -> Dict[str, Any]:
-        """Get file tree structure of the repository."""
-        try:
-            # Get list of all files (excluding .git)
-            all_files = []
-            for root, dirs, files in os.walk(self.repo_path):
-                # Skip .git directory
-                if '.git' in root:
-                    continue
+    def run_transfer(self, args: List[str],
+                     on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+                     cancel: Optional[threading.Event] = None,
+                     timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Run a network git command, turning its --progress output into events.
+
+        Progress goes to `on_progress` as {'phase', 'percent', 'current',
+        'total', 'bytes', 'rate'} dicts (bytes and bytes/second when git
+        reports them), at most a few per second per phase. Setting `cancel`
+        stops git; `timeout` of None means no limit. Like every other git
+        command it waits for its turn on the repository's limiter (a pull
+        updates the index, so it runs alone).
+        """
+        queued = time.perf_counter()
+        with self.limiter.gate(args):
+            return self._transfer(args, on_progress, cancel, timeout, (time.perf_counter() - queued) * 1000)
+
+    def _transfer(self, args: List[str], on_progress: Optional[Callable[[Dict[str, Any]], None]],
+                  cancel: Optional[threading.Event], timeout: Optional[float], wait_ms: float) -> Dict[str, Any]:
+        full_args = ['git', '-C', str(self.repo_path)] + args
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            full_args,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env={**os.environ, 'GIT_TERMINAL_PROMPT': '0'},
+            # Its own process group, so stopping it also stops ssh, receive-pack and hooks
+            start_new_session=os.name != 'nt'
+        )
+
+        stdout_chunks = []
+        messages = []
+        last_emit = {}
+
+        def read_stdout():
+            stdout_chunks.append(process.stdout.read())
+
+        def read_stderr():
+            pending = b''
+            for chunk in iter(lambda: process.stderr.read1(4096), b''):
+                # git redraws progress lines with \r, so split on both
+                parts = re.split(rb'[\r\n]', pending + chunk)
+                pending = parts.pop()
+                for part in parts:
+                    handle_line(part.decode('utf-8', errors='replace').strip())
+            handle_line(pending.decode('utf-8', errors='replace').strip())
+
+        def handle_line(line: str):
+            if not line:
+                return
+            progress = parse_progress(line)
+            if progress is None:
+                messages.append(line)
+                return
+            if on_progress is None:
+                return
+
+            # Throttle, but always report a phase's first and final update
+            now = time.monotonic()
+            phase = progress['phase']
+            if progress['current'] != progress['total'] and phase in last_emit \
+                    and now - last_emit[phase] < PROGRESS_INTERVAL:
+                return
+            last_emit[phase] = now
+            on_progress(progress)
+
+        readers = [threading.Thread(target=read_stdout, daemon=True),
+                   threading.Thread(target=read_stderr, daemon=True)]
+        for reader in readers:
+            reader.start()
+
+        clock_started = time.monotonic()
+        cancelled = timed_out = False
+        while process.poll() is None:
+            if cancel is not None and cancel.is_set():
+                cancelled = True
+            elif timeout is not None and time.monotonic() - clock_started > timeout:
+                timed_out = True
+
+            if cancelled or timed_out:
+                self._stop_process_group(process)
+                break
+
+            try:
+                process.wait(timeout=0.1)
+            except subprocess.TimeoutExpired:
+                pass
+
+        process.wait()
+        for reader in readers:
+            # A child that left the group may still hold the pipes; don't wait for it
+            reader.join(timeout=5 if cancelled or timed_out else None)
+        tracer.record(args, started, process.returncode, sum(map(len, stdout_chunks)), wait_ms)
+
+        output = b''.join(stdout_chunks).decode('utf-8', errors='replace').strip()
+        messages = '\n'.join(messages)
+        success = process.returncode == 0 and not (cancelled or timed_out)
+
+        if cancelled:
+            error = 'Cancelled'
+        elif timed_out:
+            error = f'Command timed out after {timeout} seconds'
+        else:
+            error = '' if success else messages
+
+        return {
+            'success': success,
+            'output': '\n'.join(filter(None, [output, messages])) if success else output,
+            'error': error,
+            'returncode': process.returncode,
+            'cancelled': cancelled
+        }
 
-                for file in files:
-                    rel_path = os.path.relpath(os.path.join(root, file), self.repo_path)
-                    all_files.append(rel_path)
+    @staticmethod
+    def _stop_process_group(process: subprocess.Popen):
+        """Terminate a process started with start_new_session and everything it spawned."""
+        import signal
 
-            # Get git status for each file
-            status_result = self.run_git_command(['status', '--porcelain'])
-            status_map = {}
+        def signal_group(signum):
+            try:
+                os.killpg(process.pid, signum)
+            except OSError:
+                pass
 
-            if status_result['success']:
-                for line in status_result['output'].strip().split('\n'):
-                    if line.strip():
-                        status = line[0:2].strip()
-                        file_path = line[3:].strip()
-                        status_map[file_path] = status
+        if os.name == 'nt':
+            process.terminate()
+        else:
+            signal_group(signal.SIGTERM)
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        if os.name != 'nt':
+            # Children that ignored SIGTERM
+            signal_group(signal.SIGKILL)
+
+    def get_file_tree(self, on_item: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Get file tree structure of the repository.
+
+        With `on_item`, tree nodes are handed over flat as `git ls-files`
+        streams in, each folder before anything inside it, instead of
+        being nested under `tree`.
+        """
+        try:
+            if on_item:
+                return self._stream_file_tree(on_item)
+
+            # Tracked plus untracked (non-ignored) files in one pass; git skips
+            # .git and ignored trees like node_modules for us. Status is
+            # independent, so both git calls run at once
+            all_files, status_result = run_parallel(
+                lambda: list(self._iter_worktree_files()),
+                self.get_status
+            )
+            status_map = self._build_status_map(status_result['status']) if status_result['success'] else {}
 
             # Build tree structure
             tree = self._build_tree_structure(all_files, status_map)
@@ -469,50 +1316,592 @@ out/
                 'error': str(e)
             }
 
+    def _iter_worktree_files(self) -> Iterator[str]:
+        """Tracked plus untracked (non-ignored) paths, each once.
+
+        `git ls-files` lists an unmerged path once per conflict stage; the
+        stages are adjacent, so repeats are dropped as they stream past.
+        """
+        previous = None
+        for file_path in self.iter_git_records(['ls-files', '-z', '--cached', '--others', '--exclude-standard']):
+            if file_path != previous:
+                yield file_path
+            previous = file_path
+
+    def _stream_file_tree(self, on_item: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
+        status_result = self.get_status()
+        status_map = self._build_status_map(status_result['status']) if status_result['success'] else {}
+
+        total_files = 0
+        for node in self._iter_tree_nodes(self._iter_worktree_files(), status_map):
+            on_item(node)
+            if node['type'] == 'file':
+                total_files += 1
+
+        return {
+            'success': True,
+            'tree': None,
+            'total_files': total_files
+        }
+
+    def list_dir(self, dir_path: str = '.') -> Dict[str, Any]:
+        """List the immediate children of a directory with aggregated change counts.
+
+        Folders report how many changed files sit anywhere below them, so the
+        UI can show e.g. "3 modified" without expanding them.
+        """
+        try:
+            dir_path = dir_path.strip('/')
+            if dir_path == '.':
+                dir_path = ''
+
+            index = self._get_tree_index()
+            children = index['children'].get(dir_path)
+            if children is None:
+                return {'success': False, 'error': f'Not a directory: {dir_path or "."}'}
+
+            entries = []
+            for name, is_folder in children.items():
+                path = f'{dir_path}/{name}' if dir_path else name
+                if is_folder:
+                    entries.append({
+                        'name': name,
+                        'type': 'folder',
+                        'path': path,
+                        'status': '',
+                        'changes': index['changes'].get(path, {})
+                    })
+                else:
+                    entries.append({
+                        'name': name,
+                        'type': 'file',
+                        'path': path,
+                        'status': index['status_map'].get(path, '')
+                    })
+
+            entries.sort(key=lambda entry: (entry['type'] != 'folder', entry['name'].lower()))
+
+            return {
+                'success': True,
+                'path': dir_path or '.',
+                'entries': entries,
+                'changes': index['changes'].get(dir_path, {}),
+                'total': len(entries)
+            }
+
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+    def _get_tree_index(self) -> Dict[str, Any]:
+        """Return the prefix index of all files with per-folder change counts.
+
+        The listing of paths (a full `git ls-files`) is rebuilt only when the
+        index file or the set of untracked files changed, not on every new
+        status; change counts are recomputed from each new status.
+        """
+        status_result = self.get_status()
+        if not status_result['success']:
+            raise RuntimeError(status_result['error'])
+
+        with self._tree_lock:
+            status = self._status_cache[2] if self._status_cache else None
+            if self._tree_index and status is not None and self._tree_index[0] is status:
+                return self._tree_index[1]
+
+            status_map = self._build_status_map(status)
+
+            # Keyed before ls-files runs, so an index write during it forces another rebuild
+            git_dir, _ = self._get_git_dirs()
+            paths_key = (self._stat_key(git_dir / 'index'), tuple(entry['file'] for entry in status['untracked']))
+            if self._tree_paths and self._tree_paths[0] == paths_key:
+                children = self._tree_paths[1]
+            else:
+                # children: folder path -> {name: is_folder}
+                children: Dict[str, Dict[str, bool]] = {'': {}}
+                for file_path in self._iter_worktree_files():
+                    parent_path, _, name = file_path.rpartition('/')
+                    folder = children.get(parent_path)
+                    if folder is None:
+                        folder = self._add_index_folder(children, parent_path)
+                    folder[name] = False
+                self._tree_paths = (paths_key, children)
+
+            # changes: folder path -> {category: count of changed files below}
+            changes: Dict[str, Dict[str, int]] = {}
+            for file_path, code in status_map.items():
+                category = self._status_category(code)
+                parent_path = file_path
+                while parent_path:
+                    parent_path = parent_path.rpartition('/')[0]
+                    counts = changes.setdefault(parent_path, {})
+                    counts[category] = counts.get(category, 0) + 1
+
+            index = {'children': children, 'changes': changes, 'status_map': status_map}
+            self._tree_index = (status, index)
+            return index
+
+    @staticmethod
+    def _add_index_folder(children: Dict[str, Dict[str, bool]], folder_path: str) -> Dict[str, bool]:
+        """Create a folder (and any missing parents) in the listing index."""
+        folder = children.get(folder_path)
+        if folder is None:
+            parent_path, _, name = folder_path.rpartition('/')
+            GitOperations._add_index_folder(children, parent_path)[name] = True
+            folder = children[folder_path] = {}
+        return folder
+
+    @staticmethod
+    def _status_category(code: str) -> str:
+        if code == '??':
+            return 'untracked'
+        if 'U' in code:
+            return 'conflicted'
+        return {'A': 'added', 'D': 'deleted', 'R': 'renamed', 'C': 'added'}.get(code[0], 'modified')
+
+    @staticmethod
+    def _build_status_map(status: Dict[str, Any]) -> Dict[str, str]:
+        """Map each changed path to its short porcelain code (e.g. 'M', 'AM', '??')."""
+        index_codes = {entry['file']: entry['status'] for entry in status['staged']}
+        worktree_codes = {entry['file']: entry['status'] for entry in status['unstaged']}
+
+        status_map = {}
+        for path in index_codes.keys() | worktree_codes.keys():
+            status_map[path] = (index_codes.get(path, ' ') + worktree_codes.get(path, ' ')).strip()
+        for entry in status['untracked']:
+            status_map[entry['file']] = '??'
+        return status_map
+
     def _build_tree_structure(self, files: List[str], status_map: Dict[str, str]) -> Dict[str, Any]:
-        """Build hierarchical tree structure from file list."""
-        root = {
+        """Build hierarchical tree structure from file list.
+
+        Folders are indexed by path, so each file costs one dict lookup and
+        each folder is created once: O(total path components) overall.
+        """
+        nodes = self._iter_tree_nodes(files, status_map)
+        root = next(nodes)
+        folders = {'': root}
+        for node in nodes:
+            folders[node['path'].rpartition('/')[0]]['children'].append(node)
+            if node['type'] == 'folder':
+                folders[node['path']] = node
+        return root
+
+    def _iter_tree_nodes(self, files: Iterable[str], status_map: Dict[str, str]) -> Iterator[Dict[str, Any]]:
+        """Tree nodes for a file list, root first and every folder before its contents.
+
+        Folders are yielded with empty `children`; a node's parent is the
+        folder whose path is everything before its last '/' (the root for '').
+        """
+        yield {
             'name': self.repo_path.name,
             'type': 'folder',
             'path': '.',
             'status': '',
             'children': []
         }
+        folders = {''}
 
         for file_path in files:
-            parts = file_path.split('/')
-            current = root['children']
+            parent_path, _, name = file_path.rpartition('/')
+            if parent_path not in folders:
+                missing = []
+                folder_path = parent_path
+                while folder_path not in folders:
+                    folders.add(folder_path)
+                    missing.append(folder_path)
+                    folder_path = folder_path.rpartition('/')[0]
+                for folder_path in reversed(missing):
+                    yield {
+                        'name': folder_path.rpartition('/')[2],
+                        'type': 'folder',
+                        'path': folder_path,
+                        'status': '',
+                        'children': []
+                    }
 
-            for i, part in enumerate(parts):
-                is_file = i == len(parts) - 1
-                existing = None
+            yield {
+                'name': name,
+                'type': 'file',
+                'path': file_path,
+                'status': status_map.get(file_path, ''),
+                'children': None
+            }
 
-                for item in current:
-                    if item['name'] == part:
-                        existing = item
-                        break
+def parse_progress(line: str) -> Optional[Dict[str, Any]]:
+    """Parse a git --progress line such as
+    'Receiving objects:  45% (9/20), 1.20 MiB | 512.00 KiB/s'."""
+    match = PROGRESS_LINE.match(line)
+    if not match:
+        return None
+
+    phase, percent, current, total, amount, rate = match.groups()
+    return {
+        'phase': phase.strip(),
+        'remote': line.startswith('remote:'),
+        'percent': int(percent),
+        'current': int(current),
+        'total': int(total),
+        'bytes': parse_size(amount) if amount else None,
+        'rate': parse_size(rate[:-2]) if rate else None
+    }
+
+def parse_size(text: str) -> int:
+    """'1.20 MiB' -> 1258291."""
+    number, _, unit = text.strip().partition(' ')
+    return int(float(number) * SIZE_UNITS.get(unit, 1))
+
+def parse_options(args: List[str]):
+    """Split CLI args into positionals and --key[=value] options."""
+    positional, options = [], {}
+    for arg in args:
+        if arg.startswith('--'):
+            key, _, value = arg[2:].partition('=')
+            options[key] = value
+        else:
+            positional.append(arg)
+    return positional, options
+
+def iter_args(source: str) -> Iterator[str]:
+    """NUL-separated arguments from stdin ('-') or a file, yielded as they are read."""
+    from payload import iter_nul_records, open_payload
+
+    with open_payload(source, binary=True) as stream:
+        yield from iter_nul_records(stream)
+
+def run_command(git_ops: GitOperations, command: str, args: List[str],
+                on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+                cancel: Optional[threading.Event] = None,
+                on_item: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """Dispatch a CLI-style command to the matching GitOperations method.
+
+    Long-running commands report intermediate events through `on_event`
+    and stop early when `cancel` is set. STREAMED_COMMANDS hand their list
+    items to `on_item` as they are produced, if given. Git calls made on
+    the way are traced under the command's name.
+    """
+    if command in ('stats', 'trace'):
+        return run_tracing_command(command, args)
+
+    with tracer.operation(command):
+        return _dispatch(git_ops, command, args, on_event, cancel, on_item)
+
+def run_tracing_command(command: str, args: List[str]) -> Dict[str, Any]:
+    """stats [--reset] | trace on|off
+
+    Traces are written to $GIT_GUI_TRACE_DIR, or the traces folder of the
+    app's cache directory; callers cannot pick the file.
+    """
+    positional, options = parse_options(args)
+    if command == 'stats':
+        return {'success': True, 'stats': tracer.stats(reset='reset' in options)}
+
+    if positional == ['off']:
+        tracer.stop_trace()
+    elif positional == ['on']:
+        trace_dir = os.environ.get(TRACE_DIR_ENV)
+        if not trace_dir:
+            from response_cache import default_cache_dir
+            trace_dir = str(default_cache_dir() / 'traces')
+        try:
+            tracer.start_trace(trace_dir)
+        except OSError as e:
+            return {'success': False, 'error': str(e)}
+    else:
+        return {'success': False, 'error': 'Usage: trace on|off'}
+    return {'success': True, 'trace': tracer.trace_path}
+
+def _dispatch(git_ops: GitOperations, command: str, args: List[str],
+              on_event: Optional[Callable[[Dict[str, Any]], None]],
+              cancel: Optional[threading.Event],
+              on_item: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    if command == 'status':
+        return git_ops.get_status()
+    elif command == 'invalidate':
+        return git_ops.invalidate()
+    elif command == 'init':
+        return git_ops.init_repository()
+    elif command == 'commit':
+        if len(args) < 1:
+            return {'success': False, 'error': 'Missing commit message'}
+        message = args[0]
+        files = args[1:] if len(args) > 1 else None
+        return git_ops.commit(message, files)
+    elif command == 'log':
+        limit = int(args[0]) if args else 50
+        cursor = args[1] if len(args) > 1 else None
+        return git_ops.get_log(limit, cursor, on_item=on_item)
+    elif command == 'diff':
+        file_path = args[0] if args else None
+        staged = len(args) > 1 and args[1] == '--staged'
+        return git_ops.get_diff(file_path, staged)
+    elif command == 'diff-structured':
+        positional, options = parse_options(args)
+        return git_ops.get_structured_diff(
+            positional[0] if positional else None,
+            staged='staged' in options,
+            offset=int(options.get('offset', 0)),
+            limit=int(options.get('limit', 20)),
+            hunk_offset=int(options.get('hunk-offset', 0)),
+            on_item=on_item
+        )
+    elif command == 'diff-set':
+        _, options = parse_options(args)
+        return git_ops.get_diff_set(options.get('mode', 'all'), include_bodies='bodies' in options, on_item=on_item)
+    elif command == 'diff-set-file':
+        if len(args) < 2:
+            return {'success': False, 'error': 'Missing diff set id or file index'}
+        return git_ops.get_diff_set_file(args[0], int(args[1]))
+    elif command in ('push', 'pull'):
+        positional, options = parse_options(args)
+        remote = positional[0] if len(positional) > 0 else 'origin'
+        branch = positional[1] if len(positional) > 1 else 'main'
+        timeout = float(options['timeout']) if options.get('timeout') else None
+        transfer = git_ops.push if command == 'push' else git_ops.pull
+        return transfer(remote, branch, on_progress=on_event, cancel=cancel, timeout=timeout or None)
+    elif command == 'file-tree':
+        return git_ops.get_file_tree(on_item=on_item)
+    elif command == 'list-dir':
+        return git_ops.list_dir(args[0] if args else '.')
+    elif command == 'stage':
+        if not args:
+            return {'success': False, 'error': 'Missing file path'}
+        return git_ops.stage_files(args)
+    elif command == 'stage-all':
+        return git_ops.stage_all()
+    elif command == 'unstage':
+        if not args:
+            return {'success': False, 'error': 'Missing file path'}
+        return git_ops.unstage_files(args)
+    elif command == 'unstage-all':
+        return git_ops.unstage_all()
+    elif command == 'add-untracked':
+        if not args:
+            return {'success': False, 'error': 'Missing file path'}
+        return git_ops.stage_files(args)
+    elif command == 'add-all-untracked':
+        return git_ops.add_all_untracked()
+    else:
+        return {
+            'success': False,
+            'error': f'Unknown command: {command}'
+        }
 
-                if not existing:
-                    new_item = {
-                        'name': part,
-                        'type': 'file' if is_file else 'folder',
-                        'path': '/'.join(parts[:i+1]),
-                        'status': status_map.get(file_path, ''),
-                        'children': [] if not is_file else None
-                    }
-                    current.append(new_item)
-                    existing = new_item
+def run_workspace_command(workspace: Workspace, args: List[str],
+                          on_event: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """workspace-status <root-or-repo>... [--depth=N] [--max-age=SECONDS]"""
+    paths, options = parse_options(args)
+    with tracer.operation('workspace-status'):
+        return workspace.status(
+            paths,
+            max_depth=int(options.get('depth') or 3),
+            max_age=float(options['max-age']) if options.get('max-age') else None,
+            on_event=on_event
+        )
+
+def run_ai_commit_command(generator: AICommitGenerator, git_ops: GitOperations, args: List[str],
+                          on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+                          cancel: Optional[threading.Event] = None) -> Dict[str, Any]:
+    """ai-commit <changes_json|@file> [--refresh] [--context-tokens=N] [--stream]: commit message for the changes.
+
+    A large change set can be passed as `@<path>` to a JSON file, which is
+    read as it streams in. Renderers can send this command too, so the file
+    must be in $GIT_GUI_PAYLOAD_DIR (`-` is refused: the worker's stdin
+    carries its requests). Cached per change set unless --refresh; the
+    prompt carries up to N tokens of diff context. With --stream, text is
+    sent as {'type': 'delta', 'text': ...} events while the model writes it.
+    """
+    from ai_commit import generate_with_fallback, read_changes
+    from payload import in_payload_dir
+
+    positional, options = parse_options(args)
+    if not positional:
+        return {'success': False, 'error': 'ai-commit needs the changes as JSON or @<file>'}
+    if positional[0] == '-':
+        return {'success': False, 'error': 'ai-commit cannot read changes from stdin here; pass @<file>'}
+    if positional[0].startswith('@') and not in_payload_dir(positional[0]):
+        return {'success': False, 'error': 'ai-commit only reads change files from the payload directory'}
+    try:
+        changes = read_changes(positional[0])
+    except ValueError as e:
+        return {'success': False, 'error': f'Invalid JSON: {e}'}
+    except OSError as e:
+        return {'success': False, 'error': str(e)}
+
+    on_delta = None
+    if 'stream' in options and on_event is not None:
+        on_delta = lambda text: on_event({'type': 'delta', 'text': text})
+
+    with tracer.operation('ai-commit'):
+        return generate_with_fallback(
+            generator, changes, git_ops,
+            refresh='refresh' in options,
+            context_tokens=int(options['context-tokens']) if options.get('context-tokens') else None,
+            on_delta=on_delta,
+            cancel=cancel
+        )
+
+class GitWorker:
+    """Long-lived request/response server over stdin/stdout.
+
+    Each request is one JSON object per line:
+        {"id": 1, "command": "status", "repo": "/path/to/repo", "args": []}
+    Large argument lists (commit paths, AI change sets) can instead be
+    written NUL-separated to a file named by "args_file"; they are read
+    incrementally and appended to "args".
+    Each response is one JSON object per line carrying the same id:
+        {"id": 1, "result": {...}}
+
+    Requests are handled on a thread pool, so several can be in flight at
+    once and responses may arrive out of order. One GitOperations instance
+    is kept per repository for the lifetime of the worker.
+
+    ai-commit keeps one AICommitGenerator, so its HTTP connections stay
+    open between requests.
+
+    Long-running commands (push, pull, workspace-status, ai-commit --stream)
+    may send any number of
+        {"id": 1, "event": {...}}
+    lines before their result; push, pull and ai-commit can be stopped with
+        {"cancel": 1}
+
+    STREAMED_COMMANDS requested with "stream": true send their list as
+    record_stream records tagged with the id, a header and then one
+    {"id": 1, "type": "item", "item": {...}} line per entry; the result
+    is the trailer.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self.repos: Dict[str, GitOperations] = {}
+        self.repos_lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        from concurrent.futures import ThreadPoolExecutor
+        from workspace import Workspace
+        from record_stream import dumps, stream_writer
+
+        self.encode = dumps
+        self.output = stream_writer(sys.stdout.buffer)
+
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.cancels: Dict[Any, threading.Event] = {}
+        self.workspace = Workspace(self.get_repo)
+        self.ai_generator: Optional[AICommitGenerator] = None
+
+    def get_repo(self, repo_path: str) -> GitOperations:
+        """Return the cached GitOperations for a repository, creating it once."""
+        key = str(Path(repo_path).resolve())
+        with self.repos_lock:
+            git_ops = self.repos.get(key)
+            if git_ops is None:
+                git_ops = GitOperations(key)
+                self.repos[key] = git_ops
+            return git_ops
+
+    def get_ai_generator(self) -> AICommitGenerator:
+        """The worker's AICommitGenerator, created (and ai_commit imported) on first use."""
+        with self.repos_lock:
+            if self.ai_generator is None:
+                from ai_commit import AICommitGenerator
+                self.ai_generator = AICommitGenerator()
+            return self.ai_generator
+
+    def send(self, message: Dict[str, Any]):
+        """Write one response line; serialized so lines never interleave."""
+        self.write(self.encode(message) + b'\n')
+
+    def write(self, data: bytes):
+        """Write whole response lines at once."""
+        with self.write_lock:
+            self.output(data)
+
+    def handle(self, request: Dict[str, Any]):
+        """Run a single request and send its response."""
+        request_id = request.get('id')
+        try:
+            command = request.get('command')
+            repo_path = request.get('repo')
+            args = [str(arg) for arg in request.get('args') or []]
+            if request.get('args_file'):
+                args.extend(iter_args(str(request['args_file'])))
+
+            on_event = lambda event: self.send({'id': request_id, 'event': event})
+
+            if not command or not repo_path:
+                result = {'success': False, 'error': 'Request needs "command" and "repo"'}
+            elif command == 'workspace-status':
+                # "repo" is the workspace root; args may add more repositories or roots
+                result = run_workspace_command(self.workspace, [repo_path] + args, on_event)
+            elif command == 'ai-commit':
+                result = run_ai_commit_command(self.get_ai_generator(), self.get_repo(repo_path), args,
+                                               on_event, self.cancels.get(request_id))
+            elif request.get('stream') and command in STREAMED_COMMANDS:
+                from record_stream import RecordWriter, trailer_record
+
+                writer = RecordWriter(self.write, command, STREAMED_COMMANDS[command], {'id': request_id})
+                writer.header()
+                try:
+                    result = run_command(
+                        self.get_repo(repo_path), command, args,
+                        on_event=on_event,
+                        cancel=self.cancels.get(request_id),
+                        on_item=writer.item
+                    )
+                finally:
+                    writer.flush()
+                result = trailer_record(result, writer.items_key, writer.count)
+            else:
+                result = run_command(
+                    self.get_repo(repo_path), command, args,
+                    on_event=on_event,
+                    cancel=self.cancels.get(request_id)
+                )
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+        finally:
+            self.cancels.pop(request_id, None)
 
-                if not is_file:
-                    current = existing['children']
+        self.send({'id': request_id, 'result': result})
 
-        return root
+    def serve(self, stream=None):
+        """Read requests until EOF, then wait for in-flight ones to finish."""
+        stream = stream or sys.stdin
+        try:
+            for line in iter(stream.readline, ''):
+                line = line.strip()
+                if not line:
+                    continue
+
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError('Request must be a JSON object')
+                except ValueError as e:
+                    self.send({'id': None, 'result': {'success': False, 'error': f'Invalid request: {e}'}})
+                    continue
+
+                if 'cancel' in request:
+                    cancel = self.cancels.get(request['cancel'])
+                    if cancel is not None:
+                        cancel.set()
+                    continue
+
+                self.cancels[request.get('id')] = threading.Event()
+                self.executor.submit(self.handle, request)
+        finally:
+            self.executor.shutdown(wait=True)
 
 def main():
+    if len(sys.argv) >= 2 and sys.argv[1] == 'serve':
+        GitWorker().serve()
+        return
+
     if len(sys.argv) < 3:
         print(json.dumps({
             'success': False,
-            'error': 'Usage: git_operations.py <command> <repo_path> [args...]'
+            'error': 'Usage: git_operations.py <command> <repo_path> [args...] [--stdin|--args-from=FILE] '
+                     '[--ndjson] | git_operations.py serve'
         }))
         sys.exit(1)
 
@@ -520,67 +1909,43 @@ def main():
     repo_path = sys.argv[2]
     args = sys.argv[3:] if len(sys.argv) > 3 else []
 
+    # A trailing --args-from=<-|file> (or --stdin, the same as --args-from=-)
+    # takes the remaining arguments NUL-separated from stdin or a file
+    if args[-1:] == ['--stdin'] or args[-1:] and args[-1].startswith('--args-from='):
+        source = '-' if args[-1] == '--stdin' else args[-1][len('--args-from='):]
+        del args[-1]
+        args.extend(iter_args(source))
+
+    # --progress prints intermediate events as JSON lines before the result
+    on_event = None
+    if '--progress' in args:
+        args.remove('--progress')
+        on_event = lambda event: print(json.dumps({'event': event}), flush=True)
+
     git_ops = GitOperations(repo_path)
 
+    # --ndjson streams list results as header, item and trailer records
+    if '--ndjson' in args and command in STREAMED_COMMANDS:
+        args.remove('--ndjson')
+        from record_stream import RecordWriter, stream_writer
+
+        writer = RecordWriter(stream_writer(sys.stdout.buffer), command, STREAMED_COMMANDS[command])
+        writer.header()
+        try:
+            result = run_command(git_ops, command, args, on_event=writer.event if on_event else None,
+                                 on_item=writer.item)
+        except Exception as e:
+            writer.trailer({'success': False, 'error': str(e)})
+            sys.exit(1)
+        writer.trailer(result)
+        return
+
     try:
-        if command == 'status':
-            result = git_ops.get_status()
-        elif command == 'init':
-            result = git_ops.init_repository()
-        elif command == 'commit':
-            if len(args) < 1:
-                result = {'success': False, 'error': 'Missing commit message'}
-            else:
-                message = args[0]
-                files = args[1:] if len(args) > 1 else None
-                result = git_ops.commit(message, files)
-        elif command == 'log':
-            limit = int(args[0]) if args else 50
-            result = git_ops.get_log(limit)
-        elif command == 'diff':
-            file_path = args[0] if args else None
-            staged = len(args) > 1 and args[1] == '--staged'
-            result = git_ops.get_diff(file_path, staged)
-        elif command == 'push':
-            remote = args[0] if len(args) > 0 else 'origin'
-            branch = args[1] if len(args) > 1 else 'main'
-            result = git_ops.push(remote, branch)
-        elif command == 'pull':
-            remote = args[0] if len(args) > 0 else 'origin'
-            branch = args[1] if len(args) > 1 else 'main'
-            result = git_ops.pull(remote, branch)
-        elif command == 'file-tree':
-            result = git_ops.get_file_tree()
-        elif command == 'stage':
-            file_path = args[0] if args else None
-            if not file_path:
-                result = {'success': False, 'error': 'Missing file path'}
-            else:
-                result = git_ops.stage_file(file_path)
-        elif command == 'stage-all':
-            result = git_ops.stage_all()
-        elif command == 'unstage':
-            file_path = args[0] if args else None
-            if not file_path:
-                result = {'success': False, 'error': 'Missing file path'}
-            else:
-                result = git_ops.unstage_file(file_path)
-        elif command == 'unstage-all':
-            result = git_ops.unstage_all()
-        elif command == 'add-untracked':
-            file_path = args[0] if args else None
-            if not file_path:
-                result = {'success': False, 'error': 'Missing file path'}
-            else:
-                result = git_ops.add_untracked_file(file_path)
-        elif command == 'add-all-untracked':
-            result = git_ops.add_all_untracked()
+        if command == 'workspace-status':
+            from workspace import Workspace
+            result = run_workspace_command(Workspace(GitOperations), [repo_path] + args, on_event)
         else:
-            result = {
-                'success': False,
-                'error': f'Unknown command: {command}'
-            }
-
+            result = run_command(git_ops, command, args, on_event=on_event)
         print(json.dumps(result))
 
     except Exception as e:
@@ -591,4 +1956,4 @@ def main():
         sys.exit(1)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Dict, List, Any, Optional
+
+class GraphLayout:
+    """Incremental lane layout for the commit graph.
+
+    Commits are fed one row at a time in `git log` order (children before
+    parents). Each row gets a column, a color index and the edge segments
+    that arrive at it from the previous row, as a flat array of
+    (from_column, to_column, color) triples. Only the currently open lanes
+    are kept, so memory is bounded by the graph width, not the history
+    length, and the next page simply continues from the current state.
+    """
+
+    def __init__(self, color_count: int = 8):
+        self.color_count = color_count
+        self.lanes: List[Optional[str]] = []  # commit hash each lane is waiting for
+        self.colors: List[int] = []
+        self.sources: List[List[int]] = []    # previous-row columns feeding each lane
+        self.next_color = 0
+        self.rows = 0
+
+    def add(self, commit_hash: str, parents: List[str]) -> Dict[str, Any]:
+        """Lay out one commit and return its row."""
+        lanes, colors, sources = self.lanes, self.colors, self.sources
+        column = -1
+        edges = []
+
+        # Close every lane that was waiting for this commit and route the
+        # segments from the previous row into it
+        for k, waiting in enumerate(lanes):
+            if waiting is None:
+                continue
+
+            if waiting == commit_hash:
+                if column < 0:
+                    column = k
+                target = column
+                lanes[k] = None
+            else:
+                target = k
+
+            for source in sources[k]:
+                edges.extend((source, target, colors[k]))
+
+        if column < 0:
+            # Branch tip: nothing below pointed at it yet
+            column = self._allocate()
+        color = colors[column]
+
+        for k, waiting in enumerate(lanes):
+            sources[k] = [k] if waiting is not None else []
+
+        if parents:
+            existing = self._find(parents[0])
+            if existing is None:
+                lanes[column] = parents[0]
+                sources[column] = [column]
+            else:
+                sources[existing].append(column)
+
+            for parent in parents[1:]:
+                existing = self._find(parent)
+                if existing is None:
+                    existing = self._allocate()
+                    lanes[existing] = parent
+                    sources[existing] = [column]
+                else:
+                    sources[existing].append(column)
+
+        while lanes and lanes[-1] is None:
+            lanes.pop()
+            colors.pop()
+            sources.pop()
+
+        self.rows += 1
+        return {
+            'column': column,
+            'color': color,
+            'edges': edges
+        }
+
+    def _find(self, commit_hash: str) -> Optional[int]:
+        try:
+            return self.lanes.index(commit_hash)
+        except ValueError:
+            return None
+
+    def _allocate(self) -> int:
+        """Claim the leftmost free lane (or a new one) with a fresh color."""
+        color = self.next_color
+        self.next_color = (self.next_color + 1) % self.color_count
+
+        try:
+            k = self.lanes.index(None)
+        except ValueError:
+            self.lanes.append(None)
+            self.colors.append(color)
+            self.sources.append([])
+            return len(self.lanes) - 1
+
+        self.colors[k] = color
+        self.sources[k] = []
+        return k
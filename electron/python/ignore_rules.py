@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+import os
+import re
+import subprocess
+import threading
+from pathlib import Path
+
+class IgnoreMatcher:
+    """In-process matcher for git's ignore rules.
+
+    Reads `.gitignore` files lazily per directory, plus `info/exclude` of
+    the common git dir (which linked worktrees share) and
+    `core.excludesFile`, and applies them with git's precedence: deeper
+    `.gitignore` files win over shallower ones, which win over
+    info/exclude, which wins over the global file. As in git, nothing
+    inside an ignored directory can be re-included. Directory verdicts are
+    cached, so the common case costs one dict lookup per path component.
+    """
+
+    def __init__(self, repo_path):
+        self.repo_path = Path(repo_path)
+        self.lock = threading.Lock()
+        self.exclude_file = self._find_exclude_file()
+        self.base_rules = self._load_base_rules()
+        self.dir_rules = {}     # dir rel path -> compiled rules of its .gitignore
+        self.dir_ignored = {}   # dir rel path -> bool
+
+    def reload(self):
+        """Forget everything read so far (call when an ignore file changes)."""
+        with self.lock:
+            self.base_rules = self._load_base_rules()
+            self.dir_rules = {}
+            self.dir_ignored = {}
+
+    def is_ignored(self, rel_path, is_dir=False):
+        """Whether a repository-relative, '/'-separated path is ignored."""
+        with self.lock:
+            parent = rel_path.rpartition('/')[0]
+            if parent and self._is_dir_ignored(parent):
+                return True
+            if is_dir:
+                return self._is_dir_ignored(rel_path)
+            return self._match(rel_path, False)
+
+    def _is_dir_ignored(self, dir_path):
+        ignored = self.dir_ignored.get(dir_path)
+        if ignored is None:
+            parent = dir_path.rpartition('/')[0]
+            ignored = (bool(parent) and self._is_dir_ignored(parent)) or self._match(dir_path, True)
+            self.dir_ignored[dir_path] = ignored
+        return ignored
+
+    def _match(self, rel_path, is_dir):
+        """Apply the last matching rule, searching from highest precedence down."""
+        base = rel_path.rpartition('/')[0]
+        while True:
+            rules = self._rules_for(base)
+            if rules:
+                relative = rel_path[len(base) + 1:] if base else rel_path
+                verdict = self._last_match(rules, relative, is_dir)
+                if verdict is not None:
+                    return verdict
+            if not base:
+                break
+            base = base.rpartition('/')[0]
+
+        verdict = self._last_match(self.base_rules, rel_path, is_dir)
+        return bool(verdict)
+
+    @staticmethod
+    def _last_match(rules, path, is_dir):
+        for regex, negated, dir_only in reversed(rules):
+            if dir_only and not is_dir:
+                continue
+            if regex.match(path):
+                return not negated
+        return None
+
+    def _rules_for(self, dir_path):
+        rules = self.dir_rules.get(dir_path)
+        if rules is None:
+            rules = self._read_rules(self.repo_path / dir_path / '.gitignore')
+            self.dir_rules[dir_path] = rules
+        return rules
+
+    def _load_base_rules(self):
+        """Global excludes first, then info/exclude, so the latter wins."""
+        rules = []
+
+        excludes_file = None
+        try:
+            result = subprocess.run(
+                ['git', '-C', str(self.repo_path), 'config', '--path', 'core.excludesFile'],
+                capture_output=True,
+                text=True,
+                timeout=5
+            )
+            if result.returncode == 0 and result.stdout.strip():
+                excludes_file = Path(result.stdout.strip())
+        except Exception:
+            pass
+
+        if excludes_file is None:
+            config_home = os.environ.get('XDG_CONFIG_HOME') or os.path.join(os.path.expanduser('~'), '.config')
+            excludes_file = Path(config_home) / 'git' / 'ignore'
+
+        rules += self._read_rules(excludes_file)
+        rules += self._read_rules(self.exclude_file)
+        return rules
+
+    def _find_exclude_file(self):
+        """info/exclude lives in the common git dir, not a linked worktree's `.git` file."""
+        try:
+            result = subprocess.run(
+                ['git', '-C', str(self.repo_path), 'rev-parse', '--git-common-dir'],
+                capture_output=True,
+                text=True,
+                timeout=5
+            )
+            if result.returncode == 0 and result.stdout.strip():
+                return (self.repo_path / result.stdout.strip()).resolve() / 'info' / 'exclude'
+        except Exception:
+            pass
+        return self.repo_path / '.git' / 'info' / 'exclude'
+
+    @classmethod
+    def _read_rules(cls, path):
+        try:
+            text = path.read_text(encoding='utf-8', errors='surrogateescape')
+        except OSError:
+            return []
+
+        rules = []
+        for line in text.splitlines():
+            rule = cls._compile_rule(line)
+            if rule:
+                rules.append(rule)
+        return rules
+
+    @staticmethod
+    def _compile_rule(line):
+        """Turn one ignore-file line into (regex, negated, dir_only), or None."""
+        if not line or line.startswith('#'):
+            return None
+
+        # Trailing spaces are dropped unless escaped
+        stripped = line.rstrip(' ')
+        if stripped.endswith('\\') and len(stripped) < len(line):
+            stripped += ' '
+        line = stripped
+
+        negated = line.startswith('!')
+        if negated:
+            line = line[1:]
+        elif line.startswith('\\!') or line.startswith('\\#'):
+            line = line[1:]
+
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        if not line:
+            return None
+
+        # A slash anywhere but the end anchors the pattern to its directory
+        anchored = '/' in line
+        line = line.lstrip('/')
+
+        regex = []
+        i, n = 0, len(line)
+        while i < n:
+            c = line[i]
+            at_segment_start = i == 0 or line[i - 1] == '/'
+            if line.startswith('**', i) and at_segment_start and (i + 2 == n or line[i + 2] == '/'):
+                if i + 2 == n:
+                    regex.append('.*')
+                    i += 2
+                else:
+                    regex.append('(?:.*/)?')
+                    i += 3
+            elif c == '*':
+                regex.append('[^/]*')
+                i += 1
+            elif c == '?':
+                regex.append('[^/]')
+                i += 1
+            elif c == '[':
+                end = line.find(']', i + 2)
+                if end == -1:
+                    regex.append('\\[')
+                    i += 1
+                else:
+                    body = line[i + 1:end]
+                    if body.startswith('!'):
+                        body = '^' + body[1:]
+                    regex.append('[' + body.replace('\\', '\\\\') + ']')
+                    i = end + 1
+            elif c == '\\' and i + 1 < n:
+                regex.append(re.escape(line[i + 1]))
+                i += 2
+            else:
+                regex.append(re.escape(c))
+                i += 1
+
+        pattern = ''.join(regex)
+        if not anchored:
+            pattern = '(?:.*/)?' + pattern
+
+        try:
+            return re.compile(pattern + r'\Z', re.DOTALL), negated, dir_only
+        except re.error:
+            return None
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""Slim entry point for the Python helpers: `launch.py <helper> [args...]`.
+
+Python compiles the script it is started with from source on every run,
+while imported modules load from cached bytecode. Starting git_operations
+(1600 lines) through this file instead of directly saves that compile on
+each cold start.
+"""
+import os
+import sys
+
+HELPERS = ('git_operations', 'file_watcher', 'ai_commit')
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] not in HELPERS:
+        print(f'Usage: launch.py <{"|".join(HELPERS)}> [args...]', file=sys.stderr)
+        sys.exit(2)
+
+    helper = sys.argv.pop(1)
+    # The helper sees the argv (and trace file names) it would get if run directly
+    sys.argv[0] = os.path.join(os.path.dirname(os.path.abspath(__file__)), helper + '.py')
+    __import__(helper).main()
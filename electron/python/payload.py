@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Request bodies too big for the command line, read as they stream in.
+
+Wherever a helper expects a large payload it also accepts `-` (read it
+from stdin) or `@<path>` (read it from a file, typically a temp file the
+caller removes afterwards), so change sets and path lists are no longer
+bound by the OS argument-length limit.
+
+Requests that can originate in the renderer only take `@<path>` inside
+$GIT_GUI_PAYLOAD_DIR, the private directory the main process writes its
+payload files to (see in_payload_dir()).
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+from contextlib import contextmanager
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, BinaryIO, Iterator, TextIO
+
+READ_SIZE = 64 * 1024
+
+# Private directory the Electron main process writes payload files to
+PAYLOAD_DIR_ENV = 'GIT_GUI_PAYLOAD_DIR'
+
+def is_payload_ref(arg: str) -> bool:
+    """Whether an argument points at a payload (`-` or `@<path>`) instead of holding it."""
+    return arg == '-' or arg.startswith('@')
+
+def in_payload_dir(ref: str) -> bool:
+    """Whether `@<path>` names a file inside $GIT_GUI_PAYLOAD_DIR (symlinks resolved)."""
+    payload_dir = os.environ.get(PAYLOAD_DIR_ENV)
+    if not payload_dir or not ref.startswith('@'):
+        return False
+    base = os.path.realpath(payload_dir)
+    path = os.path.realpath(ref[1:])
+    try:
+        return path != base and os.path.commonpath([base, path]) == base
+    except ValueError:
+        # Different drives on Windows
+        return False
+
+@contextmanager
+def open_payload(ref: str, binary: bool = False):
+    """Open the stream behind `-` or `@<path>`."""
+    if ref == '-':
+        yield sys.stdin.buffer if binary else sys.stdin
+        return
+
+    path = ref[1:] if ref.startswith('@') else ref
+    with open(path, 'rb') if binary else open(path, encoding='utf-8') as stream:
+        yield stream
+
+def iter_nul_records(stream: BinaryIO) -> Iterator[str]:
+    """NUL-separated records (e.g. paths) from a binary stream, one read at a time."""
+    pending = b''
+    for chunk in iter(lambda: stream.read(READ_SIZE), b''):
+        records = (pending + chunk).split(b'\0')
+        pending = records.pop()
+        for record in records:
+            if record:
+                yield record.decode('utf-8', errors='surrogateescape')
+    if pending:
+        yield pending.decode('utf-8', errors='surrogateescape')
+
+def iter_json_values(stream: TextIO) -> Iterator[Any]:
+    """The elements of a JSON array, or JSON values one per line, from a text stream.
+
+    Values are decoded as soon as they are complete, so only the current
+    read and the value being parsed are held in memory, never the whole
+    document. Array elements must not be arrays themselves.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    at_end = False
+
+    while True:
+        # Brackets of the outer array, commas and whitespace only separate values
+        while position < len(buffer) and buffer[position] in ' \t\r\n,[]':
+            position += 1
+
+        if position < len(buffer):
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+            except ValueError:
+                if at_end:
+                    raise
+            else:
+                # A value touching the end of the buffer (a number) may continue in the next read
+                if end < len(buffer) or at_end:
+                    position = end
+                    yield value
+                    continue
+        elif at_end:
+            return
+
+        chunk = stream.read(READ_SIZE)
+        at_end = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
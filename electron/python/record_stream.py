@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Framed NDJSON output for commands whose results are long lists.
+
+Instead of one JSON document printed at the end, a streamed command
+writes one record per line as its results are produced:
+
+    {"type": "header", "command": "log", "items": "commits", ...}
+    {"type": "item", "item": {...}}          (one per commit, file or tree node)
+    {"type": "trailer", "success": true, "count": 120, "errors": [], ...}
+
+The trailer carries the rest of the command's result (cursors, totals)
+without the list itself, which the reader rebuilds from the items. Lines
+are encoded with orjson when it is installed and stdlib json otherwise.
+"""
+from __future__ import annotations
+
+import json
+import time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, BinaryIO, Callable, Dict, List, Optional
+
+VERSION = 1
+ENCODER = 'orjson' if orjson is not None else 'json'
+
+# Item lines are written in batches of about this size, or after this many
+# seconds, whichever comes first (the helpers run with unbuffered stdout)
+FLUSH_BYTES = 64 * 1024
+FLUSH_INTERVAL = 0.05
+
+def dumps(value: Any) -> bytes:
+    """One compact JSON line (without the newline) as UTF-8 bytes."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value)
+        except TypeError:
+            # Paths git could not decode carry lone surrogates, which only json escapes
+            pass
+    return json.dumps(value, separators=(',', ':')).encode()
+
+def stream_writer(stream: BinaryIO) -> Callable[[bytes], None]:
+    """A write function for a binary stream that finishes partial writes.
+
+    With unbuffered stdout, `sys.stdout.buffer` is a raw file, whose
+    write() may take only part of a large batch.
+    """
+    def write(data: bytes):
+        view = memoryview(data)
+        while view:
+            view = view[stream.write(view):]
+        stream.flush()
+    return write
+
+def header_record(command: str, items_key: str) -> Dict[str, Any]:
+    return {'type': 'header', 'version': VERSION, 'encoder': ENCODER, 'command': command, 'items': items_key}
+
+def trailer_record(result: Dict[str, Any], items_key: str, count: int) -> Dict[str, Any]:
+    """The trailer for a finished command: its result minus the streamed list, plus totals."""
+    trailer = {key: value for key, value in result.items() if key != items_key}
+    trailer['type'] = 'trailer'
+    trailer['count'] = count
+    trailer['errors'] = [result['error']] if result.get('error') else []
+    return trailer
+
+class RecordWriter:
+    """Writes the records of one streamed command through `write`.
+
+    `fields` are added to every record (the worker tags them with the
+    request id). Items are batched; the header, events and trailer go
+    out at once, after any items written before them.
+    """
+
+    def __init__(self, write: Callable[[bytes], None], command: str, items_key: str,
+                 fields: Optional[Dict[str, Any]] = None):
+        self.write = write
+        self.command = command
+        self.items_key = items_key
+        self.fields = fields or {}
+        self.count = 0
+        self.pending: List[bytes] = []
+        self.pending_bytes = 0
+        self.last_flush = time.monotonic()
+
+    def _record(self, record: Dict[str, Any]) -> bytes:
+        return dumps({**self.fields, **record} if self.fields else record) + b'\n'
+
+    def flush(self):
+        if self.pending:
+            self.write(b''.join(self.pending))
+            self.pending = []
+            self.pending_bytes = 0
+        self.last_flush = time.monotonic()
+
+    def _send(self, record: Dict[str, Any]):
+        self.pending.append(self._record(record))
+        self.flush()
+
+    def header(self):
+        self._send(header_record(self.command, self.items_key))
+
+    def item(self, value: Any):
+        line = self._record({'type': 'item', 'item': value})
+        self.pending.append(line)
+        self.pending_bytes += len(line)
+        self.count += 1
+        if self.pending_bytes >= FLUSH_BYTES or time.monotonic() - self.last_flush >= FLUSH_INTERVAL:
+            self.flush()
+
+    def event(self, event: Dict[str, Any]):
+        self._send({'type': 'event', 'event': event})
+
+    def trailer(self, result: Dict[str, Any]):
+        self._send(trailer_record(result, self.items_key, self.count))
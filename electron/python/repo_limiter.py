@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+
+from tracing import git_subcommand, tracer
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Callable, List, Optional
+
+# Subcommands that write the index (and usually refs or the worktree with it)
+INDEX_WRITERS = {
+    'add', 'am', 'apply', 'checkout', 'cherry-pick', 'clean', 'commit', 'init', 'merge',
+    'mv', 'pull', 'read-tree', 'rebase', 'reset', 'restore', 'revert', 'rm', 'stash', 'switch',
+    'update-index'
+}
+
+def is_index_writer(args: List[str]) -> bool:
+    return git_subcommand(args) in INDEX_WRITERS
+
+class RepoLimiter:
+    """Per-repository gate for the git processes we start.
+
+    Read-only commands share up to `max_readers` slots and run in parallel;
+    commands that write the index take the repository exclusively, so two of
+    ours never race for index.lock and no reader sees a half-written index.
+    A waiting writer holds back new readers, so a steady stream of status
+    queries cannot starve a commit.
+    """
+
+    def __init__(self, max_readers: int = 4):
+        self.max_readers = max_readers
+        self.cond = threading.Condition()
+        self.readers = 0
+        self.writer = False
+        self.waiting_writers = 0
+
+    @contextmanager
+    def reading(self):
+        with self.cond:
+            while self.writer or self.waiting_writers or self.readers >= self.max_readers:
+                self.cond.wait()
+            self.readers += 1
+        try:
+            yield
+        finally:
+            with self.cond:
+                self.readers -= 1
+                self.cond.notify_all()
+
+    @contextmanager
+    def writing(self):
+        with self.cond:
+            self.waiting_writers += 1
+            try:
+                while self.writer or self.readers:
+                    self.cond.wait()
+            finally:
+                self.waiting_writers -= 1
+            self.writer = True
+        try:
+            yield
+        finally:
+            with self.cond:
+                self.writer = False
+                self.cond.notify_all()
+
+    def gate(self, args: List[str]):
+        """The context manager that `git <args>` has to run under."""
+        return self.writing() if is_index_writer(args) else self.reading()
+
+def run_parallel(*calls: Callable[[], Any]) -> List[Any]:
+    """Run independent calls concurrently and return their results in order.
+
+    The first call runs on the current thread, each other one on a short-lived
+    thread of its own (cheaper to start than a pool is to import, and safe to
+    nest). The first exception raised is re-raised once all calls finished.
+    """
+    results: List[Any] = [None] * len(calls)
+    errors: List[Optional[BaseException]] = [None] * len(calls)
+
+    def run(index: int, call: Callable[[], Any]):
+        try:
+            results[index] = call()
+        except BaseException as e:
+            errors[index] = e
+
+    threads = [threading.Thread(target=run, args=(index, tracer.bind(call)), daemon=True)
+               for index, call in enumerate(calls) if index]
+    for thread in threads:
+        thread.start()
+    if calls:
+        run(0, calls[0])
+    for thread in threads:
+        thread.join()
+
+    for error in errors:
+        if error is not None:
+            raise error
+    return results
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Dict, List, Optional
+
+# Overrides where every on-disk cache of the helpers lives
+CACHE_DIR_ENV = 'GIT_GUI_CACHE_DIR'
+
+def default_cache_dir() -> Path:
+    """The per-user cache directory of the app."""
+    override = os.environ.get(CACHE_DIR_ENV)
+    if override:
+        return Path(override)
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or Path.home() / 'AppData' / 'Local'
+    elif sys.platform == 'darwin':
+        base = Path.home() / 'Library' / 'Caches'
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'git-modern-gui'
+
+def cache_key(*parts: Any) -> str:
+    """Stable hash of JSON-serializable parts (dict key order does not matter)."""
+    payload = json.dumps(parts, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+class ResponseCache:
+    """Persistent JSON values on disk, one file per key.
+
+    Entries expire `ttl` seconds after they were written. Reading an entry
+    marks it as recently used; once the cache holds more than `max_entries`
+    or `max_bytes`, the least recently used entries are removed. Writes go
+    through a rename, so several processes can share one directory.
+    """
+
+    def __init__(self, directory: Path, ttl: float = 7 * 24 * 3600,
+                 max_entries: int = 500, max_bytes: int = 8 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f'{key}.json'
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding='utf-8'))
+            if time.time() - entry['created'] > self.ttl:
+                path.unlink()
+                return None
+            os.utime(path)
+            return entry['value']
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def put(self, key: str, value: Any):
+        """Store `value`; failures to write are ignored, the cache is only an optimization."""
+        import tempfile
+
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            handle, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(handle, 'w', encoding='utf-8') as temp:
+                json.dump({'created': time.time(), 'value': value}, temp)
+            os.replace(temp_path, self._path(key))
+        except OSError:
+            return
+        self.evict()
+
+    def evict(self):
+        """Drop expired entries, then the least recently used ones over the limits."""
+        with self.lock:
+            entries: List[Dict[str, Any]] = []
+            try:
+                paths = list(self.directory.glob('*.json'))
+            except OSError:
+                return
+
+            now = time.time()
+            for path in paths:
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                # Last use is at least as recent as creation, so this is a safe expiry test
+                if now - stat.st_mtime > self.ttl:
+                    self._remove(path)
+                else:
+                    entries.append({'path': path, 'used': stat.st_mtime, 'size': stat.st_size})
+
+            entries.sort(key=lambda entry: entry['used'])
+            total = sum(entry['size'] for entry in entries)
+            while entries and (len(entries) > self.max_entries or total > self.max_bytes):
+                entry = entries.pop(0)
+                total -= entry['size']
+                self._remove(entry['path'])
+
+    def clear(self):
+        for path in self.directory.glob('*.json'):
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path: Path):
+        try:
+            path.unlink()
+        except OSError:
+            pass
@@ -0,0 +1,102 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# The helpers import each other as top-level modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+@pytest.fixture
+def stand_in_api():
+    """Local stand-in for the chat completions API that counts requests and connections."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    counts = {'requests': 0, 'connections': 0, 'streamed': 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def setup(self):
+            counts['connections'] += 1
+            super().setup()
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)))
+            counts['requests'] += 1
+            if request.get('stream'):
+                counts['streamed'] += 1
+                self.stream()
+                return
+
+            body = json.dumps({
+                'model': 'stand-in',
+                'choices': [{'message': {'content': 'feat: Stand-in message'}}],
+                'usage': {}
+            }).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def stream(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for data in [b': PROCESSING\n\n',
+                         b'data: {"model": "stand-in", "choices": [{"delta": {"content": "feat:"}}]}\n\n',
+                         b'data: {"choices": [{"delta": {"content": " Streamed"}}]}\n\n',
+                         b'data: [DONE]\n\n', b'']:
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+                self.wfile.flush()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_port}', counts
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def run_git(repo, *args, input=None):
+    """Run git in `repo` with a fixed identity; returns stdout, raises on failure."""
+    result = subprocess.run(
+        ['git', '-C', str(repo), '-c', 'user.name=Test', '-c', 'user.email=test@example.com'] + list(args),
+        input=input, capture_output=True, text=True, check=True
+    )
+    return result.stdout
+
+@pytest.fixture
+def git():
+    return run_git
+
+@pytest.fixture
+def git_repo(tmp_path, monkeypatch):
+    """An empty repository on branch main, isolated from the user's git configuration."""
+    monkeypatch.setenv('GIT_CONFIG_GLOBAL', os.devnull)
+    monkeypatch.setenv('GIT_CONFIG_NOSYSTEM', '1')
+    monkeypatch.setenv('XDG_CONFIG_HOME', str(tmp_path / 'config'))
+    repo = tmp_path / 'repo'
+    subprocess.run(['git', 'init', '-q', '-b', 'main', str(repo)], check=True)
+    return repo
+
+@pytest.fixture
+def remote_repo(git_repo, tmp_path):
+    """(bare remote, clone) where `git_repo` has one commit pushed to the bare remote as main."""
+    bare = tmp_path / 'remote.git'
+    subprocess.run(['git', 'init', '-q', '--bare', '-b', 'main', str(bare)], check=True)
+    (git_repo / 'README.md').write_text('hello\n')
+    run_git(git_repo, 'add', 'README.md')
+    run_git(git_repo, 'commit', '-q', '-m', 'Initial commit')
+    run_git(git_repo, 'remote', 'add', 'origin', str(bare))
+    run_git(git_repo, 'push', '-q', '-u', 'origin', 'main')
+    return bare, git_repo
@@ -0,0 +1,121 @@
+import json
+
+from ai_commit import AICommitGenerator, generate_with_fallback, iter_sse_data, normalize_changes
+from response_cache import ResponseCache
+
+CHANGES = [{'status': 'M', 'file': 'src/app.py'}, {'status': 'A', 'file': 'README.md'}]
+
+def make_generator(base_url, tmp_path):
+    return AICommitGenerator('test-key', base_url, ResponseCache(tmp_path / 'cache'))
+
+def test_cache_hit_sends_no_request(stand_in_api, tmp_path):
+    base_url, counts = stand_in_api
+    generator = make_generator(base_url, tmp_path)
+
+    first = generator.generate_commit_message(CHANGES)
+    second = generator.generate_commit_message(CHANGES)
+    generator.close()
+
+    assert first['success'] and first['cached'] is False
+    assert second['message'] == first['message'] == 'feat: Stand-in message'
+    assert second['cached'] is True
+    assert counts['requests'] == 1
+
+def test_refresh_bypasses_cache(stand_in_api, tmp_path):
+    base_url, counts = stand_in_api
+    generator = make_generator(base_url, tmp_path)
+
+    generator.generate_commit_message(CHANGES)
+    result = generator.generate_commit_message(CHANGES, refresh=True)
+    generator.close()
+
+    assert result['cached'] is False
+    assert counts['requests'] == 2
+
+def test_pooled_connection_is_reused(stand_in_api, tmp_path):
+    base_url, counts = stand_in_api
+    generator = make_generator(base_url, tmp_path)
+
+    for _ in range(3):
+        assert generator.generate_commit_message(CHANGES, refresh=True)['success']
+    generator.close()
+
+    assert counts['requests'] == 3
+    assert counts['connections'] == 1
+
+def test_fallback_without_api_key(tmp_path, monkeypatch):
+    monkeypatch.delenv('OPENROUTER_API_KEY', raising=False)
+    generator = AICommitGenerator(None, 'http://127.0.0.1:9', ResponseCache(tmp_path / 'cache'))
+
+    result = generate_with_fallback(generator, CHANGES)
+
+    assert result['success'] and result['model'] == 'fallback'
+
+def test_cache_hit_skips_context(stand_in_api, tmp_path, monkeypatch, git_repo):
+    import commit_context
+    from git_operations import GitOperations
+
+    base_url, counts = stand_in_api
+    generator = make_generator(base_url, tmp_path)
+    (git_repo / 'a.txt').write_text('a\n')
+    git_ops = GitOperations(str(git_repo))
+    git_ops.run_git_command(['add', 'a.txt'])
+
+    builds = []
+    build = commit_context.build_commit_context
+    monkeypatch.setattr(commit_context, 'build_commit_context', lambda *args: builds.append(1) or build(*args))
+
+    changes = [{'status': 'A', 'file': 'a.txt'}]
+    first = generate_with_fallback(generator, changes, git_ops)
+    second = generate_with_fallback(generator, changes, git_ops)
+    generator.close()
+
+    assert first['model'] == 'stand-in' and second['cached'] is True
+    assert len(builds) == 1
+    assert counts['requests'] == 1
+
+def test_streamed_message(stand_in_api, tmp_path):
+    base_url, counts = stand_in_api
+    generator = make_generator(base_url, tmp_path)
+    deltas = []
+
+    result = generator.generate_commit_message(CHANGES, on_delta=deltas.append)
+    cached = generator.generate_commit_message(CHANGES, on_delta=deltas.append)
+    generator.close()
+
+    assert result['success'] and result['message'] == 'feat: Streamed'
+    assert deltas == ['feat:', ' Streamed', 'feat: Streamed']
+    assert cached['cached'] is True
+    assert counts['streamed'] == 1
+
+def test_iter_sse_data_across_chunks():
+    chunks = [b': comment\n\nda', b'ta: one\n\nevent: x\ndata: two\n', b'\n']
+    assert list(iter_sse_data(chunks)) == ['one', 'two']
+
+def test_normalize_changes_drops_extra_fields():
+    assert normalize_changes([{'status': 'D', 'file': 'a', 'diff': '...'}, 'b']) == [
+        {'status': 'D', 'file': 'a'},
+        {'status': 'M', 'file': 'b'}
+    ]
+
+def test_worker_reads_change_files_only_from_the_payload_dir(tmp_path, monkeypatch, git_repo):
+    from git_operations import GitOperations, run_ai_commit_command
+    from payload import PAYLOAD_DIR_ENV
+
+    monkeypatch.delenv('OPENROUTER_API_KEY', raising=False)
+    payload_dir = tmp_path / 'payloads'
+    payload_dir.mkdir()
+    monkeypatch.setenv(PAYLOAD_DIR_ENV, str(payload_dir))
+    generator = AICommitGenerator(None, 'http://127.0.0.1:9', ResponseCache(tmp_path / 'cache'))
+    git_ops = GitOperations(str(git_repo))
+
+    changes_file = payload_dir / 'changes-1.json'
+    changes_file.write_text('\n'.join(json.dumps(change) for change in CHANGES) + '\n')
+    result = run_ai_commit_command(generator, git_ops, [f'@{changes_file}'])
+    assert result['success'] and result['model'] == 'fallback'
+
+    elsewhere = tmp_path / 'changes.json'
+    elsewhere.write_text(json.dumps(CHANGES))
+    refused = run_ai_commit_command(generator, git_ops, [f'@{elsewhere}'])
+    assert not refused['success'] and 'payload directory' in refused['error']
+    assert not run_ai_commit_command(generator, git_ops, ['-'])['success']
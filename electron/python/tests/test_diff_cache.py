@@ -0,0 +1,63 @@
+import pytest
+
+from git_operations import GitOperations
+from tracing import tracer
+
+def diff_runs():
+    return tracer.stats()['commands'].get('diff', {}).get('count', 0)
+
+@pytest.fixture
+def repo(git_repo, git):
+    for name in ('a.txt', 'b.txt'):
+        (git_repo / name).write_text('one\n')
+    git(git_repo, 'add', '.')
+    git(git_repo, 'commit', '-q', '-m', 'Initial commit')
+    (git_repo / 'a.txt').write_text('one\ntwo\n')
+    (git_repo / 'b.txt').write_text('one\nthree\n')
+    return git_repo
+
+def test_repeated_diff_is_cached(repo):
+    git_ops = GitOperations(str(repo))
+    before = diff_runs()
+
+    first = git_ops.get_diff('a.txt')
+    second = git_ops.get_diff('a.txt')
+
+    assert diff_runs() - before == 1
+    assert second == first
+    assert '+two' in first['diff']
+
+def test_editing_one_file_only_misses_for_that_file(repo):
+    git_ops = GitOperations(str(repo))
+    git_ops.get_diff('a.txt')
+    git_ops.get_diff('b.txt')
+    before = diff_runs()
+
+    (repo / 'a.txt').write_text('one\ntwo\nfour\n')
+
+    assert '+four' in git_ops.get_diff('a.txt')['diff']
+    assert '+three' in git_ops.get_diff('b.txt')['diff']
+    assert diff_runs() - before == 1
+
+def test_staged_diff_follows_the_index(repo, git):
+    git_ops = GitOperations(str(repo))
+    git(repo, 'add', 'a.txt')
+    assert '+two' in git_ops.get_diff('a.txt', staged=True)['diff']
+
+    (repo / 'a.txt').write_text('one\nfive\n')
+    git(repo, 'add', 'a.txt')
+
+    staged = git_ops.get_diff('a.txt', staged=True)['diff']
+    assert '+five' in staged and '+two' not in staged
+
+def test_structured_and_text_diffs_are_cached_apart(repo):
+    git_ops = GitOperations(str(repo))
+    git_ops.get_diff('a.txt')
+    before = diff_runs()
+
+    structured = git_ops.get_structured_diff('a.txt')
+    again = git_ops.get_structured_diff('a.txt')
+
+    assert diff_runs() - before == 1
+    assert again == structured
+    assert structured['files'][0]['additions'] == 1
@@ -0,0 +1,75 @@
+from diff_parser import iter_diff_files, unquote_path
+
+DIFF = '''diff --git a/app.py b/app.py
+index 1111111..2222222 100644
+--- a/app.py
++++ b/app.py
+@@ -1,3 +1,4 @@ def main():
+ import os
+-import sys
++import re
++import json
+ print()
+@@ -10 +11 @@
+-old
++new
+diff --git a/gone.txt b/gone.txt
+deleted file mode 100644
+index 3333333..0000000
+--- a/gone.txt
++++ /dev/null
+@@ -1 +0,0 @@
+-bye
+diff --git a/old name.txt b/new name.txt
+similarity index 100%
+rename from old name.txt
+rename to new name.txt
+diff --git a/logo.png b/logo.png
+new file mode 100644
+index 0000000..4444444
+Binary files /dev/null and b/logo.png differ
+'''.splitlines()
+
+def parse(lines=DIFF, **kwargs):
+    return [diff_file for diff_file, _ in iter_diff_files(lines, **kwargs)]
+
+def test_files_and_statuses():
+    files = parse()
+    assert [(f['file'], f['status']) for f in files] == [
+        ('app.py', 'M'), ('gone.txt', 'D'), ('new name.txt', 'R'), ('logo.png', 'A')
+    ]
+    assert files[2]['old_file'] == 'old name.txt'
+    assert files[3]['binary'] is True
+
+def test_more_follows_flag():
+    flags = [more for _, more in iter_diff_files(DIFF)]
+    assert flags == [True, True, True, False]
+
+def test_hunks_and_line_numbers():
+    app = parse()[0]
+    assert (app['additions'], app['deletions'], app['hunk_count']) == (3, 2, 2)
+
+    first, second = app['hunks']
+    assert (first['old_start'], first['old_count'], first['new_start'], first['new_count']) == (1, 3, 1, 4)
+    assert (second['old_count'], second['new_count']) == (1, 1)
+    assert [(line['type'], line.get('old_line'), line.get('new_line')) for line in first['lines']] == [
+        ('context', 1, 1), ('removed', 2, None), ('added', None, 2), ('added', None, 3), ('context', 3, 4)
+    ]
+
+def test_line_cap_truncates():
+    app = parse(max_lines=4)[0]
+    assert app['truncated'] is True
+    assert sum(len(hunk['lines']) for hunk in app['hunks']) == 3
+    assert app['more_hunks'] == 1
+    # Counts still cover the whole file
+    assert app['additions'] == 3
+
+def test_skip_keeps_counts_only():
+    files = parse(skip=1)
+    assert files[0]['hunks'] == [] and files[0]['additions'] == 3
+    assert len(files[1]['hunks']) == 1
+
+def test_unquote_path():
+    assert unquote_path('"a\\tb"') == 'a\tb'
+    assert unquote_path('"caf\\303\\251.txt"') == 'café.txt'
+    assert unquote_path('plain.txt') == 'plain.txt'
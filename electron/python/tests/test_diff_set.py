@@ -0,0 +1,80 @@
+import pytest
+
+from git_operations import GitOperations
+
+@pytest.fixture
+def repo(git_repo, git):
+    (git_repo / 'edit.txt').write_text('one\n')
+    (git_repo / 'remove.txt').write_text('one\ntwo\n')
+    git(git_repo, 'add', '.')
+    git(git_repo, 'commit', '-q', '-m', 'Initial commit')
+
+    (git_repo / 'edit.txt').write_text('one\nstaged\n')
+    git(git_repo, 'add', 'edit.txt')
+    (git_repo / 'edit.txt').write_text('one\nstaged\nunstaged\n')
+    (git_repo / 'remove.txt').unlink()
+    (git_repo / 'image.bin').write_bytes(b'\0\1\2' * 10)
+    git(git_repo, 'add', 'image.bin')
+    return git_repo
+
+def summary(result):
+    return [(entry['file'], entry['status'], entry['additions'], entry['deletions'])
+            for entry in result['files']]
+
+def test_all_mode_lists_every_file_without_hunks(repo):
+    result = GitOperations(str(repo)).get_diff_set('all')
+
+    assert result['success']
+    assert summary(result) == [
+        ('edit.txt', 'M', 2, 0),
+        ('image.bin', 'A', None, None),
+        ('remove.txt', 'D', 0, 2),
+    ]
+    assert (result['total'], result['additions'], result['deletions']) == (3, 2, 2)
+    assert all('hunks' not in entry for entry in result['files'])
+
+@pytest.mark.parametrize('mode, expected', [
+    ('staged', [('edit.txt', 1, 0), ('image.bin', None, None)]),
+    ('unstaged', [('edit.txt', 1, 0), ('remove.txt', 0, 2)]),
+])
+def test_modes_compare_the_right_sides(repo, mode, expected):
+    result = GitOperations(str(repo)).get_diff_set(mode)
+
+    assert [(file, added, deleted) for file, _, added, deleted in summary(result)] == expected
+
+def test_file_hunks_are_fetched_from_the_set(repo):
+    git_ops = GitOperations(str(repo))
+    result = git_ops.get_diff_set('all')
+
+    body = git_ops.get_diff_set_file(result['set_id'], 0)
+
+    assert body['success']
+    lines = [line for hunk in body['file']['hunks'] for line in hunk['lines']]
+    assert len(lines) == 3
+    inline = git_ops.get_diff_set('all', include_bodies=True)
+    assert inline['files'][0]['hunks'] == body['file']['hunks']
+
+def test_streamed_entries_match_listed_ones(repo):
+    git_ops = GitOperations(str(repo))
+    streamed = []
+
+    result = git_ops.get_diff_set('all', on_item=streamed.append)
+
+    assert result['files'] == []
+    assert streamed == git_ops.get_diff_set('all')['files']
+
+def test_unknown_set_mode_and_index_are_errors(repo):
+    git_ops = GitOperations(str(repo))
+    set_id = git_ops.get_diff_set('all')['set_id']
+
+    assert not git_ops.get_diff_set('sideways')['success']
+    assert not git_ops.get_diff_set_file('0' * 12, 0)['success']
+    assert not git_ops.get_diff_set_file(set_id, 3)['success']
+
+def test_old_sets_expire(repo):
+    git_ops = GitOperations(str(repo))
+    first = git_ops.get_diff_set('all')['set_id']
+    for _ in range(GitOperations.MAX_DIFF_SETS):
+        git_ops.get_diff_set('all')
+
+    assert 'expired' in git_ops.get_diff_set_file(first, 0)['error']
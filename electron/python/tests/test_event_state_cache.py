@@ -0,0 +1,37 @@
+from file_watcher import EventStateCache
+
+def test_repeated_state_is_a_hit():
+    cache = EventStateCache()
+
+    assert cache.update('a.py', 'modified', ' M')
+    assert not cache.update('a.py', 'modified', ' M')
+    assert cache.update('a.py', 'modified', 'M ')
+    assert cache.update('a.py', 'deleted', 'M ')
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 3, 1)
+    assert stats['status_codes'] == 2
+
+def test_least_recently_used_entry_is_evicted():
+    cache = EventStateCache(max_entries=2)
+    cache.update('a.py', 'modified', ' M')
+    cache.update('b.py', 'modified', ' M')
+    # Touching a.py makes b.py the oldest entry
+    assert not cache.update('a.py', 'modified', ' M')
+
+    cache.update('c.py', 'created', '??')
+
+    assert list(cache.entries) == ['a.py', 'c.py']
+    assert cache.stats()['evictions'] == 1
+    # An evicted path is reported again even though its state is the same
+    assert cache.update('b.py', 'modified', ' M')
+
+def test_status_codes_are_interned():
+    cache = EventStateCache(max_entries=1000)
+    for index in range(500):
+        cache.update(f'f{index}.py', 'modified', ' M' if index % 2 else '??')
+
+    stats = cache.stats()
+    assert stats['entries'] == 500
+    assert stats['status_codes'] == 2
+    assert stats['approx_bytes'] > 0
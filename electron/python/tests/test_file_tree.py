@@ -0,0 +1,74 @@
+import subprocess
+
+import pytest
+
+from git_operations import GitOperations
+
+@pytest.fixture
+def tree_repo(git_repo, git):
+    for path in ('README.md', 'src/app.py', 'src/lib/util.py', 'docs/guide.md'):
+        (git_repo / path).parent.mkdir(parents=True, exist_ok=True)
+        (git_repo / path).write_text(f'{path}\n')
+    (git_repo / '.gitignore').write_text('build/\n')
+    git(git_repo, 'add', '-A')
+    git(git_repo, 'commit', '-q', '-m', 'Initial commit')
+
+    (git_repo / 'src/app.py').write_text('changed\n')
+    (git_repo / 'src/lib/new.py').write_text('new\n')
+    (git_repo / 'build').mkdir()
+    (git_repo / 'build/out.js').write_text('ignored\n')
+    return git_repo
+
+def flatten(node):
+    yield node
+    for child in node['children'] or []:
+        yield from flatten(child)
+
+def test_tree(tree_repo):
+    result = GitOperations(str(tree_repo)).get_file_tree()
+
+    assert result['success'] and result['total_files'] == 6
+    nodes = {node['path']: node for node in flatten(result['tree'])}
+    assert 'build' not in nodes and 'build/out.js' not in nodes
+    assert nodes['src/lib']['type'] == 'folder'
+    assert nodes['src/app.py']['status'] == 'M'
+    assert nodes['src/lib/new.py']['status'] == '??'
+    assert nodes['docs/guide.md']['status'] == ''
+
+def test_streamed_tree_matches(tree_repo):
+    git_ops = GitOperations(str(tree_repo))
+    nested = {node['path']: node['status'] for node in flatten(git_ops.get_file_tree()['tree'])}
+    streamed = []
+
+    result = git_ops.get_file_tree(on_item=streamed.append)
+
+    assert result['total_files'] == 6
+    assert {node['path']: node['status'] for node in streamed} == nested
+    # Every folder arrives before anything inside it
+    seen = set()
+    for node in streamed:
+        parent = node['path'].rpartition('/')[0] or '.'
+        assert node['path'] == '.' or parent in seen
+        seen.add(node['path'])
+
+def test_conflicted_path_listed_once(git_repo, git):
+    (git_repo / 'both.txt').write_text('base\n')
+    git(git_repo, 'add', 'both.txt')
+    git(git_repo, 'commit', '-q', '-m', 'base')
+    git(git_repo, 'checkout', '-q', '-b', 'other')
+    (git_repo / 'both.txt').write_text('other\n')
+    git(git_repo, 'commit', '-q', '-am', 'other')
+    git(git_repo, 'checkout', '-q', 'main')
+    (git_repo / 'both.txt').write_text('main\n')
+    git(git_repo, 'commit', '-q', '-am', 'main')
+    with pytest.raises(subprocess.CalledProcessError):
+        git(git_repo, 'merge', '-q', 'other')
+
+    git_ops = GitOperations(str(git_repo))
+    tree = git_ops.get_file_tree()
+    streamed = []
+    git_ops.get_file_tree(on_item=streamed.append)
+
+    assert [node['path'] for node in flatten(tree['tree'])] == ['.', 'both.txt']
+    assert tree['total_files'] == 1
+    assert [node['path'] for node in streamed] == ['.', 'both.txt']
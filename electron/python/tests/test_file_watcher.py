@@ -0,0 +1,131 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import file_watcher
+from file_watcher import GitFileChangeHandler
+
+def event(event_type, path, dest_path=None, is_directory=False):
+    return SimpleNamespace(event_type=event_type, src_path=str(path), dest_path=str(dest_path or ''),
+                           is_directory=is_directory)
+
+@pytest.fixture
+def messages(monkeypatch):
+    emitted = []
+    monkeypatch.setattr(file_watcher, 'emit', emitted.append)
+    return emitted
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.02)
+
+def batches(messages):
+    return [message for message in messages if message.get('event') == 'batch']
+
+def reported(messages):
+    return [change['path'] for message in batches(messages) for change in message['changes']]
+
+def test_burst_is_one_batch(git_repo, messages):
+    handler = GitFileChangeHandler(git_repo, quiet_window=0.1)
+    for index in range(20):
+        (git_repo / f'f{index}.txt').write_text('x\n')
+        handler.dispatch(event('created', git_repo / f'f{index}.txt'))
+        handler.dispatch(event('modified', git_repo / f'f{index}.txt'))
+
+    wait_for(lambda: batches(messages))
+    time.sleep(0.3)
+
+    assert len(batches(messages)) == 1
+    batch = batches(messages)[0]
+    assert batch['count'] == 20 and batch['truncated'] == 0
+    assert {change['git_status'] for change in batch['changes']} == {'??'}
+    assert {change['event'] for change in batch['changes']} == {'modified'}
+
+def test_overflow_is_carried_to_next_batches(git_repo, messages):
+    handler = GitFileChangeHandler(git_repo, quiet_window=0.05, max_batch=3)
+    paths = [f'f{index}.txt' for index in range(7)]
+    for path in paths:
+        (git_repo / path).write_text('x\n')
+        handler.dispatch(event('created', git_repo / path))
+
+    wait_for(lambda: len(reported(messages)) == 7)
+
+    assert [(message['count'], message['truncated']) for message in batches(messages)] == [(3, 4), (3, 1), (1, 0)]
+    assert sorted(reported(messages)) == paths
+
+def test_unchanged_state_is_not_reported_again(git_repo, messages):
+    handler = GitFileChangeHandler(git_repo, quiet_window=0.05)
+    (git_repo / 'a.txt').write_text('x\n')
+    handler.dispatch(event('modified', git_repo / 'a.txt'))
+    wait_for(lambda: reported(messages))
+    handler.dispatch(event('modified', git_repo / 'a.txt'))
+    time.sleep(0.3)
+
+    assert reported(messages) == ['a.txt']
+
+def test_paths_inside_git_dir_are_dropped(git_repo, messages):
+    handler = GitFileChangeHandler(git_repo, quiet_window=0.05)
+    handler.dispatch(event('modified', git_repo / '.git' / 'index'))
+    handler.dispatch(event('modified', '/somewhere/else.txt'))
+    assert handler.pending == {}
+
+class FakeObserver:
+    def __init__(self):
+        self.watches = set()
+
+    def schedule(self, handler, path, recursive):
+        self.watches.add(path)
+        return path
+
+    def unschedule(self, watch):
+        self.watches.remove(watch)
+
+@pytest.fixture
+def watched(git_repo, messages):
+    (git_repo / 'src').mkdir()
+    (git_repo / 'src/a.py').write_text('a\n')
+    (git_repo / 'node_modules').mkdir()
+    (git_repo / '.gitignore').write_text('node_modules/\n*.log\n')
+    handler = GitFileChangeHandler(git_repo, quiet_window=0.05)
+    handler.observer = FakeObserver()
+    for name in handler.top_level_dirs():
+        handler.watch_directory(name)
+    return handler
+
+def test_ignored_paths_are_dropped(watched, git_repo):
+    assert watched.observer.watches == {str(git_repo / 'src')}
+    watched.dispatch(event('modified', git_repo / 'src' / 'debug.log'))
+    watched.dispatch(event('created', git_repo / 'node_modules' / 'pkg' / 'index.js'))
+    watched.dispatch(event('modified', git_repo / 'src' / 'a.py'))
+    assert list(watched.pending) == ['src/a.py']
+
+def test_new_directory_is_watched_and_scanned(watched, git_repo, messages):
+    (git_repo / 'lib' / 'deep').mkdir(parents=True)
+    (git_repo / 'lib' / 'deep' / 'x.py').write_text('x\n')
+    (git_repo / 'lib' / 'skip.log').write_text('x\n')
+
+    watched.dispatch(event('created', git_repo / 'lib', is_directory=True))
+
+    assert str(git_repo / 'lib') in watched.observer.watches
+    wait_for(lambda: 'lib/deep/x.py' in reported(messages))
+    assert 'lib/skip.log' not in reported(messages)
+
+def test_moved_directory_reports_both_sides(watched, git_repo, messages):
+    (git_repo / 'src').rename(git_repo / 'app')
+
+    watched.dispatch(event('moved', git_repo / 'src', git_repo / 'app', is_directory=True))
+
+    assert watched.observer.watches == {str(git_repo / 'app')}
+    wait_for(lambda: {'src/a.py', 'app/a.py'} <= set(reported(messages)))
+
+def test_gitignore_change_updates_watches(watched, git_repo, messages):
+    (git_repo / 'node_modules' / 'kept.js').write_text('x\n')
+    (git_repo / '.gitignore').write_text('src/\n')
+
+    watched.dispatch(event('modified', git_repo / '.gitignore'))
+
+    assert watched.observer.watches == {str(git_repo / 'node_modules')}
+    wait_for(lambda: 'node_modules/kept.js' in reported(messages))
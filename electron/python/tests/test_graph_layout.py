@@ -0,0 +1,36 @@
+from graph_layout import GraphLayout
+
+def layout(commits, color_count=8):
+    graph = GraphLayout(color_count)
+    return [graph.add(commit, parents) for commit, parents in commits]
+
+def test_linear_history_stays_in_one_column():
+    rows = layout([('c', ['b']), ('b', ['a']), ('a', [])])
+    assert [row['column'] for row in rows] == [0, 0, 0]
+    assert rows[0]['edges'] == []
+    assert rows[1]['edges'] == [0, 0, rows[0]['color']]
+
+def test_merge_opens_and_closes_a_lane():
+    rows = layout([
+        ('m', ['a', 'f']),   # merge of feature f into a
+        ('f', ['a']),
+        ('a', []),
+    ])
+    assert [row['column'] for row in rows] == [0, 1, 0]
+    assert rows[1]['color'] != rows[0]['color']
+    # Both lanes end in the root
+    edges = rows[2]['edges']
+    assert sorted(zip(edges[0::3], edges[1::3])) == [(0, 0), (1, 0)]
+
+def test_branch_tips_get_new_columns():
+    rows = layout([('x', ['base']), ('y', ['base']), ('base', [])])
+    assert [row['column'] for row in rows] == [0, 1, 0]
+
+def test_lanes_are_trimmed_and_colors_wrap():
+    graph = GraphLayout(color_count=2)
+    rows = [graph.add(commit, parents) for commit, parents in [('a', ['r']), ('b', ['r']), ('c', ['r']), ('r', [])]]
+    # Tips whose parent already has a lane join it at once, freeing their column
+    assert [row['column'] for row in rows] == [0, 1, 1, 0]
+    assert [row['color'] for row in rows] == [0, 1, 0, 0]
+    assert graph.lanes == []
+    assert graph.rows == 4
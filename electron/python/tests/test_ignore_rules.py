@@ -0,0 +1,65 @@
+import subprocess
+
+from ignore_rules import IgnoreMatcher
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+def test_patterns(git_repo):
+    write(git_repo / '.gitignore', '*.log\n/build/\nnode_modules/\ndocs/**/*.tmp\n!keep.log\n\\#hash\n')
+    matcher = IgnoreMatcher(git_repo)
+
+    assert matcher.is_ignored('debug.log')
+    assert matcher.is_ignored('src/deep/trace.log')
+    assert not matcher.is_ignored('keep.log')
+    assert matcher.is_ignored('build', is_dir=True)
+    assert not matcher.is_ignored('src/build', is_dir=True)
+    # Directory-only patterns do not match files of the same name
+    assert not matcher.is_ignored('build')
+    assert matcher.is_ignored('web/node_modules/pkg/index.js')
+    assert matcher.is_ignored('docs/a/b/x.tmp')
+    assert matcher.is_ignored('docs/x.tmp')
+    assert not matcher.is_ignored('x.tmp')
+    assert matcher.is_ignored('#hash')
+
+def test_nested_gitignore_wins(git_repo):
+    write(git_repo / '.gitignore', '*.txt\n')
+    write(git_repo / 'sub' / '.gitignore', '!notes.txt\n')
+    matcher = IgnoreMatcher(git_repo)
+
+    assert matcher.is_ignored('other.txt')
+    assert not matcher.is_ignored('sub/notes.txt')
+    assert matcher.is_ignored('sub/other.txt')
+
+def test_no_reinclude_inside_ignored_directory(git_repo):
+    write(git_repo / '.gitignore', 'out/\n!out/keep.txt\n')
+    assert IgnoreMatcher(git_repo).is_ignored('out/keep.txt')
+
+def test_info_exclude_and_reload(git_repo):
+    matcher = IgnoreMatcher(git_repo)
+    assert not matcher.is_ignored('secret.env')
+
+    write(git_repo / '.git' / 'info' / 'exclude', '*.env\n')
+    matcher.reload()
+    assert matcher.is_ignored('secret.env')
+
+def test_linked_worktree_uses_common_exclude(git_repo, tmp_path):
+    git = ['git', '-C', str(git_repo), '-c', 'user.name=t', '-c', 'user.email=t@example.com']
+    write(git_repo / 'a.txt', 'a\n')
+    subprocess.run(git + ['add', 'a.txt'], check=True)
+    subprocess.run(git + ['commit', '-q', '-m', 'init'], check=True)
+    subprocess.run(git + ['worktree', 'add', '-q', str(tmp_path / 'wt')], check=True)
+    write(git_repo / '.git' / 'info' / 'exclude', 'secret*\n')
+
+    assert IgnoreMatcher(tmp_path / 'wt').is_ignored('secret.txt')
+
+def test_matches_git(git_repo):
+    write(git_repo / '.gitignore', '*.o\n!lib/*.o\n/tmp*\na/**/b\n')
+    paths = ['x.o', 'lib/y.o', 'src/lib/z.o', 'tmp1', 'src/tmp2', 'a/b', 'a/x/y/b', 'c/a/b']
+    result = subprocess.run(['git', '-C', str(git_repo), 'check-ignore', '--no-index', '--stdin'],
+                            input='\n'.join(paths), capture_output=True, text=True)
+    expected = set(result.stdout.split())
+
+    matcher = IgnoreMatcher(git_repo)
+    assert {path for path in paths if matcher.is_ignored(path)} == expected
@@ -0,0 +1,66 @@
+import os
+import time
+
+import pytest
+
+from git_operations import GitOperations
+from tracing import tracer
+
+def ls_files_runs():
+    return tracer.stats()['commands'].get('ls-files', {}).get('count', 0)
+
+@pytest.fixture
+def repo(git_repo, git):
+    past = time.time() - 10
+    for path in ('README.md', 'src/app.py', 'src/lib/util.py', 'src/lib/old.py'):
+        (git_repo / path).parent.mkdir(parents=True, exist_ok=True)
+        (git_repo / path).write_text(f'{path}\n')
+        # Not racily clean, so git status leaves the index file alone
+        os.utime(git_repo / path, (past, past))
+    git(git_repo, 'add', '-A')
+    git(git_repo, 'commit', '-q', '-m', 'Initial commit')
+
+    (git_repo / 'src/app.py').write_text('changed\n')
+    (git_repo / 'src/lib/util.py').write_text('changed\n')
+    (git_repo / 'src/lib/old.py').unlink()
+    (git_repo / 'src/lib/new.py').write_text('new\n')
+    return git_repo
+
+def test_root_and_subdirectory(repo):
+    git_ops = GitOperations(str(repo))
+
+    root = git_ops.list_dir('.')
+    assert [(entry['name'], entry['type']) for entry in root['entries']] == [('src', 'folder'), ('README.md', 'file')]
+    assert root['entries'][0]['changes'] == {'modified': 2, 'deleted': 1, 'untracked': 1}
+
+    lib = git_ops.list_dir('src/lib/')
+    assert lib['path'] == 'src/lib'
+    assert {entry['name']: entry['status'] for entry in lib['entries']} == {'new.py': '??', 'old.py': 'D', 'util.py': 'M'}
+    assert lib['changes'] == {'modified': 1, 'deleted': 1, 'untracked': 1}
+
+def test_unknown_directory(repo):
+    result = GitOperations(str(repo)).list_dir('nope')
+    assert result == {'success': False, 'error': 'Not a directory: nope'}
+
+def test_path_index_rebuilt_only_when_paths_change(repo, git):
+    git_ops = GitOperations(str(repo))
+    git_ops.list_dir('.')
+    before = ls_files_runs()
+
+    # A new status with the same paths reuses the listing
+    (repo / 'README.md').write_text('edited\n')
+    git_ops.invalidate()
+    assert git_ops.list_dir('.')['entries'][1]['status'] == 'M'
+    assert ls_files_runs() == before
+
+    # A new untracked file changes the paths
+    (repo / 'extra.txt').write_text('x\n')
+    git_ops.invalidate()
+    assert 'extra.txt' in [entry['name'] for entry in git_ops.list_dir('.')['entries']]
+    assert ls_files_runs() == before + 1
+
+    # So does staging a deletion, through the index
+    git(repo, 'rm', '-q', '--cached', 'README.md')
+    git(repo, 'commit', '-q', '-m', 'Untrack README')
+    git_ops.list_dir('.')
+    assert ls_files_runs() == before + 2
@@ -0,0 +1,73 @@
+import pytest
+
+from git_operations import GitOperations
+
+@pytest.fixture
+def branchy_repo(git_repo, git, monkeypatch):
+    """Two branches merged back, every commit sharing one timestamp.
+
+        m1 - m2 - m3 ---------- m4 - merge
+                    \\                /
+                     t1 - t2 - t3 --
+    """
+    monkeypatch.setenv('GIT_AUTHOR_DATE', '2024-01-01T00:00:00Z')
+    monkeypatch.setenv('GIT_COMMITTER_DATE', '2024-01-01T00:00:00Z')
+
+    def commit(message):
+        git(git_repo, 'commit', '-q', '--allow-empty', '-m', message)
+
+    for message in ('m1', 'm2', 'm3'):
+        commit(message)
+    git(git_repo, 'checkout', '-q', '-b', 'topic')
+    for message in ('t1', 't2', 't3'):
+        commit(message)
+    git(git_repo, 'checkout', '-q', 'main')
+    commit('m4')
+    git(git_repo, 'merge', '-q', '--no-ff', '-m', 'merge', 'topic')
+    return git_repo
+
+def test_children_come_before_parents(branchy_repo):
+    commits = GitOperations(str(branchy_repo)).get_log(100)['commits']
+
+    position = {commit['hash']: index for index, commit in enumerate(commits)}
+    for commit in commits:
+        assert all(position[parent] > position[commit['hash']] for parent in commit['parents'])
+
+def test_lanes_close_at_the_merge_base(branchy_repo):
+    commits = GitOperations(str(branchy_repo)).get_log(100)['commits']
+
+    subjects = [commit['subject'] for commit in commits]
+    below_base = commits[subjects.index('m3'):]
+    # Once both branches met in m3, only one lane is left
+    for commit in below_base:
+        assert commit['graph']['column'] == 0
+    for commit in below_base[1:]:
+        assert commit['graph']['edges'] == [0, 0, commit['graph']['color']]
+
+def page_through(git_ops, limit, fresh_sessions=False):
+    commits, cursor = [], None
+    while True:
+        if cursor and fresh_sessions:
+            # An unknown session id makes get_log replay the skipped rows
+            tip, offset, _ = cursor.split(':')
+            cursor = f'{tip}:{offset}:gone'
+        page = git_ops.get_log(limit, cursor)
+        assert page['success']
+        commits += page['commits']
+        cursor = page['cursor']
+        assert page['has_more'] == (cursor is not None)
+        if not cursor:
+            return commits
+
+@pytest.mark.parametrize('fresh_sessions', [False, True])
+def test_pages_match_one_shot_load(branchy_repo, fresh_sessions):
+    git_ops = GitOperations(str(branchy_repo))
+    one_shot = git_ops.get_log(100)['commits']
+
+    for limit in (1, 2, 3):
+        paged = page_through(GitOperations(str(branchy_repo)), limit, fresh_sessions)
+        assert [(c['hash'], c['graph']) for c in paged] == [(c['hash'], c['graph']) for c in one_shot]
+
+def test_invalid_cursor(branchy_repo):
+    result = GitOperations(str(branchy_repo)).get_log(10, 'not-a-cursor')
+    assert result['success'] is False and 'Invalid log cursor' in result['error']
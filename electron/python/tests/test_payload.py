@@ -0,0 +1,57 @@
+import io
+
+import pytest
+
+import payload
+from payload import PAYLOAD_DIR_ENV, in_payload_dir, is_payload_ref, iter_json_values, iter_nul_records, open_payload
+
+def test_array_elements(monkeypatch):
+    monkeypatch.setattr(payload, 'READ_SIZE', 3)
+    stream = io.StringIO('[{"file": "a", "status": "M"}, "b", 12345, {"nested": {"x": [1, 2]}}]')
+    assert list(iter_json_values(stream)) == [{'file': 'a', 'status': 'M'}, 'b', 12345, {'nested': {'x': [1, 2]}}]
+
+def test_values_per_line():
+    stream = io.StringIO('{"a": 1}\n{"b": 2}\n\n3\n')
+    assert list(iter_json_values(stream)) == [{'a': 1}, {'b': 2}, 3]
+
+def test_number_split_across_reads(monkeypatch):
+    monkeypatch.setattr(payload, 'READ_SIZE', 2)
+    assert list(iter_json_values(io.StringIO('[123456, 7]'))) == [123456, 7]
+
+def test_empty_and_invalid():
+    assert list(iter_json_values(io.StringIO(''))) == []
+    assert list(iter_json_values(io.StringIO('[]'))) == []
+    with pytest.raises(ValueError):
+        list(iter_json_values(io.StringIO('[{"a": 1')))
+
+def test_nul_records(monkeypatch):
+    monkeypatch.setattr(payload, 'READ_SIZE', 4)
+    stream = io.BytesIO(b'first\0sec ond\0\0caf\xc3\xa9\0last')
+    assert list(iter_nul_records(stream)) == ['first', 'sec ond', 'café', 'last']
+
+def test_payload_refs(tmp_path):
+    assert is_payload_ref('-') and is_payload_ref('@/tmp/x')
+    assert not is_payload_ref('[]')
+
+    path = tmp_path / 'changes.json'
+    path.write_text('["a"]')
+    with open_payload(f'@{path}') as stream:
+        assert list(iter_json_values(stream)) == ['a']
+
+def test_payload_dir_allowlist(tmp_path, monkeypatch):
+    payload_dir = tmp_path / 'payloads'
+    payload_dir.mkdir()
+    inside = payload_dir / 'changes.json'
+    inside.write_text('[]')
+    outside = tmp_path / 'secret.txt'
+    outside.write_text('secret')
+    (payload_dir / 'escape.json').symlink_to(outside)
+
+    assert not in_payload_dir(f'@{inside}')
+    monkeypatch.setenv(PAYLOAD_DIR_ENV, str(payload_dir))
+    assert in_payload_dir(f'@{inside}')
+    assert not in_payload_dir(f'@{outside}')
+    assert not in_payload_dir(f'@{payload_dir}/../secret.txt')
+    assert not in_payload_dir(f'@{payload_dir}/escape.json')
+    assert not in_payload_dir(f'@{payload_dir}')
+    assert not in_payload_dir(str(inside))
@@ -0,0 +1,85 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import record_stream
+from record_stream import RecordWriter, dumps, stream_writer, trailer_record
+
+SCRIPT = Path(__file__).resolve().parent.parent / 'git_operations.py'
+
+def decode(writes):
+    return [json.loads(line) for data in writes for line in data.splitlines()]
+
+def test_items_are_batched_between_header_and_trailer(monkeypatch):
+    monkeypatch.setattr(record_stream, 'FLUSH_INTERVAL', 60)
+    monkeypatch.setattr(record_stream, 'FLUSH_BYTES', 100)
+    writes = []
+    writer = RecordWriter(writes.append, 'log', 'commits', {'id': 7})
+
+    writer.header()
+    for index in range(10):
+        writer.item({'hash': f'{index:040d}'})
+    writer.trailer({'success': True, 'commits': ['dropped'], 'next_cursor': 'abc'})
+
+    records = decode(writes)
+    assert [record['type'] for record in records] == ['header'] + ['item'] * 10 + ['trailer']
+    assert all(record['id'] == 7 for record in records)
+    assert records[0]['items'] == 'commits'
+    assert records[-1] == {'id': 7, 'type': 'trailer', 'success': True, 'next_cursor': 'abc',
+                           'count': 10, 'errors': []}
+    # Fewer writes than records: items went out in batches, not one per line
+    assert 2 < len(writes) < 12
+
+def test_events_flush_pending_items_first(monkeypatch):
+    monkeypatch.setattr(record_stream, 'FLUSH_INTERVAL', 60)
+    writes = []
+    writer = RecordWriter(writes.append, 'diff-set', 'files')
+
+    writer.item({'file': 'a'})
+    assert writes == []
+    writer.event({'type': 'progress'})
+
+    assert [record['type'] for record in decode(writes)] == ['item', 'event']
+
+def test_trailer_reports_errors():
+    trailer = trailer_record({'success': False, 'error': 'boom', 'files': []}, 'files', 0)
+    assert trailer == {'success': False, 'error': 'boom', 'type': 'trailer', 'count': 0, 'errors': ['boom']}
+
+def test_undecodable_paths_fall_back_to_json():
+    path = b'caf\xe9.txt'.decode('utf-8', errors='surrogateescape')
+    assert json.loads(dumps({'file': path})) == {'file': path}
+
+def test_stream_writer_finishes_partial_writes():
+    class Trickle:
+        def __init__(self):
+            self.data = b''
+
+        def write(self, view):
+            self.data += bytes(view[:3])
+            return min(3, len(view))
+
+        def flush(self):
+            pass
+
+    stream = Trickle()
+    stream_writer(stream)(b'0123456789')
+    assert stream.data == b'0123456789'
+
+def test_ndjson_log_matches_the_plain_result(git_repo, git):
+    for index in range(5):
+        git(git_repo, 'commit', '-q', '--allow-empty', '-m', f'Commit {index}')
+
+    def run(*extra):
+        return subprocess.run([sys.executable, str(SCRIPT), 'log', str(git_repo), '10', *extra],
+                              capture_output=True, check=True).stdout
+
+    plain = json.loads(run())
+    records = [json.loads(line) for line in run('--ndjson').splitlines()]
+
+    header, *items, trailer = records
+    assert header['type'] == 'header' and header['items'] == 'commits'
+    assert [record['item'] for record in items] == plain['commits']
+    assert trailer['count'] == len(plain['commits']) == 5
+    assert {key: value for key, value in trailer.items() if key not in ('type', 'count', 'errors')} == \
+        {key: value for key, value in plain.items() if key != 'commits'}
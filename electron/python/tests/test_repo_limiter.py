@@ -0,0 +1,90 @@
+import threading
+import time
+
+import pytest
+
+from repo_limiter import RepoLimiter, is_index_writer, run_parallel
+
+def hold(context, entered, release):
+    with context:
+        entered.set()
+        release.wait(5)
+
+def start(target, *args):
+    thread = threading.Thread(target=target, args=args, daemon=True)
+    thread.start()
+    return thread
+
+def test_readers_share_up_to_max_readers():
+    limiter = RepoLimiter(max_readers=2)
+    release = threading.Event()
+    entered = [threading.Event() for _ in range(3)]
+    threads = [start(hold, limiter.reading(), event, release) for event in entered]
+
+    assert entered[0].wait(5) and entered[1].wait(5)
+    assert not entered[2].wait(0.2)
+    release.set()
+    assert entered[2].wait(5)
+    for thread in threads:
+        thread.join(5)
+
+def test_writer_waits_for_readers_and_excludes_everyone():
+    limiter = RepoLimiter()
+    release_reader, release_writer = threading.Event(), threading.Event()
+    reader_in, writer_in, late_reader_in = threading.Event(), threading.Event(), threading.Event()
+
+    start(hold, limiter.reading(), reader_in, release_reader)
+    assert reader_in.wait(5)
+    start(hold, limiter.writing(), writer_in, release_writer)
+    assert not writer_in.wait(0.2)
+
+    # A waiting writer holds back new readers so it cannot be starved
+    start(hold, limiter.reading(), late_reader_in, threading.Event())
+    assert not late_reader_in.wait(0.2)
+
+    release_reader.set()
+    assert writer_in.wait(5)
+    assert not late_reader_in.wait(0.2)
+    release_writer.set()
+    assert late_reader_in.wait(5)
+
+@pytest.mark.parametrize('args, writer', [
+    (['add', '-A'], True),
+    (['-c', 'core.quotePath=false', 'commit', '-m', 'x'], True),
+    (['pull', 'origin', 'main'], True),
+    (['status', '--porcelain=v2'], False),
+    (['--literal-pathspecs', 'diff', '--cached'], False),
+    (['push', 'origin', 'main'], False),
+])
+def test_index_writers(args, writer):
+    assert is_index_writer(args) is writer
+    gate = RepoLimiter().gate(args)
+    with gate:
+        pass
+
+def test_run_parallel_overlaps_calls_and_keeps_order():
+    barrier = threading.Barrier(3, timeout=5)
+
+    def call(value):
+        def run():
+            barrier.wait()
+            return value
+        return run
+
+    # Deadlocks (and the barrier times out) unless all three run at once
+    assert run_parallel(call(1), call(2), call(3)) == [1, 2, 3]
+    assert run_parallel() == []
+
+def test_run_parallel_reraises_after_all_calls_finish():
+    finished = []
+
+    def fail():
+        raise ValueError('boom')
+
+    def slow():
+        time.sleep(0.1)
+        finished.append(True)
+
+    with pytest.raises(ValueError):
+        run_parallel(fail, slow)
+    assert finished == [True]
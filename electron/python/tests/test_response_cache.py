@@ -0,0 +1,56 @@
+import os
+import time
+
+from response_cache import ResponseCache, cache_key
+
+def test_round_trip(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.put('k', {'message': 'hello'})
+    assert cache.get('k') == {'message': 'hello'}
+    assert cache.get('missing') is None
+
+def test_cache_key_ignores_dict_order():
+    assert cache_key({'a': 1, 'b': 2}) == cache_key({'b': 2, 'a': 1})
+    assert cache_key({'a': 1}) != cache_key({'a': 2})
+
+def test_expired_entry_is_dropped(tmp_path, monkeypatch):
+    cache = ResponseCache(tmp_path, ttl=60)
+    cache.put('k', 'value')
+
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 61)
+    assert cache.get('k') is None
+    assert not (tmp_path / 'k.json').exists()
+
+def test_eviction_drops_expired_entries(tmp_path):
+    cache = ResponseCache(tmp_path, ttl=60)
+    cache.put('old', 'value')
+    past = time.time() - 120
+    os.utime(tmp_path / 'old.json', (past, past))
+
+    cache.put('new', 'value')
+
+    assert sorted(path.stem for path in tmp_path.glob('*.json')) == ['new']
+
+def test_entry_limit_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(tmp_path, max_entries=2)
+    for index, key in enumerate(['a', 'b']):
+        cache.put(key, key)
+        stamp = time.time() - 100 + index
+        os.utime(tmp_path / f'{key}.json', (stamp, stamp))
+
+    # Reading 'a' makes 'b' the least recently used
+    assert cache.get('a') == 'a'
+    cache.put('c', 'c')
+
+    assert sorted(path.stem for path in tmp_path.glob('*.json')) == ['a', 'c']
+
+def test_size_limit_evicts_oldest(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=2500)
+    for index in range(3):
+        cache.put(f'k{index}', 'x' * 1000)
+        stamp = time.time() - 100 + index
+        os.utime(tmp_path / f'k{index}.json', (stamp, stamp))
+    cache.evict()
+
+    assert sorted(path.stem for path in tmp_path.glob('*.json')) == ['k1', 'k2']
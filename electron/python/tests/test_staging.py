@@ -0,0 +1,69 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from git_operations import GitOperations
+
+SCRIPT = Path(__file__).resolve().parent.parent / 'git_operations.py'
+
+@pytest.fixture
+def repo(git_repo, git):
+    (git_repo / 'tracked.txt').write_text('a\n')
+    (git_repo / 'gone.txt').write_text('a\n')
+    git(git_repo, 'add', '.')
+    git(git_repo, 'commit', '-q', '-m', 'Initial commit')
+    return git_repo
+
+def staged(git, repo):
+    return git(repo, 'diff', '--cached', '--name-only', '-z').split('\0')[:-1]
+
+def test_stage_reports_only_missing_paths(repo, git):
+    (repo / 'tracked.txt').write_text('b\n')
+    (repo / 'gone.txt').unlink()
+    (repo / 'new.txt').write_text('new\n')
+
+    result = GitOperations(str(repo)).stage_files(['tracked.txt', 'missing.txt', 'gone.txt', 'new.txt'])
+
+    assert not result['success']
+    assert result['failed'] == [{'file': 'missing.txt', 'error': 'Path did not match any files'}]
+    assert sorted(result['staged']) == ['gone.txt', 'new.txt', 'tracked.txt']
+    assert sorted(staged(git, repo)) == ['gone.txt', 'new.txt', 'tracked.txt']
+
+def test_stage_takes_directories_and_literal_names(repo, git):
+    (repo / 'src' / 'deep').mkdir(parents=True)
+    (repo / 'src' / 'a.py').write_text('a\n')
+    (repo / 'src' / 'deep' / 'b.py').write_text('b\n')
+    (repo / '*.txt').write_text('star\n')
+
+    result = GitOperations(str(repo)).stage_files(['src', '*.txt'])
+
+    assert result['success']
+    # '*.txt' names one file; it is not a glob over tracked.txt and gone.txt
+    assert sorted(staged(git, repo)) == ['*.txt', 'src/a.py', 'src/deep/b.py']
+
+def test_unstage_leaves_clean_paths_alone(repo, git):
+    (repo / 'tracked.txt').write_text('b\n')
+    git(repo, 'add', 'tracked.txt')
+
+    result = GitOperations(str(repo)).unstage_files(['tracked.txt', 'gone.txt'])
+
+    assert result['success'], result
+    assert result['failed'] == []
+    assert staged(git, repo) == []
+
+def test_paths_from_stdin(repo, git):
+    names = [f'file {index}.txt' for index in range(300)]
+    for name in names:
+        (repo / name).write_text(name)
+
+    completed = subprocess.run(
+        [sys.executable, str(SCRIPT), 'stage', str(repo), '--stdin'],
+        input='\0'.join(names).encode(), capture_output=True, check=True
+    )
+
+    result = json.loads(completed.stdout)
+    assert result['success'], result
+    assert sorted(staged(git, repo)) == sorted(names)
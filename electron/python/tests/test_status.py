@@ -0,0 +1,49 @@
+from git_operations import GitOperations
+
+RECORDS = [
+    '# branch.oid 1111111111111111111111111111111111111111',
+    '# branch.head main',
+    '# branch.upstream origin/main',
+    '# branch.ab +2 -3',
+    '1 M. N... 100644 100644 100644 aaaa bbbb staged.py',
+    '1 .M N... 100644 100644 100644 cccc cccc changed file.txt',
+    '1 MM N... 100644 100644 100644 dddd eeee both.py',
+    '2 R. N... 100644 100644 100644 ffff ffff R100 new/name.py',
+    'old/name.py',
+    'u UU N... 100644 100644 100644 100644 1111 2222 3333 conflict.py',
+    '? untracked.txt',
+    ''
+]
+
+def parse(objects=None):
+    return GitOperations('.')._parse_status_v2(RECORDS, objects)
+
+def files(entries):
+    return [(entry['status'], entry['file']) for entry in entries]
+
+def test_branch_headers():
+    status = parse()
+    assert status['head'] == '1111111111111111111111111111111111111111'
+    assert status['branch'] == 'main'
+    assert status['upstream'] == 'origin/main'
+    assert (status['ahead'], status['behind']) == (2, 3)
+
+def test_entries():
+    status = parse()
+    assert files(status['staged']) == [('M', 'staged.py'), ('M', 'both.py'), ('R', 'new/name.py')]
+    assert files(status['unstaged']) == [('M', 'changed file.txt'), ('M', 'both.py'), ('U', 'conflict.py')]
+    assert files(status['untracked']) == [('??', 'untracked.txt')]
+    assert status['conflicted'] == [{'status': 'U', 'file': 'conflict.py', 'conflict': 'UU'}]
+    assert status['staged'][2]['orig_file'] == 'old/name.py'
+
+def test_objects():
+    objects = {}
+    parse(objects)
+    assert objects['staged.py'] == ('aaaa', 'bbbb')
+    assert objects['new/name.py'] == ('ffff', 'ffff')
+    assert 'untracked.txt' not in objects
+
+def test_detached_and_initial():
+    status = GitOperations('.')._parse_status_v2(['# branch.oid (initial)', '# branch.head (detached)'])
+    assert status['head'] is None
+    assert status['branch'] is None
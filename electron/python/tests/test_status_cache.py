@@ -0,0 +1,84 @@
+import os
+import time
+
+import pytest
+
+from git_operations import GitOperations
+from tracing import tracer
+
+def status_runs():
+    return tracer.stats()['commands'].get('status', {}).get('count', 0)
+
+@pytest.fixture
+def repo(git_repo, git):
+    (git_repo / 'a.txt').write_text('a\n')
+    # Not racily clean, so git status has no reason to rewrite the index
+    past = time.time() - 10
+    os.utime(git_repo / 'a.txt', (past, past))
+    git(git_repo, 'add', 'a.txt')
+    git(git_repo, 'commit', '-q', '-m', 'Initial commit')
+    return git_repo
+
+def files(status, key):
+    return [entry['file'] for entry in status['status'][key]]
+
+def test_unchanged_repository_is_served_from_cache(repo):
+    git_ops = GitOperations(str(repo))
+    before = status_runs()
+
+    first = git_ops.get_status()
+    second = git_ops.get_status()
+
+    assert status_runs() - before == 1
+    assert first['status'] == second['status']
+
+def test_invalidate_picks_up_worktree_edits(repo):
+    git_ops = GitOperations(str(repo))
+    git_ops.get_status()
+    (repo / 'a.txt').write_text('changed\n')
+
+    # Worktree edits are only noticed through invalidate() (or max_age)
+    assert files(git_ops.get_status(), 'unstaged') == []
+    git_ops.invalidate()
+    assert files(git_ops.get_status(), 'unstaged') == ['a.txt']
+
+def test_index_and_head_changes_miss_the_cache(repo, git):
+    git_ops = GitOperations(str(repo))
+    git_ops.get_status()
+
+    (repo / 'b.txt').write_text('b\n')
+    git(repo, 'add', 'b.txt')
+    assert files(git_ops.get_status(), 'staged') == ['b.txt']
+
+    git(repo, 'commit', '-q', '-m', 'Add b')
+    status = git_ops.get_status()['status']
+    assert status['staged'] == [] and status['head'] == git(repo, 'rev-parse', 'HEAD').strip()
+
+def test_max_age(repo):
+    git_ops = GitOperations(str(repo))
+    git_ops.get_status()
+    before = status_runs()
+
+    git_ops.get_status(max_age=0)
+
+    assert status_runs() - before == 1
+
+def test_invalidate_during_status_run(repo, monkeypatch):
+    git_ops = GitOperations(str(repo))
+    parse = git_ops._parse_status_v2
+
+    def parse_and_invalidate(records, objects=None):
+        status = parse(records, objects)
+        # A watcher event arriving while git status was running
+        git_ops.invalidate()
+        return status
+
+    monkeypatch.setattr(git_ops, '_parse_status_v2', parse_and_invalidate)
+    git_ops.get_status()
+    monkeypatch.setattr(git_ops, '_parse_status_v2', parse)
+    before = status_runs()
+
+    git_ops.get_status()
+    git_ops.get_status()
+
+    assert status_runs() - before == 1
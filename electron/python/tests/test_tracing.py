@@ -0,0 +1,92 @@
+import json
+import time
+
+import pytest
+
+from git_operations import GitOperations, run_command
+from tracing import TRACE_DIR_ENV, Histogram, Tracer, git_subcommand, tracer
+
+@pytest.mark.parametrize('args, subcommand', [
+    (['status', '--porcelain=v2'], 'status'),
+    (['-c', 'core.quotePath=false', 'diff', '--cached'], 'diff'),
+    (['--literal-pathspecs', '-C', 'repo', 'add', '-A'], 'add'),
+    (['--version'], None),
+])
+def test_git_subcommand_skips_global_options(args, subcommand):
+    assert git_subcommand(args) == subcommand
+
+def test_histogram_buckets_and_percentiles():
+    histogram = Histogram()
+    for duration_ms in [0.5] * 8 + [15, 40000]:
+        histogram.add(duration_ms, failed=duration_ms > 1000, output_bytes=10)
+
+    exported = histogram.export()
+    assert (exported['count'], exported['errors'], exported['output_bytes']) == (10, 1, 100)
+    assert exported['buckets']['<=1'] == 8
+    assert exported['buckets']['<=20'] == 1
+    assert exported['buckets']['>30000'] == 1
+    assert (exported['p50_ms'], exported['p90_ms'], exported['p99_ms']) == (1, 20, 40000)
+
+def test_calls_are_attributed_to_the_outermost_operation():
+    local = Tracer()
+    with local.operation('refresh'):
+        local.record(['status'], time.perf_counter(), 0)
+        with local.operation('nested'):
+            local.record(['diff'], time.perf_counter(), 1)
+    local.record(['log'], time.perf_counter(), 0)
+
+    stats = local.stats(reset=True)
+    assert stats['calls_per_operation'] == {'refresh': {'status': 1, 'diff': 1}}
+    assert list(stats['operations']) == ['refresh']
+    assert stats['commands']['diff']['errors'] == 1
+    assert local.stats()['commands'] == {}
+
+def test_trace_file_holds_git_calls_with_wait_times(tmp_path):
+    local = Tracer()
+    local.start_trace(str(tmp_path))
+    path = local.trace_path
+    with local.operation('status'):
+        local.record(['status'], time.perf_counter(), 0, output_bytes=42, wait_ms=7.5)
+    local.stop_trace()
+
+    events = json.loads(open(path).read())
+    git_event, operation_event, metadata = events
+    assert (git_event['name'], git_event['cat'], git_event['ph']) == ('git status', 'git', 'X')
+    assert git_event['args']['wait_ms'] == 7.5
+    assert git_event['args']['output_bytes'] == 42
+    assert git_event['args']['operation'] == 'status'
+    assert operation_event['cat'] == 'operation'
+    assert metadata['ph'] == 'M'
+    assert local.trace_path is None
+
+def test_trace_command_writes_only_to_the_trace_dir(tmp_path, monkeypatch, git_repo):
+    trace_dir = tmp_path / 'traces'
+    monkeypatch.setenv(TRACE_DIR_ENV, str(trace_dir))
+    git_ops = GitOperations(str(git_repo))
+
+    # Callers cannot pick the file
+    assert not run_command(git_ops, 'trace', ['on', str(tmp_path / 'elsewhere.json')])['success']
+    started = run_command(git_ops, 'trace', ['on'])
+    try:
+        assert started['success']
+        assert started['trace'].startswith(str(trace_dir))
+        run_command(git_ops, 'status', [])
+    finally:
+        run_command(git_ops, 'trace', ['off'])
+
+    assert not (tmp_path / 'elsewhere.json').exists()
+    assert [str(path) for path in trace_dir.iterdir()] == [started['trace']]
+    events = json.loads(open(started['trace']).read())
+    assert any(event['name'] == 'git status' and event['args']['operation'] == 'status' for event in events)
+    assert tracer.trace_path is None
+
+def test_trace_files_are_never_overwritten(tmp_path, monkeypatch):
+    local = Tracer()
+    monkeypatch.setattr(time, 'time_ns', lambda: 1_000_000_000)
+    local.start_trace(str(tmp_path))
+    local.stop_trace()
+
+    # Same name again: exclusive creation refuses rather than truncating
+    with pytest.raises(FileExistsError):
+        local.start_trace(str(tmp_path))
+    assert local.trace_file is None
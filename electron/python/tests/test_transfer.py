@@ -0,0 +1,92 @@
+import subprocess
+import threading
+import time
+
+from git_operations import GitOperations, parse_progress
+
+def commit_files(git, repo, count, message):
+    for index in range(count):
+        (repo / f'file{index}.txt').write_text(f'{message} {index}\n' * 50)
+    git(repo, 'add', '-A')
+    git(repo, 'commit', '-q', '-m', message)
+
+def test_parse_progress():
+    assert parse_progress('Receiving objects:  45% (9/20), 1.20 MiB | 512.00 KiB/s') == {
+        'phase': 'Receiving objects', 'remote': False, 'percent': 45, 'current': 9, 'total': 20,
+        'bytes': 1258291, 'rate': 524288
+    }
+    assert parse_progress('remote: Counting objects: 100% (3/3), done.')['remote'] is True
+    assert parse_progress('To /tmp/remote.git') is None
+
+def test_push_reports_progress(remote_repo, git):
+    bare, repo = remote_repo
+    commit_files(git, repo, 20, 'Add files')
+    events = []
+
+    result = GitOperations(str(repo)).push('origin', 'main', on_progress=events.append)
+
+    assert result['success'], result
+    assert git(bare, 'rev-parse', 'main') == git(repo, 'rev-parse', 'HEAD')
+    writing = [event for event in events if event['phase'] == 'Writing objects']
+    assert writing and writing[-1]['percent'] == 100
+    assert writing[-1]['current'] == writing[-1]['total']
+    assert writing[-1]['bytes'] > 0 and writing[-1]['rate'] is not None
+
+def test_pull_reports_progress(remote_repo, git, tmp_path):
+    bare, repo = remote_repo
+    other = tmp_path / 'other'
+    subprocess.run(['git', 'clone', '-q', str(bare), str(other)], check=True)
+    # Over fetch.unpackLimit objects, so git keeps the pack and reports receiving it
+    commit_files(git, other, 120, 'Upstream change')
+    git(other, 'push', '-q', 'origin', 'main')
+    events = []
+
+    result = GitOperations(str(repo)).pull('origin', 'main', on_progress=events.append)
+
+    assert result['success'], result
+    assert (repo / 'file0.txt').exists()
+    receiving = [event for event in events if event['phase'] == 'Receiving objects']
+    assert receiving and receiving[-1]['percent'] == 100
+    assert receiving[-1]['bytes'] > 0
+    assert any(event['remote'] for event in events)
+
+def test_rejected_push_fails(remote_repo, git, tmp_path):
+    bare, repo = remote_repo
+    other = tmp_path / 'other'
+    subprocess.run(['git', 'clone', '-q', str(bare), str(other)], check=True)
+    commit_files(git, other, 1, 'Upstream change')
+    git(other, 'push', '-q', 'origin', 'main')
+    commit_files(git, repo, 1, 'Local change')
+
+    result = GitOperations(str(repo)).push('origin', 'main')
+
+    assert result['success'] is False and result['cancelled'] is False
+    assert 'rejected' in result['error']
+
+def test_cancel_stops_remote_hooks(remote_repo, git):
+    bare, repo = remote_repo
+    hook = bare / 'hooks' / 'pre-receive'
+    hook.write_text('#!/bin/sh\nsleep 30\n')
+    hook.chmod(0o755)
+    commit_files(git, repo, 1, 'Slow push')
+    cancel = threading.Event()
+    threading.Timer(0.5, cancel.set).start()
+
+    started = time.monotonic()
+    result = GitOperations(str(repo)).push('origin', 'main', cancel=cancel)
+
+    assert result['cancelled'] is True and result['success'] is False
+    assert time.monotonic() - started < 10
+    assert git(bare, 'rev-parse', 'main') != git(repo, 'rev-parse', 'HEAD')
+
+def test_timeout(remote_repo, git):
+    bare, repo = remote_repo
+    hook = bare / 'hooks' / 'pre-receive'
+    hook.write_text('#!/bin/sh\nsleep 30\n')
+    hook.chmod(0o755)
+    commit_files(git, repo, 1, 'Slow push')
+
+    result = GitOperations(str(repo)).push('origin', 'main', timeout=0.5)
+
+    assert result['success'] is False
+    assert 'timed out' in result['error']
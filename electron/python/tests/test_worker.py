@@ -0,0 +1,98 @@
+import io
+import json
+import queue
+import threading
+import time
+
+from git_operations import GitWorker
+
+class RequestStream:
+    """Blocking stand-in for the worker's stdin."""
+
+    def __init__(self):
+        self.lines = queue.Queue()
+
+    def send(self, request):
+        self.lines.put(json.dumps(request) + '\n')
+
+    def close(self):
+        self.lines.put('')
+
+    def readline(self):
+        return self.lines.get()
+
+def make_worker():
+    worker = GitWorker()
+    output = []
+    worker.output = lambda data: output.extend(json.loads(line) for line in data.decode().splitlines())
+    return worker, output
+
+def results(output):
+    return {message['id']: message['result'] for message in output if 'result' in message}
+
+def test_requests_are_answered_by_id(git_repo):
+    (git_repo / 'new.txt').write_text('x\n')
+    worker, output = make_worker()
+    requests = [
+        {'id': 1, 'command': 'status', 'repo': str(git_repo)},
+        {'id': 'two', 'command': 'list-dir', 'repo': str(git_repo), 'args': ['.']},
+        {'id': 3, 'command': 'status'},
+    ]
+    worker.serve(io.StringIO('\n'.join(json.dumps(request) for request in requests) + '\nnot json\n'))
+
+    answered = results(output)
+    assert answered[1]['success'] and [entry['file'] for entry in answered[1]['status']['untracked']] == ['new.txt']
+    assert answered['two']['success']
+    assert answered[3] == {'success': False, 'error': 'Request needs "command" and "repo"'}
+    assert answered[None]['error'].startswith('Invalid request')
+
+def test_args_file(git_repo, tmp_path):
+    for name in ('a b.txt', 'c.txt'):
+        (git_repo / name).write_text('x\n')
+    args_file = tmp_path / 'args'
+    args_file.write_bytes(b'a b.txt\0c.txt\0')
+    worker, output = make_worker()
+
+    worker.serve(io.StringIO(json.dumps({'id': 1, 'command': 'stage', 'repo': str(git_repo),
+                                         'args_file': str(args_file)}) + '\n'))
+
+    assert results(output)[1]['staged'] == ['a b.txt', 'c.txt']
+
+def test_streamed_request(git_repo, git):
+    for index in range(3):
+        git(git_repo, 'commit', '-q', '--allow-empty', '-m', f'commit {index}')
+    worker, output = make_worker()
+
+    worker.serve(io.StringIO(json.dumps({'id': 7, 'command': 'log', 'repo': str(git_repo),
+                                         'args': ['10'], 'stream': True}) + '\n'))
+
+    assert [message.get('type') for message in output] == ['header', 'item', 'item', 'item', None]
+    assert all(message['id'] == 7 for message in output)
+    assert [message['item']['subject'] for message in output[1:4]] == ['commit 2', 'commit 1', 'commit 0']
+    trailer = output[-1]['result']
+    assert trailer['type'] == 'trailer' and trailer['count'] == 3 and 'commits' not in trailer
+
+def test_cancel(remote_repo, git):
+    bare, repo = remote_repo
+    hook = bare / 'hooks' / 'pre-receive'
+    hook.write_text('#!/bin/sh\nsleep 30\n')
+    hook.chmod(0o755)
+    git(repo, 'commit', '-q', '--allow-empty', '-m', 'slow')
+    worker, output = make_worker()
+    stream = RequestStream()
+    serving = threading.Thread(target=worker.serve, args=(stream,))
+    serving.start()
+
+    started = time.monotonic()
+    stream.send({'id': 1, 'command': 'push', 'repo': str(repo), 'args': ['origin', 'main']})
+    stream.send({'id': 2, 'command': 'status', 'repo': str(repo)})
+    # Wait until status has been answered, so the push is surely running
+    while 2 not in results(output):
+        time.sleep(0.05)
+    stream.send({'cancel': 1})
+    stream.close()
+    serving.join(timeout=20)
+
+    assert not serving.is_alive()
+    assert time.monotonic() - started < 10
+    assert results(output)[1]['cancelled'] is True
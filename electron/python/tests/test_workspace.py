@@ -0,0 +1,73 @@
+import os
+import time
+
+import pytest
+
+from git_operations import GitOperations
+from workspace import Workspace, discover_repositories
+
+def make_repo(path, git, dirty=False):
+    path.mkdir(parents=True)
+    git(path, 'init', '-q', '-b', 'main')
+    (path / 'README.md').write_text('hello\n')
+    # Not racily clean, so git status has no reason to rewrite the index
+    past = time.time() - 10
+    os.utime(path / 'README.md', (past, past))
+    git(path, 'add', '.')
+    git(path, 'commit', '-q', '-m', 'Initial commit')
+    if dirty:
+        (path / 'README.md').write_text('changed\n')
+        (path / 'new.txt').write_text('new\n')
+    return path
+
+@pytest.fixture
+def root(tmp_path, git_repo, git):
+    root = tmp_path / 'work'
+    make_repo(root / 'clean', git)
+    make_repo(root / 'group' / 'dirty', git, dirty=True)
+    # Repositories nested in a repository, hidden or in dependency trees are not found
+    make_repo(root / 'clean' / 'vendor' / 'inner', git)
+    (root / 'clean' / '.git' / 'info' / 'exclude').write_text('vendor/\n')
+    make_repo(root / 'node_modules' / 'pkg', git)
+    make_repo(root / '.cache' / 'hidden', git)
+    make_repo(root / 'a' / 'b' / 'c' / 'too-deep', git)
+    # A .git file that points nowhere: found, but git fails on it
+    (root / 'broken').mkdir()
+    (root / 'broken' / '.git').write_text('gitdir: /nonexistent\n')
+    return root
+
+def names(paths):
+    return sorted(path.rpartition('/')[2] for path in paths)
+
+def test_discovery_skips_nested_hidden_and_deep_directories(root):
+    assert names(discover_repositories(str(root))) == ['broken', 'clean', 'dirty']
+    assert names(discover_repositories(str(root), max_depth=4)) == ['broken', 'clean', 'dirty', 'too-deep']
+    assert names(discover_repositories(str(root / 'clean'))) == ['clean']
+
+def test_status_summarizes_each_repository(root):
+    events = []
+    result = Workspace(GitOperations).status([str(root), str(root / 'clean')], on_event=events.append)
+
+    assert result['success']
+    assert (result['total'], result['dirty'], result['failed']) == (3, 1, 1)
+    broken, clean, dirty = result['repos']
+    assert not broken['success'] and broken['error']
+    assert (clean['branch'], clean['has_changes']) == ('main', False)
+    assert (dirty['unstaged'], dirty['untracked'], dirty['staged']) == (1, 1, 0)
+
+    assert events[0] == {'type': 'discovered', 'repos': [repo['path'] for repo in result['repos']]}
+    assert sorted(event['repo']['name'] for event in events[1:]) == ['broken', 'clean', 'dirty']
+
+def test_repositories_are_reused_across_refreshes(root):
+    repos = {}
+
+    def get_repo(path):
+        return repos.setdefault(path, GitOperations(path))
+
+    workspace = Workspace(get_repo)
+    first = workspace.status([str(root)])
+    (root / 'clean' / 'README.md').write_text('edited\n')
+
+    # Within max_age the cached status is served; max_age=0 rechecks
+    assert workspace.status([str(root)])['repos'] == first['repos']
+    assert workspace.status([str(root)], max_age=0)['dirty'] == 2
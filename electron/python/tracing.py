@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Dict, List, Any, Optional
+
+# Upper bounds (ms) of the latency histogram buckets; the last one is open
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+
+# Set to a directory to write a Chrome trace (chrome://tracing, Perfetto) per process
+TRACE_DIR_ENV = 'GIT_GUI_TRACE_DIR'
+
+# Git options that take their value as the next argument
+_OPTIONS_WITH_VALUE = {'-C', '-c', '--git-dir', '--work-tree', '--namespace'}
+
+def git_subcommand(args: List[str]) -> Optional[str]:
+    """The subcommand of a git argument list, skipping global options."""
+    skip = False
+    for arg in args:
+        if skip:
+            skip = False
+        elif arg in _OPTIONS_WITH_VALUE:
+            skip = True
+        elif not arg.startswith('-'):
+            return arg
+    return None
+
+class Histogram:
+    """Count, sum, max and fixed log-scale buckets of durations in ms."""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.output_bytes = 0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, duration_ms: float, failed: bool = False, output_bytes: int = 0):
+        self.count += 1
+        self.errors += failed
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.output_bytes += output_bytes
+
+        for index, bound in enumerate(BUCKETS_MS):
+            if duration_ms <= bound:
+                self.buckets[index] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of samples."""
+        target = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= target:
+                return BUCKETS_MS[index] if index < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def export(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'total_ms': round(self.total_ms, 3),
+            'mean_ms': round(self.total_ms / self.count, 3) if self.count else 0.0,
+            'max_ms': round(self.max_ms, 3),
+            'p50_ms': self.percentile(0.50),
+            'p90_ms': self.percentile(0.90),
+            'p99_ms': self.percentile(0.99),
+            'output_bytes': self.output_bytes,
+            'buckets': dict(zip([f'<={bound}' for bound in BUCKETS_MS] + ['>' + str(BUCKETS_MS[-1])], self.buckets))
+        }
+
+class Tracer:
+    """Process-wide record of the git subprocesses we run.
+
+    Every call lands in a histogram per git subcommand and per high-level
+    operation (the worker command that caused it), which stats() exports.
+    With a trace file open, each call and operation is also written as a
+    Chrome trace "complete" event, so one status refresh can be inspected
+    on a profiler timeline.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.started_at = time.time()
+        self.commands: Dict[str, Histogram] = {}
+        self.operations: Dict[str, Histogram] = {}
+        self.by_operation: Dict[str, Dict[str, int]] = {}  # operation -> {subcommand: calls}
+        self.trace_file = None
+        self.trace_path = None
+        atexit.register(self.stop_trace)
+
+        trace_dir = os.environ.get(TRACE_DIR_ENV)
+        if trace_dir:
+            self.start_trace(trace_dir)
+
+    def current_operation(self) -> Optional[str]:
+        return getattr(self.local, 'operation', None)
+
+    @contextmanager
+    def operation(self, name: Optional[str]):
+        """Attribute the git calls made inside the block to operation `name`."""
+        outer = self.current_operation()
+        if outer is not None or name is None:
+            # Nested or inherited operations keep the outermost name
+            yield
+            return
+
+        self.local.operation = name
+        started = time.perf_counter()
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            self.local.operation = None
+            duration_ms = (time.perf_counter() - started) * 1000
+            with self.lock:
+                self.operations.setdefault(name, Histogram()).add(duration_ms, failed)
+            self._trace_event(name, 'operation', started, duration_ms, {})
+
+    def bind(self, call):
+        """Wrap `call` so it runs under the caller's operation on another thread."""
+        name = self.current_operation()
+        if name is None:
+            return call
+
+        def bound():
+            self.local.operation = name
+            try:
+                return call()
+            finally:
+                self.local.operation = None
+        return bound
+
+    def record(self, args: List[str], started: float, returncode: Optional[int],
+               output_bytes: int = 0, wait_ms: float = 0.0):
+        """Record one finished git call; `started` is a time.perf_counter() value."""
+        duration_ms = (time.perf_counter() - started) * 1000
+        subcommand = git_subcommand(args) or 'git'
+        operation = self.current_operation()
+
+        with self.lock:
+            self.commands.setdefault(subcommand, Histogram()).add(duration_ms, returncode != 0, output_bytes)
+            if operation:
+                calls = self.by_operation.setdefault(operation, {})
+                calls[subcommand] = calls.get(subcommand, 0) + 1
+
+        self._trace_event(f'git {subcommand}', 'git', started, duration_ms, {
+            'args': args[:12],
+            'returncode': returncode,
+            'output_bytes': output_bytes,
+            'wait_ms': round(wait_ms, 3),
+            'operation': operation
+        })
+
+    def stats(self, reset: bool = False) -> Dict[str, Any]:
+        with self.lock:
+            result = {
+                'since': self.started_at,
+                'commands': {name: histogram.export() for name, histogram in sorted(self.commands.items())},
+                'operations': {name: histogram.export() for name, histogram in sorted(self.operations.items())},
+                'calls_per_operation': {name: dict(calls) for name, calls in sorted(self.by_operation.items())},
+                'trace': self.trace_path
+            }
+            if reset:
+                self.started_at = time.time()
+                self.commands = {}
+                self.operations = {}
+                self.by_operation = {}
+        return result
+
+    def start_trace(self, trace_dir: str):
+        """Start writing trace events to a new file in `trace_dir` (JSON array format, closed by stop_trace).
+
+        The file name is chosen here and the file is created exclusively,
+        so starting a trace never overwrites anything.
+        """
+        self.stop_trace()
+        os.makedirs(trace_dir, exist_ok=True)
+        script = os.path.splitext(os.path.basename(sys.argv[0] or 'python'))[0]
+        path = os.path.join(trace_dir, f'trace-{script}-{os.getpid()}-{time.time_ns() // 1000000}.json')
+        with self.lock:
+            self.trace_file = open(path, 'x')
+            self.trace_file.write('[\n')
+            self.trace_path = path
+
+    def stop_trace(self):
+        with self.lock:
+            if self.trace_file is None:
+                return
+            # A trailing metadata event lets every event line end with a comma
+            self.trace_file.write(json.dumps({
+                'name': 'process_name', 'ph': 'M', 'pid': os.getpid(),
+                'args': {'name': os.path.basename(sys.argv[0] or 'python')}
+            }) + '\n]\n')
+            self.trace_file.close()
+            self.trace_file = None
+            self.trace_path = None
+
+    def _trace_event(self, name: str, category: str, started: float, duration_ms: float, args: Dict[str, Any]):
+        if self.trace_file is None:
+            return
+        line = json.dumps({
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': round(started * 1e6, 1),
+            'dur': round(duration_ms * 1000, 1),
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': args
+        })
+        with self.lock:
+            if self.trace_file is not None:
+                # Unterminated arrays are valid trace files, so a crash loses nothing
+                self.trace_file.write(line + ',\n')
+                self.trace_file.flush()
+
+tracer = Tracer()
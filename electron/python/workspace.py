@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from tracing import tracer
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Dict, List, Any, Optional, Callable
+
+# Directories never worth descending into while looking for repositories
+SKIP_DIRS = {'node_modules', '__pycache__', 'venv', '.venv'}
+
+def is_repository(path: Path) -> bool:
+    """Whether `path` is a worktree root (.git is a directory, or a file for worktrees/submodules)."""
+    return (path / '.git').exists()
+
+def discover_repositories(root: str, max_depth: int = 3) -> List[str]:
+    """Find repositories at or below `root`, without descending into them.
+
+    Hidden directories and dependency trees are skipped and symlinks are
+    not followed, so the scan only touches plain directories of the
+    workspace layout itself.
+    """
+    found = []
+    pending = [(Path(root).resolve(), 0)]
+    while pending:
+        path, depth = pending.pop()
+        if is_repository(path):
+            found.append(str(path))
+            continue
+        if depth >= max_depth:
+            continue
+
+        try:
+            entries = list(os.scandir(path))
+        except OSError:
+            continue
+
+        for entry in entries:
+            if entry.name.startswith('.') or entry.name in SKIP_DIRS:
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                pending.append((Path(entry.path), depth + 1))
+
+    return sorted(found)
+
+class Workspace:
+    """Status summaries for many repositories at once.
+
+    Repositories are summarized on a bounded pool and reported as each one
+    finishes. Summaries come from each repository's cached get_status(),
+    which only re-runs `git status` when the repository's fingerprint
+    (index, HEAD, refs) changed or the cached copy is older than `max_age`,
+    so refreshing an idle workspace costs a few stat calls per repository.
+    """
+
+    # Repositories summarized at once
+    MAX_WORKERS = 8
+
+    # Worktree edits in repositories nobody is watching show up after this long
+    MAX_AGE = 30.0
+
+    def __init__(self, get_repo: Callable[[str], Any]):
+        self.get_repo = get_repo
+
+    def status(self, paths: List[str], max_depth: int = 3, max_age: Optional[float] = None,
+               on_event: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Summarize every repository in `paths` (repositories or roots to search)."""
+        try:
+            repos = []
+            for path in paths:
+                for repo in discover_repositories(path, max_depth):
+                    if repo not in repos:
+                        repos.append(repo)
+
+            if on_event:
+                on_event({'type': 'discovered', 'repos': repos})
+
+            max_age = self.MAX_AGE if max_age is None else max_age
+            summaries = []
+            with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+                futures = [executor.submit(tracer.bind(lambda repo=repo: self.summarize(repo, max_age)))
+                           for repo in repos]
+                for future in as_completed(futures):
+                    summary = future.result()
+                    summaries.append(summary)
+                    if on_event:
+                        on_event({'type': 'repo', 'repo': summary})
+
+            summaries.sort(key=lambda summary: summary['path'])
+            return {
+                'success': True,
+                'repos': summaries,
+                'total': len(summaries),
+                'dirty': sum(1 for summary in summaries if summary.get('has_changes')),
+                'failed': sum(1 for summary in summaries if not summary['success'])
+            }
+
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+    def summarize(self, repo_path: str, max_age: float) -> Dict[str, Any]:
+        """Branch, change counts and ahead/behind for one repository."""
+        summary = {'path': repo_path, 'name': Path(repo_path).name}
+
+        result = self.get_repo(repo_path).get_status(max_age=max_age)
+        if not result['success']:
+            summary.update(success=False, error=result['error'])
+            return summary
+
+        status = result['status']
+        summary.update(
+            success=True,
+            branch=status['branch'],
+            upstream=status.get('upstream'),
+            ahead=status['ahead'],
+            behind=status['behind'],
+            staged=len(status['staged']),
+            unstaged=len(status['unstaged']),
+            untracked=len(status['untracked']),
+            conflicted=len(status['conflicted']),
+            has_changes=status['has_changes']
+        )
+        return summary
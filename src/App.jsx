@@ -22,6 +22,7 @@ import FileDiff from './components/FileDiff'
 import PushPullPanel from './components/PushPullPanel'
 import AICommitModal from './components/AICommitModal'
 import FileTree from './components/FileTree'
+import WorkspacePanel from './components/WorkspacePanel'
 import Terminal from './components/Terminal'
 import { useGit } from './hooks/useGit'
 
@@ -46,11 +47,13 @@ function App() {
     addAllUntracked,
     commitChanges,
     generateAICommit,
+    cancelAICommit,
     pushChanges,
     pullChanges,
     startFileWatcher,
     stopFileWatcher,
-    loadStatus
+    loadStatus,
+    loadMoreHistory
   } = useGit()
 
   useEffect(() => {
@@ -68,14 +71,27 @@ function App() {
     setIsAIModalOpen(true)
   }
 
-  const handleAIGenerate = async (changes) => {
-    const result = await generateAICommit({ repoPath, changes })
-    if (result.success) {
-      return result.message
+  // onDelta receives the message text while the model writes it
+  const handleAIGenerate = async (changes, { refresh = false, onDelta } = {}) => {
+    const unsubscribe = onDelta && window.electronAPI?.onAICommitDelta
+      ? window.electronAPI.onAICommitDelta((event, delta) => {
+          if (delta.repoPath === repoPath && delta.type === 'delta') onDelta(delta.text)
+        })
+      : null
+
+    try {
+      const result = await generateAICommit({ repoPath, changes, refresh, stream: Boolean(onDelta) })
+      if (result.success) {
+        return result.message
+      }
+      return null
+    } finally {
+      if (unsubscribe) unsubscribe()
     }
-    return null
   }
 
+  const handleAICancel = () => cancelAICommit(repoPath)
+
   const handleStageFile = async (filePath) => {
     const result = await stageFile(filePath)
     if (result.success) {
@@ -249,13 +265,13 @@ function App() {
 
             {activeTab === 'history' && (
               <div className="space-y-6">
-                <GitGraph history={history} />
+                <GitGraph history={history} onLoadMore={loadMoreHistory} />
               </div>
             )}
 
             {activeTab === 'graph' && (
               <div className="h-full">
-                <GitGraph history={history} interactive={true} />
+                <GitGraph history={history} interactive={true} onLoadMore={loadMoreHistory} />
               </div>
             )}
 
@@ -275,6 +291,10 @@ function App() {
                 onFileSelect={setSelectedFile}
               />
             )}
+
+            {activeTab === 'workspace' && (
+              <WorkspacePanel repoPath={repoPath} />
+            )}
           </div>
 
           {selectedFile && (
@@ -295,6 +315,7 @@ function App() {
         isOpen={isAIModalOpen}
         onClose={() => setIsAIModalOpen(false)}
         onGenerate={handleAIGenerate}
+        onCancel={handleAICancel}
         changes={[...(status?.unstaged || []), ...(status?.staged || [])]}
       />
     </div>
@@ -7,25 +7,33 @@ import {
   RefreshCw,
   Zap,
   Brain,
-  MessageSquare
+  MessageSquare,
+  Square
 } from 'lucide-react'
 
-const AICommitModal = ({ isOpen, onClose, onGenerate, changes = [] }) => {
+const AICommitModal = ({ isOpen, onClose, onGenerate, onCancel, changes = [] }) => {
   const [prompt, setPrompt] = useState('')
   const [isGenerating, setIsGenerating] = useState(false)
   const [generatedMessage, setGeneratedMessage] = useState('')
+  const [streamedText, setStreamedText] = useState('')
   const [isCopied, setIsCopied] = useState(false)
   const [tone, setTone] = useState('professional')
 
   if (!isOpen) return null
 
   const handleGenerate = async () => {
+    // Regenerating asks for a new message instead of the cached one
+    const refresh = Boolean(generatedMessage)
     setIsGenerating(true)
+    setStreamedText('')
 
     try {
       // Ensure changes is an array
       const changesArray = Array.isArray(changes) ? changes : []
-      const message = await onGenerate(changesArray)
+      const message = await onGenerate(changesArray, {
+        refresh,
+        onDelta: (text) => setStreamedText(prev => prev + text)
+      })
       if (message) {
         setGeneratedMessage(message)
       }
@@ -33,6 +41,7 @@ const AICommitModal = ({ isOpen, onClose, onGenerate, changes = [] }) => {
       console.error('Failed to generate commit:', error)
     } finally {
       setIsGenerating(false)
+      setStreamedText('')
     }
   }
 
@@ -214,8 +223,33 @@ const AICommitModal = ({ isOpen, onClose, onGenerate, changes = [] }) => {
             )}
           </button>
 
+          {/* Message as it is being written */}
+          {isGenerating && (
+            <div className="mt-6 space-y-4">
+              {streamedText && (
+                <div className="bg-muted/30 border border-border rounded-lg p-4">
+                  <p className="whitespace-pre-wrap">
+                    {streamedText}
+                    <span className="inline-block w-2 h-4 ml-0.5 align-middle bg-primary animate-pulse" />
+                  </p>
+                </div>
+              )}
+              {onCancel && (
+                <button
+                  onClick={onCancel}
+                  className="w-full py-3 border border-border rounded-lg hover:bg-accent transition-colors"
+                >
+                  <div className="flex items-center justify-center gap-2">
+                    <Square className="w-4 h-4" />
+                    <span>Stop</span>
+                  </div>
+                </button>
+              )}
+            </div>
+          )}
+
           {/* Generated Message */}
-          {generatedMessage && (
+          {generatedMessage && !isGenerating && (
             <div className="mt-6 space-y-4">
               <div className="flex items-center justify-between">
                 <h3 className="font-semibold">Generated Message</h3>
@@ -10,11 +10,26 @@ import {
 } from 'lucide-react'
 import { formatDistanceToNow } from 'date-fns'
 
-const GitGraph = ({ history, interactive = false }) => {
+const GitGraph = ({ history, interactive = false, onLoadMore }) => {
   const canvasRef = useRef(null)
+  const endRef = useRef(null)
   const [selectedCommit, setSelectedCommit] = useState(null)
   const [zoom, setZoom] = useState(1)
 
+  // Fetch the next cursor page once the end of the list scrolls into
+  // view. The observer is recreated per page, so a page too short to
+  // scroll asks for the next one straight away.
+  const commitCount = history?.commits?.length || 0
+  useEffect(() => {
+    if (!onLoadMore || !history?.hasMore || !endRef.current) return
+
+    const observer = new IntersectionObserver((entries) => {
+      if (entries.some(entry => entry.isIntersecting)) onLoadMore()
+    }, { rootMargin: '600px 0px' })
+    observer.observe(endRef.current)
+    return () => observer.disconnect()
+  }, [onLoadMore, history?.hasMore, commitCount])
+
   useEffect(() => {
     if (!history?.commits || !canvasRef.current) return
 
@@ -39,26 +54,55 @@ const GitGraph = ({ history, interactive = false }) => {
     const nodeRadius = 6 * zoom
     const nodeSpacing = 80 * zoom
     const branchWidth = 40 * zoom
+    const laneColors = [
+      'hsl(var(--primary))',
+      '#22c55e',
+      '#f59e0b',
+      '#ef4444',
+      '#a855f7',
+      '#06b6d4',
+      '#ec4899',
+      '#84cc16'
+    ]
+
+    const laneX = (column) => 50 + column * branchWidth
+    const rowY = (index) => 100 + (index * nodeSpacing)
+    const laneColor = (color) => laneColors[color % laneColors.length]
 
     ctx.lineWidth = 2
     ctx.lineCap = 'round'
 
-    // Draw branches and connections
+    // Draw edges arriving at each row from the row above, as laid out by
+    // GraphLayout in git_operations.py: flat (from, to, color) triples
     commits.forEach((commit, index) => {
-      const x = width - 100
-      const y = 100 + (index * nodeSpacing)
+      const edges = commit.graph?.edges || []
+      if (index === 0) return
 
-      // Draw branch lines
-      ctx.strokeStyle = 'hsl(var(--muted-foreground) / 0.3)'
-      ctx.beginPath()
-      ctx.moveTo(50, y)
-      ctx.lineTo(x - 20, y)
-      ctx.stroke()
+      for (let i = 0; i < edges.length; i += 3) {
+        const [from, to, color] = [edges[i], edges[i + 1], edges[i + 2]]
+        const y0 = rowY(index - 1)
+        const y1 = rowY(index)
+
+        ctx.strokeStyle = laneColor(color)
+        ctx.beginPath()
+        ctx.moveTo(laneX(from), y0)
+        if (from === to) {
+          ctx.lineTo(laneX(to), y1)
+        } else {
+          ctx.bezierCurveTo(laneX(from), (y0 + y1) / 2, laneX(to), (y0 + y1) / 2, laneX(to), y1)
+        }
+        ctx.stroke()
+      }
+    })
+
+    // Draw nodes on top of the edges
+    commits.forEach((commit, index) => {
+      const x = laneX(commit.graph?.column || 0)
+      const y = rowY(index)
 
-      // Draw node
       ctx.fillStyle = selectedCommit?.hash === commit.hash
         ? 'hsl(var(--primary))'
-        : 'hsl(var(--accent))'
+        : laneColor(commit.graph?.color || 0)
 
       ctx.beginPath()
       ctx.arc(x, y, nodeRadius, 0, Math.PI * 2)
@@ -71,18 +115,7 @@ const GitGraph = ({ history, interactive = false }) => {
         ctx.beginPath()
         ctx.arc(x, y, nodeRadius + 3, 0, Math.PI * 2)
         ctx.stroke()
-      }
-
-      // Draw connection to next commit
-      if (index < commits.length - 1) {
-        const nextY = 100 + ((index + 1) * nodeSpacing)
-        ctx.strokeStyle = 'hsl(var(--muted-foreground) / 0.2)'
-        ctx.setLineDash([5, 5])
-        ctx.beginPath()
-        ctx.moveTo(x, y + nodeRadius)
-        ctx.lineTo(x, nextY - nodeRadius)
-        ctx.stroke()
-        ctx.setLineDash([])
+        ctx.lineWidth = 2
       }
     })
   }
@@ -175,6 +208,11 @@ const GitGraph = ({ history, interactive = false }) => {
               </div>
             </div>
           ))}
+          {history.hasMore && (
+            <div ref={endRef} className="py-4 text-center text-sm text-muted-foreground">
+              Loading more commits...
+            </div>
+          )}
         </div>
       </div>
 
@@ -1,4 +1,4 @@
-import React, { useState } from 'react'
+import React, { useState, useEffect } from 'react'
 import {
   GitPullRequest,
   UploadCloud,
@@ -8,9 +8,52 @@ import {
   XCircle,
   ExternalLink,
   GitBranch,
-  Globe
+  Globe,
+  Square
 } from 'lucide-react'
 
+const formatBytes = (bytes) => {
+  if (bytes == null) return ''
+  const units = ['B', 'KiB', 'MiB', 'GiB']
+  let value = bytes
+  let unit = 0
+  while (value >= 1024 && unit < units.length - 1) {
+    value /= 1024
+    unit++
+  }
+  return `${value.toFixed(unit ? 1 : 0)} ${units[unit]}`
+}
+
+const TransferProgress = ({ progress, onCancel }) => (
+  <div className="mb-4 p-4 bg-muted/30 rounded-lg">
+    <div className="flex items-center justify-between text-sm mb-2">
+      <span>{progress ? `${progress.remote ? 'Remote: ' : ''}${progress.phase}` : 'Connecting...'}</span>
+      <div className="flex items-center gap-3">
+        {progress && (
+          <span className="text-muted-foreground">
+            {progress.current}/{progress.total}
+            {progress.bytes != null && ` · ${formatBytes(progress.bytes)}`}
+            {progress.rate != null && ` · ${formatBytes(progress.rate)}/s`}
+          </span>
+        )}
+        <button
+          onClick={onCancel}
+          className="flex items-center gap-1 px-2 py-1 rounded hover:bg-accent transition-colors"
+        >
+          <Square className="w-3 h-3" />
+          Cancel
+        </button>
+      </div>
+    </div>
+    <div className="h-2 bg-muted rounded-full overflow-hidden">
+      <div
+        className="h-full bg-primary transition-all"
+        style={{ width: `${progress ? progress.percent : 0}%` }}
+      />
+    </div>
+  </div>
+)
+
 const PushPullPanel = ({ repoPath, onPush, onPull, remote, branch }) => {
   const [isPushing, setIsPushing] = useState(false)
   const [isPulling, setIsPulling] = useState(false)
@@ -18,10 +61,25 @@ const PushPullPanel = ({ repoPath, onPush, onPull, remote, branch }) => {
   const [pullResult, setPullResult] = useState(null)
   const [customRemote, setCustomRemote] = useState(remote || 'origin')
   const [customBranch, setCustomBranch] = useState(branch || 'main')
+  const [progress, setProgress] = useState({ push: null, pull: null })
+
+  useEffect(() => {
+    if (!window.electronAPI?.onGitProgress) return
+
+    return window.electronAPI.onGitProgress((event, update) => {
+      if (update.repoPath !== repoPath) return
+      setProgress(prev => ({ ...prev, [update.command]: update }))
+    })
+  }, [repoPath])
+
+  const handleCancel = () => {
+    window.electronAPI.cancelTransfer(repoPath)
+  }
 
   const handlePush = async () => {
     setIsPushing(true)
     setPushResult(null)
+    setProgress(prev => ({ ...prev, push: null }))
 
     try {
       const result = await onPush({
@@ -41,6 +99,7 @@ const PushPullPanel = ({ repoPath, onPush, onPull, remote, branch }) => {
   const handlePull = async () => {
     setIsPulling(true)
     setPullResult(null)
+    setProgress(prev => ({ ...prev, pull: null }))
 
     try {
       const result = await onPull({
@@ -127,6 +186,8 @@ const PushPullPanel = ({ repoPath, onPush, onPull, remote, branch }) => {
           </button>
         </div>
 
+        {isPushing && <TransferProgress progress={progress.push} onCancel={handleCancel} />}
+
         {pushResult && (
           <div className={`
             p-4 rounded-lg border
@@ -146,7 +207,7 @@ const PushPullPanel = ({ repoPath, onPush, onPull, remote, branch }) => {
                   {pushResult.success ? 'Push Successful' : 'Push Failed'}
                 </p>
                 <p className="text-sm text-muted-foreground mt-1">
-                  {pushResult.success ? 'Changes pushed to remote successfully' : pushResult.error}
+                  {pushResult.success ? 'Changes pushed to remote successfully' : (pushResult.cancelled ? 'Push cancelled' : pushResult.error)}
                 </p>
               </div>
             </div>
@@ -197,6 +258,8 @@ const PushPullPanel = ({ repoPath, onPush, onPull, remote, branch }) => {
           </button>
         </div>
 
+        {isPulling && <TransferProgress progress={progress.pull} onCancel={handleCancel} />}
+
         {pullResult && (
           <div className={`
             p-4 rounded-lg border
@@ -216,7 +279,7 @@ const PushPullPanel = ({ repoPath, onPush, onPull, remote, branch }) => {
                   {pullResult.success ? 'Pull Successful' : 'Pull Failed'}
                 </p>
                 <p className="text-sm text-muted-foreground mt-1">
-                  {pullResult.success ? 'Changes pulled from remote successfully' : pullResult.error}
+                  {pullResult.success ? 'Changes pulled from remote successfully' : (pullResult.cancelled ? 'Pull cancelled' : pullResult.error)}
                 </p>
               </div>
             </div>
@@ -7,6 +7,7 @@ import {
   History,
   BarChart3,
   Folder,
+  FolderGit2,
   Terminal,
   Settings,
   HelpCircle
@@ -19,6 +20,7 @@ const Sidebar = ({ isOpen, activeTab, onTabChange, onClose }) => {
     { id: 'graph', label: 'Graph', icon: BarChart3 },
     { id: 'push-pull', label: 'Push/Pull', icon: GitPullRequest },
     { id: 'files', label: 'Files', icon: Folder },
+    { id: 'workspace', label: 'Workspace', icon: FolderGit2 },
     { id: 'terminal', label: 'Terminal', icon: Terminal },
   ]
 
@@ -0,0 +1,154 @@
+import React, { useState, useEffect, useCallback } from 'react'
+import {
+  FolderGit2,
+  RefreshCw,
+  ArrowUp,
+  ArrowDown,
+  XCircle
+} from 'lucide-react'
+
+const parentDirectory = (repoPath) => {
+  if (!repoPath) return ''
+  const trimmed = repoPath.replace(/[\\/]+$/, '')
+  const index = Math.max(trimmed.lastIndexOf('/'), trimmed.lastIndexOf('\\'))
+  return index > 0 ? trimmed.slice(0, index) : trimmed
+}
+
+const WorkspacePanel = ({ repoPath }) => {
+  const [root, setRoot] = useState(parentDirectory(repoPath))
+  const [repos, setRepos] = useState({})
+  const [order, setOrder] = useState([])
+  const [isLoading, setIsLoading] = useState(false)
+  const [error, setError] = useState(null)
+
+  // Rows fill in as each repository finishes
+  useEffect(() => {
+    if (!window.electronAPI?.onWorkspaceStatus) return
+
+    return window.electronAPI.onWorkspaceStatus((event, update) => {
+      if (update.root !== root) return
+      if (update.type === 'discovered') {
+        setOrder(update.repos)
+      } else if (update.type === 'repo') {
+        setRepos(prev => ({ ...prev, [update.repo.path]: update.repo }))
+      }
+    })
+  }, [root])
+
+  const refresh = useCallback(async () => {
+    if (!root) return
+    setIsLoading(true)
+    setError(null)
+
+    try {
+      const result = await window.electronAPI.getWorkspaceStatus({ root })
+      if (result.success) {
+        setOrder(result.repos.map(repo => repo.path))
+        setRepos(Object.fromEntries(result.repos.map(repo => [repo.path, repo])))
+      } else {
+        setError(result.error)
+      }
+    } catch (err) {
+      setError(err.message)
+    } finally {
+      setIsLoading(false)
+    }
+  }, [root])
+
+  useEffect(() => {
+    refresh()
+  }, [])
+
+  const dirtyCount = order.filter(path => repos[path]?.has_changes).length
+
+  return (
+    <div className="space-y-6">
+      <div className="bg-card rounded-xl border border-border p-6">
+        <div className="flex items-center justify-between mb-4">
+          <h3 className="text-lg font-semibold flex items-center gap-3">
+            <FolderGit2 className="w-6 h-6 text-blue-500" />
+            Workspace
+          </h3>
+          <span className="text-sm text-muted-foreground">
+            {order.length} repositories · {dirtyCount} with changes
+          </span>
+        </div>
+
+        <div className="flex gap-3">
+          <input
+            type="text"
+            value={root}
+            onChange={(e) => setRoot(e.target.value)}
+            onKeyDown={(e) => e.key === 'Enter' && refresh()}
+            className="flex-1 p-3 bg-muted/30 border border-border rounded-lg focus:outline-none focus:ring-2 focus:ring-primary font-mono text-sm"
+            placeholder="Folder containing your repositories"
+          />
+          <button
+            onClick={refresh}
+            disabled={isLoading}
+            className="flex items-center gap-2 px-4 py-2 rounded-lg bg-primary text-primary-foreground hover:bg-primary/90 transition-colors disabled:opacity-50"
+          >
+            <RefreshCw className={`w-4 h-4 ${isLoading ? 'animate-spin' : ''}`} />
+            Refresh
+          </button>
+        </div>
+
+        {error && (
+          <p className="mt-3 text-sm text-red-400">{error}</p>
+        )}
+      </div>
+
+      <div className="bg-card rounded-xl border border-border divide-y divide-border">
+        {order.map(path => {
+          const repo = repos[path]
+          const name = repo?.name || path.split(/[\\/]/).pop()
+
+          return (
+            <div key={path} className="flex items-center justify-between px-6 py-3">
+              <div className="min-w-0">
+                <p className="font-medium truncate">{name}</p>
+                <p className="text-xs text-muted-foreground font-mono truncate">{path}</p>
+              </div>
+
+              {!repo ? (
+                <RefreshCw className="w-4 h-4 animate-spin text-muted-foreground" />
+              ) : !repo.success ? (
+                <span className="flex items-center gap-2 text-sm text-red-400">
+                  <XCircle className="w-4 h-4" />
+                  {repo.error}
+                </span>
+              ) : (
+                <div className="flex items-center gap-4 text-sm">
+                  <span className="font-mono text-muted-foreground">{repo.branch || 'detached'}</span>
+                  {repo.ahead > 0 && (
+                    <span className="flex items-center gap-1 text-green-400">
+                      <ArrowUp className="w-3 h-3" />{repo.ahead}
+                    </span>
+                  )}
+                  {repo.behind > 0 && (
+                    <span className="flex items-center gap-1 text-yellow-400">
+                      <ArrowDown className="w-3 h-3" />{repo.behind}
+                    </span>
+                  )}
+                  {repo.has_changes ? (
+                    <span className="text-git-modified">
+                      {repo.staged} staged · {repo.unstaged} modified · {repo.untracked} untracked
+                    </span>
+                  ) : (
+                    <span className="text-muted-foreground">clean</span>
+                  )}
+                </div>
+              )}
+            </div>
+          )
+        })}
+
+        {!isLoading && order.length === 0 && (
+          <p className="px-6 py-8 text-center text-muted-foreground">No repositories found</p>
+        )}
+      </div>
+    </div>
+  )
+}
+
+export default WorkspacePanel
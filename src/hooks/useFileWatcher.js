@@ -14,14 +14,17 @@ export const useFileWatcher = () => {
         const handleFileChange = (event, change) => {
           try {
             const changeData = typeof change === 'string' ? JSON.parse(change) : change
+            if (changeData.event === 'stats') return
+            // The watcher reports coalesced batches: { event: 'batch', changes: [...] }
+            const items = Array.isArray(changeData.changes) ? changeData.changes : [changeData]
             setFileChanges(prev => {
-              const newChange = {
-                path: changeData.path || 'unknown',
+              const newChanges = items.slice(0, 10).map(item => ({
+                path: item.path || 'unknown',
                 timestamp: changeData.timestamp || new Date().toISOString(),
-                type: changeData.event || 'modified',
-                git_status: changeData.git_status || '??'
-              }
-              return [newChange, ...prev.slice(0, 9)] // Keep last 10 changes
+                type: item.event || 'modified',
+                git_status: item.git_status || ''
+              }))
+              return [...newChanges, ...prev].slice(0, 10) // Keep last 10 changes
             })
           } catch (e) {
             console.error('Error parsing file change:', e)
@@ -1,4 +1,4 @@
-import { useState, useEffect, useCallback } from 'react'
+import { useState, useEffect, useCallback, useRef } from 'react'
 
 export const useGit = () => {
   const [repoPath, setRepoPath] = useState(null)
@@ -11,6 +11,7 @@ export const useGit = () => {
     has_changes: false
   })
   const [history, setHistory] = useState({ commits: [], graph: '' })
+  const loadingMoreRef = useRef(false)
   const [isLoading, setIsLoading] = useState(false)
   const [error, setError] = useState(null)
 
@@ -62,7 +63,9 @@ export const useGit = () => {
         setHistory({
           commits: Array.isArray(result.commits) ? result.commits : [],
           graph: result.graph || '',
-          total: result.total || 0
+          total: result.total || 0,
+          cursor: result.cursor || null,
+          hasMore: result.has_more || false
         })
       }
     } catch (err) {
@@ -70,6 +73,30 @@ export const useGit = () => {
     }
   }, [repoPath])
 
+  // Load the next page of commit history (ignored while a page is loading)
+  const loadMoreHistory = useCallback(async () => {
+    if (!history.cursor || loadingMoreRef.current) return
+
+    loadingMoreRef.current = true
+    try {
+      const result = await window.electronAPI.getCommitHistory(repoPath, 50, history.cursor)
+      if (result.success) {
+        const commits = Array.isArray(result.commits) ? result.commits : []
+        setHistory(prev => ({
+          ...prev,
+          commits: [...prev.commits, ...commits],
+          total: prev.commits.length + commits.length,
+          cursor: result.cursor || null,
+          hasMore: result.has_more || false
+        }))
+      }
+    } catch (err) {
+      console.error('Failed to load more history:', err)
+    } finally {
+      loadingMoreRef.current = false
+    }
+  }, [repoPath, history.cursor])
+
   // Initialize a new repository
   const initRepository = useCallback(async (path) => {
     setIsLoading(true)
@@ -238,11 +265,13 @@ export const useGit = () => {
   }, [repoPath, loadStatus, loadHistory])
 
   // Generate AI commit message
-  const generateAICommit = useCallback(async ({ repoPath: path, changes }) => {
+  const generateAICommit = useCallback(async ({ repoPath: path, changes, refresh = false, stream = false }) => {
     try {
       const result = await window.electronAPI.generateAICommit({
         repoPath: path || repoPath,
-        changes
+        changes,
+        refresh,
+        stream
       })
       return result
     } catch (err) {
@@ -250,6 +279,14 @@ export const useGit = () => {
     }
   }, [repoPath])
 
+  const cancelAICommit = useCallback(async (path) => {
+    try {
+      return await window.electronAPI.cancelAICommit(path || repoPath)
+    } catch (err) {
+      return { success: false, error: err.message }
+    }
+  }, [repoPath])
+
   // Push changes
   const pushChanges = useCallback(async (data) => {
     try {
@@ -346,6 +383,7 @@ export const useGit = () => {
     addAllUntracked,
     commitChanges,
     generateAICommit,
+    cancelAICommit,
     pushChanges,
     pullChanges,
     getFileDiff,
@@ -355,6 +393,7 @@ export const useGit = () => {
 
     // Utilities
     loadStatus,
-    loadHistory
+    loadHistory,
+    loadMoreHistory
   }
 }
\ No newline at end of file